@@ -64,6 +64,16 @@ class _ShowdownConfig:
     save_replay: bool
     room_name: str
     damage_calc_type: str
+    damage_calc_schedule: tuple = ()
+    search_time_budget_ms: int = 0
+    search_processes: int = 1
+    search_statistics: bool = False
+    search_mode: str = constants.MAXIMIN_SEARCH
+    search_probability_cutoff: float = 0
+    search_backup: str = constants.MAXIMIN_BACKUP
+    pivot_switch_heuristic: bool = False
+    check_incremental_evaluation: bool = False
+    nash_gambit_cross_check: bool = False
     log_level: str
     log_to_file: bool
     log_handler: Union[CustomRotatingFileHandler, logging.StreamHandler]
@@ -83,6 +93,16 @@ class _ShowdownConfig:
         self.save_replay = env.bool("SAVE_REPLAY", False)
         self.room_name = env("ROOM_NAME", None)
         self.damage_calc_type = env("DAMAGE_CALC_TYPE", "average")
+        self.damage_calc_schedule = tuple(env.list("DAMAGE_CALC_SCHEDULE", []))
+        self.search_time_budget_ms = env.int("SEARCH_TIME_BUDGET_MS", 0)
+        self.search_processes = env.int("SEARCH_PROCESSES", 1)
+        self.search_statistics = env.bool("SEARCH_STATISTICS", False)
+        self.search_mode = env("SEARCH_MODE", constants.MAXIMIN_SEARCH)
+        self.search_probability_cutoff = env.float("SEARCH_PROBABILITY_CUTOFF", 0)
+        self.search_backup = env("SEARCH_BACKUP", constants.MAXIMIN_BACKUP)
+        self.pivot_switch_heuristic = env.bool("PIVOT_SWITCH_HEURISTIC", False)
+        self.check_incremental_evaluation = env.bool("CHECK_INCREMENTAL_EVALUATION", False)
+        self.nash_gambit_cross_check = env.bool("NASH_GAMBIT_CROSS_CHECK", False)
 
         self.log_level = env("LOG_LEVEL", "DEBUG")
         self.log_to_file = env.bool("LOG_TO_FILE", False)
@@ -91,6 +111,15 @@ class _ShowdownConfig:
 
     def validate_config(self):
         assert self.bot_mode in constants.BOT_MODES
+        assert all(calc_type in constants.DAMAGE_CALC_TYPES for calc_type in self.damage_calc_schedule), (
+            "DAMAGE_CALC_SCHEDULE must only contain {}".format(constants.DAMAGE_CALC_TYPES)
+        )
+        assert self.search_mode in constants.SEARCH_MODES, (
+            "SEARCH_MODE must be one of {}".format(constants.SEARCH_MODES)
+        )
+        assert self.search_backup in constants.SEARCH_BACKUPS, (
+            "SEARCH_BACKUP must be one of {}".format(constants.SEARCH_BACKUPS)
+        )
 
         if self.bot_mode == constants.CHALLENGE_USER:
             assert self.user_to_challenge is not None, (
@@ -3,6 +3,16 @@ ACCEPT_CHALLENGE = "ACCEPT_CHALLENGE"
 SEARCH_LADDER = "SEARCH_LADDER"
 BOT_MODES = [CHALLENGE_USER, ACCEPT_CHALLENGE, SEARCH_LADDER]
 
+MAXIMIN_SEARCH = "maximin"
+ALPHA_BETA_SEARCH = "alpha_beta"
+SEARCH_MODES = [MAXIMIN_SEARCH, ALPHA_BETA_SEARCH]
+
+MAXIMIN_BACKUP = "maximin"
+REGRET_MATCHING_BACKUP = "regret_matching"
+SEARCH_BACKUPS = [MAXIMIN_BACKUP, REGRET_MATCHING_BACKUP]
+
+DAMAGE_CALC_TYPES = ['average', 'min', 'max', 'min_max', 'min_max_average', 'all']
+
 STANDARD_BATTLE = "standard_battle"
 RANDOM_BATTLE = "random_battle"
 
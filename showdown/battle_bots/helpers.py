@@ -1,11 +1,22 @@
 import logging
+from collections import defaultdict
 
 import config
 import constants
+from config import ShowdownConfig
 
 from showdown.engine.objects import StateMutator
 from showdown.engine.select_best_move import pick_safest
-from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import search_payoff_matrix
+from showdown.engine.select_best_move import iterative_deepening_search
+from showdown.engine.select_best_move import restore_option_order
+from showdown.engine.move_history import MoveHistory
+from showdown.engine.monte_carlo import monte_carlo_tree_search
+from showdown.engine.payoff_matrix import PayoffMatrix
+from showdown.engine.payoff_matrix import concatenate_payoff_matrices
+from showdown.engine.search_service import get_search_service
+from showdown.engine.search_statistics import SearchStatistics
+from showdown.engine.transposition_table import TranspositionTable
 
 
 logger = logging.getLogger(__name__)
@@ -46,26 +57,104 @@ def format_decision(battle, decision):
 
 
 def prefix_opponent_move(score_lookup, prefix):
-    new_score_lookup = dict()
-    for k, v in score_lookup.items():
-        bot_move, opponent_move = k
-        new_opponent_move = "{}_{}".format(opponent_move, prefix)
-        new_score_lookup[(bot_move, new_opponent_move)] = v
+    return PayoffMatrix.from_score_lookup(score_lookup).suffix_opponent_options(prefix)
 
-    return new_score_lookup
 
+def concatenate_score_lookups(score_lookups):
+    # the opponent's options of each state are kept apart so that the bot's options are scored against all of them
+    return concatenate_payoff_matrices(
+        [prefix_opponent_move(scores, str(i)) for i, scores in enumerate(score_lookups)]
+    )
 
-def pick_safest_move_from_battles(battles):
-    all_scores = dict()
-    for i, b in enumerate(battles):
+
+def new_search_statistics():
+    if ShowdownConfig.search_statistics:
+        statistics = SearchStatistics()
+        statistics.start()
+        return statistics
+    return None
+
+
+def log_search_statistics(statistics):
+    if statistics is not None:
+        statistics.stop()
+        logger.info("Search statistics: {}".format(statistics.to_json()))
+
+
+def search_single_state(mutator, user_options, opponent_options, depth, prune, transposition_table, statistics):
+    # searches a single state in this process with the configured search mode
+    score_lookup = search_payoff_matrix(
+        mutator,
+        user_options,
+        opponent_options,
+        depth=depth,
+        search_mode=ShowdownConfig.search_mode,
+        prune=prune,
+        transposition_table=transposition_table,
+        statistics=statistics,
+        history=MoveHistory(),
+        probability_cutoff=ShowdownConfig.search_probability_cutoff,
+        damage_calc_types=tuple(ShowdownConfig.damage_calc_schedule),
+        backup=ShowdownConfig.search_backup
+    )
+    return restore_option_order(score_lookup, user_options, opponent_options)
+
+
+def get_payoff_matrices(battles, depth=2, prune=True):
+    """
+    Searches each battle and returns their payoff-matrices in the same order as the battles
+
+    When more than one search process is configured the battles are searched in parallel
+    by the search service, otherwise they are searched one after the other.
+    A single battle is searched in parallel by splitting up the bot's options at the root.
+
+    """
+    states = []
+    for b in battles:
         state = b.create_state()
-        mutator = StateMutator(state)
         user_options, opponent_options = b.get_all_options()
-        logger.debug("Searching through the state: {}".format(mutator.state))
-        scores = get_payoff_matrix(mutator, user_options, opponent_options, prune=True)
+        logger.debug("Searching through the state: {}".format(state))
+        states.append((state, user_options, opponent_options))
+
+    statistics = new_search_statistics()
+    if ShowdownConfig.search_processes > 1 and len(states) > 1:
+        payoff_matrices = get_search_service().search(
+            states,
+            depth=depth,
+            prune=prune,
+            search_mode=ShowdownConfig.search_mode,
+            probability_cutoff=ShowdownConfig.search_probability_cutoff,
+            damage_calc_types=tuple(ShowdownConfig.damage_calc_schedule),
+            backup=ShowdownConfig.search_backup,
+            statistics=statistics
+        )
+    elif ShowdownConfig.search_processes > 1:
+        state, user_options, opponent_options = states[0]
+        payoff_matrices = [get_search_service().search_root(
+            state,
+            user_options,
+            opponent_options,
+            depth=depth,
+            prune=prune,
+            search_mode=ShowdownConfig.search_mode,
+            probability_cutoff=ShowdownConfig.search_probability_cutoff,
+            damage_calc_types=tuple(ShowdownConfig.damage_calc_schedule),
+            backup=ShowdownConfig.search_backup,
+            statistics=statistics
+        )]
+    else:
+        payoff_matrices = []
+        for state, user_options, opponent_options in states:
+            mutator = StateMutator(state)
+            payoff_matrices.append(
+                search_single_state(mutator, user_options, opponent_options, depth, prune, TranspositionTable(), statistics)
+            )
+    log_search_statistics(statistics)
+    return payoff_matrices
+
 
-        prefixed_scores = prefix_opponent_move(scores, str(i))
-        all_scores = {**all_scores, **prefixed_scores}
+def pick_safest_move_from_battles(battles):
+    all_scores = concatenate_score_lookups(get_payoff_matrices(battles))
 
     decision, payoff = pick_safest(all_scores, remove_guaranteed=True)
     bot_choice = decision[0]
@@ -81,20 +170,12 @@ def pick_safest_move_using_dynamic_search_depth(battles):
     Using a pypy interpreter will also result in better performance.
 
     """
-    all_scores = dict()
     num_battles = len(battles)
 
     if num_battles > 1:
         search_depth = 2
 
-        for i, b in enumerate(battles):
-            state = b.create_state()
-            mutator = StateMutator(state)
-            user_options, opponent_options = b.get_all_options()
-            logger.debug("Searching through the state: {}".format(mutator.state))
-            scores = get_payoff_matrix(mutator, user_options, opponent_options, depth=search_depth, prune=True)
-            prefixed_scores = prefix_opponent_move(scores, str(i))
-            all_scores = {**all_scores, **prefixed_scores}
+        all_scores = concatenate_score_lookups(get_payoff_matrices(battles, depth=search_depth))
 
     elif num_battles == 1:
         search_depth = 3
@@ -116,7 +197,25 @@ def pick_safest_move_using_dynamic_search_depth(battles):
         logger.debug("My Options: {}".format(user_options))
         logger.debug("Opponent Options: {}".format(opponent_options))
         logger.debug("Search depth: {}".format(search_depth))
-        all_scores = get_payoff_matrix(mutator, user_options, opponent_options, depth=search_depth, prune=True)
+        statistics = new_search_statistics()
+        if ShowdownConfig.search_processes > 1:
+            all_scores = get_search_service().search_root(
+                state,
+                user_options,
+                opponent_options,
+                depth=search_depth,
+                prune=True,
+                search_mode=ShowdownConfig.search_mode,
+                probability_cutoff=ShowdownConfig.search_probability_cutoff,
+                damage_calc_types=tuple(ShowdownConfig.damage_calc_schedule),
+                backup=ShowdownConfig.search_backup,
+                statistics=statistics
+            )
+        else:
+            transposition_table = TranspositionTable()
+            all_scores = search_single_state(mutator, user_options, opponent_options, search_depth, True, transposition_table, statistics)
+            logger.debug("Transposition table: {}".format(transposition_table))
+        log_search_statistics(statistics)
 
     else:
         raise ValueError("less than 1 battle?: {}".format(battles))
@@ -126,3 +225,65 @@ def pick_safest_move_using_dynamic_search_depth(battles):
     logger.debug("Safest: {}, {}".format(bot_choice, payoff))
     logger.debug("Depth: {}".format(search_depth))
     return bot_choice
+
+
+def pick_safest_move_using_iterative_deepening(battles, time_budget_ms):
+    """
+    Searches every battle one turn deeper at a time until the time budget is used up.
+
+    The deepest search that finished for every battle is used to make the decision,
+    so the time spent on a decision stays bounded while narrow positions get searched deeper.
+
+    """
+    states = []
+    for b in battles:
+        state = b.create_state()
+        user_options, opponent_options = b.get_all_options()
+        logger.debug("Searching through the state: {}".format(state))
+        states.append((state, user_options, opponent_options))
+
+    statistics = new_search_statistics()
+    score_lookups, search_depth = iterative_deepening_search(
+        states,
+        time_budget_ms / 1000,
+        statistics=statistics,
+        probability_cutoff=ShowdownConfig.search_probability_cutoff,
+        damage_calc_types=tuple(ShowdownConfig.damage_calc_schedule),
+        backup=ShowdownConfig.search_backup,
+        search_mode=ShowdownConfig.search_mode
+    )
+    log_search_statistics(statistics)
+
+    all_scores = concatenate_score_lookups(score_lookups)
+
+    decision, payoff = pick_safest(all_scores, remove_guaranteed=True)
+    bot_choice = decision[0]
+    logger.debug("Safest: {}, {}".format(bot_choice, payoff))
+    logger.debug("Depth: {}".format(search_depth))
+    return bot_choice
+
+
+def pick_move_using_monte_carlo_tree_search(battles, time_budget_ms):
+    """
+    Runs decoupled UCT on every battle, splitting the time budget evenly between them.
+
+    The visits of each of the bot's options are added up across the battles
+    and the option that was visited the most is used.
+
+    """
+    time_budget = time_budget_ms / 1000 / len(battles)
+    user_option_visits = defaultdict(int)
+    for b in battles:
+        state = b.create_state()
+        mutator = StateMutator(state)
+        user_options, opponent_options = b.get_all_options()
+        logger.debug("Searching through the state: {}".format(state))
+
+        root = monte_carlo_tree_search(mutator, user_options, opponent_options, time_budget=time_budget)
+        logger.debug("Monte carlo tree search: {}".format(root))
+        for option, visits in root.get_user_visits().items():
+            user_option_visits[option] += visits
+
+    bot_choice = max(user_option_visits, key=lambda x: user_option_visits[x])
+    logger.debug("Most visited: {}, {}".format(bot_choice, user_option_visits[bot_choice]))
+    return bot_choice
@@ -0,0 +1,19 @@
+from config import ShowdownConfig
+from showdown.battle import Battle
+
+from ..helpers import format_decision
+from ..helpers import pick_move_using_monte_carlo_tree_search
+
+
+DEFAULT_TIME_BUDGET_MS = 2000
+
+
+class BattleBot(Battle):
+    def __init__(self, *args, **kwargs):
+        super(BattleBot, self).__init__(*args, **kwargs)
+
+    def find_best_move(self):
+        battles = self.prepare_battles(join_moves_together=True)
+        time_budget_ms = ShowdownConfig.search_time_budget_ms or DEFAULT_TIME_BUDGET_MS
+        best_move = pick_move_using_monte_carlo_tree_search(battles, time_budget_ms)
+        return format_decision(self, best_move)
@@ -4,23 +4,26 @@ import logging
 from collections import defaultdict
 
 import numpy as np
-import pandas as pd
 from nashpy import Game
 
 import config
+from config import ShowdownConfig
 from showdown.battle import Battle
-from showdown.engine.select_best_move import remove_guaranteed_opponent_moves
-from showdown.engine.objects import StateMutator
+from showdown.engine.payoff_matrix import PayoffMatrix
 from showdown.engine.select_best_move import pick_safest
-from showdown.engine.select_best_move import get_payoff_matrix
 
+from .zero_sum import solve_zero_sum_game
 from ..safest.main import pick_safest_move_from_battles
 from ..helpers import format_decision
+from ..helpers import get_payoff_matrices
 
 
 logger = logging.getLogger(__name__)
 
 
+# gambit solves the game with the scores rounded to integers, which can move the score of its equilibrium by up to 1
+GAMBIT_SCORE_TOLERANCE = 1
+
 NFG_FORMAT_BASE = """NFG 1 R ""
 { "Player 1" "Player 2" } { %s %s }
 
@@ -49,8 +52,8 @@ def convert_from_list(my_list, num_rows):
     return [my_list[:num_rows], my_list[num_rows:]]
 
 
-def find_best_nash_equilibrium(equilibria, df):
-    game = Game(df)
+def find_best_nash_equilibrium(equilibria, matrix):
+    game = Game(matrix)
 
     score = float('-inf')
     best_eq = None
@@ -102,20 +105,37 @@ def find_all_equilibria(matrix):
     return np.array(equilibria, dtype=object)
 
 
+def check_equilibrium_with_gambit(matrix, score):
+    # gambit is only used to check the linear program's solution, so a problem running it is not fatal
+    try:
+        equilibria = find_all_equilibria(matrix)
+        _, gambit_score = find_best_nash_equilibrium(equilibria, matrix)
+    except (CouldNotFindEquilibriumError, OSError) as e:
+        logger.warning("Could not check the equilibrium with gambit: {}".format(e))
+        return
+
+    if abs(gambit_score - score) > GAMBIT_SCORE_TOLERANCE:
+        logger.warning("The equilibrium's score {} does not match gambit's score {}".format(score, gambit_score))
+
+
 def find_nash_equilibrium(score_lookup):
-    modified_score_lookup = remove_guaranteed_opponent_moves(score_lookup)
-    if not modified_score_lookup:
-        modified_score_lookup = score_lookup
+    payoff_matrix = PayoffMatrix.from_score_lookup(score_lookup)
+    modified_payoff_matrix = payoff_matrix.remove_guaranteed_opponent_moves()
+    if not modified_payoff_matrix:
+        modified_payoff_matrix = payoff_matrix
+
+    matrix = modified_payoff_matrix.to_array()
 
-    df = pd.Series(modified_score_lookup).unstack()
+    try:
+        bot_percentages, opponent_percentages, score = solve_zero_sum_game(matrix)
+    except ValueError as e:
+        raise CouldNotFindEquilibriumError(e)
 
-    equilibria = find_all_equilibria(df)
-    best_eq, score = find_best_nash_equilibrium(equilibria, df)
-    bot_percentages = best_eq[0]
-    opponent_percentages = best_eq[1]
+    if ShowdownConfig.nash_gambit_cross_check:
+        check_equilibrium_with_gambit(matrix, score)
 
-    bot_choices = df.index
-    opponent_choices = df.columns
+    bot_choices = modified_payoff_matrix.user_options
+    opponent_choices = modified_payoff_matrix.opponent_options
 
     return bot_choices, opponent_choices, bot_percentages, opponent_percentages, score
 
@@ -179,15 +199,7 @@ class BattleBot(Battle):
             battles = self.prepare_battles(join_moves_together=True)
             decision = pick_safest_move_from_battles(battles)
         else:
-            list_of_payoffs = list()
-            for b in battles:
-                state = b.create_state()
-                mutator = StateMutator(state)
-                logger.debug("Attempting to find best move from: {}".format(mutator.state))
-                user_options, opponent_options = b.get_all_options()
-                scores = get_payoff_matrix(mutator, user_options, opponent_options, prune=False)
-                list_of_payoffs.append(scores)
-
+            list_of_payoffs = get_payoff_matrices(battles, prune=False)
             decision = pick_move_in_equilibrium_from_multiple_score_lookups(list_of_payoffs)
 
         return format_decision(self, decision)
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+# reduced costs and ratios closer to 0 than this are treated as 0
+EPSILON = 1e-9
+
+
+def solve_zero_sum_game(matrix):
+    """
+    Finds an optimal mixed strategy for both players of a zero-sum game with a linear program
+
+    The rows are the bot's options and the columns are the opponent's options.
+    Every score is shifted to be at least 1 so that the value of the game is positive, then the opponent's problem:
+
+        maximize sum(y) such that matrix @ y <= 1 and y >= 0
+
+    is solved with the simplex method. The origin is always feasible so no first phase is needed.
+    The opponent's strategy is y / sum(y), the bot's strategy comes from the dual values of the constraints,
+    and the value of the game is 1 / sum(y) shifted back.
+
+    :param matrix: a 2-D array of the bot's payoffs
+    :return: a tuple of (bot strategy, opponent strategy, value of the game)
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.ndim != 2 or 0 in matrix.shape:
+        raise ValueError("A zero-sum game needs at least one option for each player: {}".format(matrix.shape))
+    if np.isnan(matrix).any():
+        raise ValueError("A zero-sum game cannot be solved with nan payoffs")
+
+    shift = 1 - matrix.min()
+    shifted_matrix = matrix + shift
+    num_rows, num_columns = shifted_matrix.shape
+
+    # [shifted_matrix | identity for the slack variables | right hand side], with the objective as the last row
+    tableau = np.zeros((num_rows + 1, num_columns + num_rows + 1))
+    tableau[:num_rows, :num_columns] = shifted_matrix
+    tableau[:num_rows, num_columns:num_columns + num_rows] = np.eye(num_rows)
+    tableau[:num_rows, -1] = 1
+    tableau[-1, :num_columns] = -1
+    basis = list(range(num_columns, num_columns + num_rows))
+
+    # Bland's rule cannot cycle, which matters because game matrices are very often degenerate
+    max_pivots = 50 * (num_rows + num_columns)
+    for _ in range(max_pivots):
+        entering_candidates = np.nonzero(tableau[-1, :-1] < -EPSILON)[0]
+        if not len(entering_candidates):
+            break
+        entering = entering_candidates[0]
+
+        column = tableau[:num_rows, entering]
+        positive_rows = np.nonzero(column > EPSILON)[0]
+        ratios = tableau[positive_rows, -1] / column[positive_rows]
+        tied_rows = positive_rows[ratios <= ratios.min() + EPSILON]
+        leaving_row = min(tied_rows, key=lambda row: basis[row])
+
+        tableau[leaving_row] /= tableau[leaving_row, entering]
+        for row in range(num_rows + 1):
+            if row != leaving_row and tableau[row, entering] != 0:
+                tableau[row] -= tableau[row, entering] * tableau[leaving_row]
+        basis[leaving_row] = entering
+    else:
+        raise ValueError("The simplex method did not finish in {} pivots".format(max_pivots))
+
+    # the problem is bounded because every score is positive, so the objective is always positive here
+    objective = tableau[-1, -1]
+
+    opponent_strategy = np.zeros(num_columns)
+    for row, variable in enumerate(basis):
+        if variable < num_columns:
+            opponent_strategy[variable] = tableau[row, -1]
+    opponent_strategy = np.clip(opponent_strategy, 0, None) / objective
+
+    bot_strategy = np.clip(tableau[-1, num_columns:num_columns + num_rows], 0, None) / objective
+
+    return bot_strategy / bot_strategy.sum(), opponent_strategy / opponent_strategy.sum(), 1 / objective - shift
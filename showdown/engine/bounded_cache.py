@@ -0,0 +1,44 @@
+from collections import OrderedDict
+
+
+class BoundedCache:
+    """
+    A dictionary-like cache that holds at most `max_size` entries
+
+    The least-recently-used entry is evicted when the cache is full.
+    `hits` and `misses` count the lookups so that the usefulness of the cache can be logged.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            value = self.table[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self.table.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.table[key] = value
+        self.table.move_to_end(key)
+        if len(self.table) > self.max_size:
+            self.table.popitem(last=False)
+
+    def clear(self):
+        self.table.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.table)
+
+    def __repr__(self):
+        return "{}(size={}, hits={}, misses={})".format(type(self).__name__, len(self.table), self.hits, self.misses)
@@ -0,0 +1,210 @@
+import constants
+
+
+# An instruction is compiled into a pair of primitive operations: one to apply it and one to reverse it
+# Each operation is a tuple of (opcode, side_index, argument, argument)
+# Boosts are compiled to a (stat, attribute-name) argument so that the attribute does not need to be looked up
+# StateMutator.apply_compiled / reverse_compiled execute these in a single loop
+# that branches on the integer opcode instead of dispatching through a dict of bound methods
+
+SIDE_INDICES = {
+    constants.USER: 0,
+    constants.OPPONENT: 1
+}
+SIDE_STRINGS = (constants.USER, constants.OPPONENT)
+
+boost_attributes = {
+    constants.ATTACK: 'attack_boost',
+    constants.DEFENSE: 'defense_boost',
+    constants.SPECIAL_ATTACK: 'special_attack_boost',
+    constants.SPECIAL_DEFENSE: 'special_defense_boost',
+    constants.SPEED: 'speed_boost',
+    constants.ACCURACY: 'accuracy_boost',
+    constants.EVASION: 'evasion_boost',
+}
+
+OP_CHANGE_HP = 0
+OP_CHANGE_BOOST = 1
+OP_SET_STATUS = 2
+OP_ADD_VOLATILE_STATUS = 3
+OP_REMOVE_VOLATILE_STATUS = 4
+OP_CHANGE_SIDE_CONDITION = 5
+OP_SWITCH = 6
+OP_SET_WISH = 7
+OP_CHANGE_WISH_TURNS = 8
+OP_SET_FUTURE_SIGHT = 9
+OP_CHANGE_FUTURE_SIGHT_TURNS = 10
+OP_SET_MOVE_DISABLED = 11
+OP_SET_WEATHER = 12
+OP_SET_FIELD = 13
+OP_TOGGLE_TRICK_ROOM = 14
+OP_SET_TYPES = 15
+OP_SET_ITEM = 16
+OP_SET_STATS = 17
+
+
+def compile_switch(side, previous_active, new_active):
+    return (OP_SWITCH, side, new_active, None), (OP_SWITCH, side, previous_active, None)
+
+
+def compile_apply_volatile_status(side, volatile_status):
+    return (OP_ADD_VOLATILE_STATUS, side, volatile_status, None), (OP_REMOVE_VOLATILE_STATUS, side, volatile_status, None)
+
+
+def compile_remove_volatile_status(side, volatile_status):
+    return (OP_REMOVE_VOLATILE_STATUS, side, volatile_status, None), (OP_ADD_VOLATILE_STATUS, side, volatile_status, None)
+
+
+def compile_damage(side, amount):
+    return (OP_CHANGE_HP, side, -amount, None), (OP_CHANGE_HP, side, amount, None)
+
+
+def compile_heal(side, amount):
+    return (OP_CHANGE_HP, side, amount, None), (OP_CHANGE_HP, side, -amount, None)
+
+
+def compile_boost(side, stat, amount):
+    try:
+        boost = (stat, boost_attributes[stat])
+    except KeyError:
+        raise ValueError("Invalid stat: {}".format(stat))
+    return (OP_CHANGE_BOOST, side, boost, amount), (OP_CHANGE_BOOST, side, boost, -amount)
+
+
+def compile_unboost(side, stat, amount):
+    return compile_boost(side, stat, -amount)
+
+
+def compile_apply_status(side, status):
+    return (OP_SET_STATUS, side, status, None), (OP_SET_STATUS, side, None, None)
+
+
+def compile_remove_status(side, status):
+    return (OP_SET_STATUS, side, None, None), (OP_SET_STATUS, side, status, None)
+
+
+def compile_side_start(side, effect, amount):
+    return (OP_CHANGE_SIDE_CONDITION, side, effect, amount), (OP_CHANGE_SIDE_CONDITION, side, effect, -amount)
+
+
+def compile_side_end(side, effect, amount):
+    return (OP_CHANGE_SIDE_CONDITION, side, effect, -amount), (OP_CHANGE_SIDE_CONDITION, side, effect, amount)
+
+
+def compile_wish_start(side, health, previous_wish_amount):
+    return (OP_SET_WISH, side, (2, health), None), (OP_SET_WISH, side, (0, previous_wish_amount), None)
+
+
+def compile_wish_decrement(side):
+    return (OP_CHANGE_WISH_TURNS, side, -1, None), (OP_CHANGE_WISH_TURNS, side, 1, None)
+
+
+def compile_futuresight_start(side, pkmn_name, old_pkmn_name):
+    return (OP_SET_FUTURE_SIGHT, side, (3, pkmn_name), None), (OP_SET_FUTURE_SIGHT, side, (0, old_pkmn_name), None)
+
+
+def compile_futuresight_decrement(side):
+    return (OP_CHANGE_FUTURE_SIGHT_TURNS, side, -1, None), (OP_CHANGE_FUTURE_SIGHT_TURNS, side, 1, None)
+
+
+def compile_disable_move(side, move_name):
+    return (OP_SET_MOVE_DISABLED, side, move_name, True), (OP_SET_MOVE_DISABLED, side, move_name, False)
+
+
+def compile_enable_move(side, move_name):
+    return (OP_SET_MOVE_DISABLED, side, move_name, False), (OP_SET_MOVE_DISABLED, side, move_name, True)
+
+
+def compile_weather_start(weather, old_weather):
+    return (OP_SET_WEATHER, None, weather, None), (OP_SET_WEATHER, None, old_weather, None)
+
+
+def compile_field_start(field, old_field):
+    return (OP_SET_FIELD, None, field, None), (OP_SET_FIELD, None, old_field, None)
+
+
+def compile_field_end(old_field):
+    return (OP_SET_FIELD, None, None, None), (OP_SET_FIELD, None, old_field, None)
+
+
+def compile_toggle_trickroom():
+    return (OP_TOGGLE_TRICK_ROOM, None, None, None), (OP_TOGGLE_TRICK_ROOM, None, None, None)
+
+
+def compile_change_type(side, new_types, old_types):
+    return (OP_SET_TYPES, side, new_types, None), (OP_SET_TYPES, side, old_types, None)
+
+
+def compile_change_item(side, new_item, old_item):
+    return (OP_SET_ITEM, side, new_item, None), (OP_SET_ITEM, side, old_item, None)
+
+
+def compile_change_stats(side, new_stats, old_stats):
+    return (OP_SET_STATS, side, new_stats, None), (OP_SET_STATS, side, old_stats, None)
+
+
+compilers = {
+    constants.MUTATOR_SWITCH: compile_switch,
+    constants.MUTATOR_APPLY_VOLATILE_STATUS: compile_apply_volatile_status,
+    constants.MUTATOR_REMOVE_VOLATILE_STATUS: compile_remove_volatile_status,
+    constants.MUTATOR_DAMAGE: compile_damage,
+    constants.MUTATOR_HEAL: compile_heal,
+    constants.MUTATOR_BOOST: compile_boost,
+    constants.MUTATOR_UNBOOST: compile_unboost,
+    constants.MUTATOR_APPLY_STATUS: compile_apply_status,
+    constants.MUTATOR_REMOVE_STATUS: compile_remove_status,
+    constants.MUTATOR_SIDE_START: compile_side_start,
+    constants.MUTATOR_SIDE_END: compile_side_end,
+    constants.MUTATOR_WISH_START: compile_wish_start,
+    constants.MUTATOR_WISH_DECREMENT: compile_wish_decrement,
+    constants.MUTATOR_FUTURESIGHT_START: compile_futuresight_start,
+    constants.MUTATOR_FUTURESIGHT_DECREMENT: compile_futuresight_decrement,
+    constants.MUTATOR_DISABLE_MOVE: compile_disable_move,
+    constants.MUTATOR_ENABLE_MOVE: compile_enable_move,
+    constants.MUTATOR_WEATHER_START: compile_weather_start,
+    constants.MUTATOR_FIELD_START: compile_field_start,
+    constants.MUTATOR_FIELD_END: compile_field_end,
+    constants.MUTATOR_TOGGLE_TRICKROOM: compile_toggle_trickroom,
+    constants.MUTATOR_CHANGE_TYPE: compile_change_type,
+    constants.MUTATOR_CHANGE_ITEM: compile_change_item,
+    constants.MUTATOR_CHANGE_STATS: compile_change_stats
+}
+
+
+def compile_instruction(instruction):
+    try:
+        compiler = compilers[instruction[0]]
+    except KeyError:
+        raise ValueError("Cannot compile instruction: {}".format(instruction))
+
+    args = instruction[1:]
+    if args and args[0] in SIDE_INDICES:
+        args = (SIDE_INDICES[args[0]],) + args[1:]
+    return compiler(*args)
+
+
+class CompiledInstructions:
+    """
+    The compiled operations for a list of instructions
+
+    Both lists of operations are in the same order as the instructions.
+    An InstructionSequence builds these from the operations that each of its instructions was compiled to once.
+    """
+    __slots__ = ('apply_operations', 'reverse_operations')
+
+    def __init__(self, apply_operations, reverse_operations):
+        self.apply_operations = apply_operations
+        self.reverse_operations = reverse_operations
+
+    def __repr__(self):
+        return "CompiledInstructions({})".format(self.apply_operations)
+
+
+def compile_instructions(instructions):
+    """Translates a list of instruction tuples, as emitted by the instruction_generator,
+       into the operations that StateMutator.apply_compiled and reverse_compiled execute"""
+    operations = [compile_instruction(instruction) for instruction in instructions]
+    return CompiledInstructions(
+        [apply_operation for apply_operation, _ in operations],
+        [reverse_operation for _, reverse_operation in operations]
+    )
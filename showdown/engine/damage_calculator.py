@@ -5,6 +5,8 @@ import constants
 from data import all_move_json
 from data import pokedex
 
+from .bounded_cache import BoundedCache
+
 
 pokemon_type_indicies = {
     'normal': 0,
@@ -51,6 +53,18 @@ damage_multipication_array = [[1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1/2, 0, 1, 1,
                               [1, 1/2, 1, 1, 1, 1, 2, 1/2, 1, 1, 1, 1, 1, 1, 2, 2, 1/2, 1, 1],
                               [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]]
 
+TYPELESS_INDEX = pokemon_type_indicies['typeless']
+
+# type_effectiveness_table[attacking_type][primary_type][secondary_type] is the
+# multiplier against a pokemon with those two types, so a dual-type lookup is a single index
+type_effectiveness_table = [
+    [
+        [multipliers[primary] * multipliers[secondary] for secondary in range(len(multipliers))]
+        for primary in range(len(multipliers))
+    ]
+    for multipliers in damage_multipication_array
+]
+
 
 SPECIAL_LOGIC_MOVES = {
     "seismictoss": lambda attacker, defender: [int(attacker.level)] if "ghost" not in defender.types else None,
@@ -67,13 +81,55 @@ SPECIAL_LOGIC_MOVES = {
 TERRAIN_DAMAGE_BOOST = 1.3
 
 
+# the same attacker, defender and move are seen over and over again during a search
+# the damage rolls are cached by every attribute of the pokemon, move, and conditions that the calculation reads
+DAMAGE_CACHE_MAX_SIZE = 100000
+damage_cache = BoundedCache(DAMAGE_CACHE_MAX_SIZE)
+
+
+def damage_cache_key(attacker, defender, attacking_move, conditions, calc_type):
+    return (
+        attacker.id,
+        attacker.level,
+        tuple(attacker.types),
+        attacker.ability,
+        attacker.item,
+        attacker.status,
+        attacker.terastallized,
+        attacker.attack,
+        attacker.special_attack,
+        attacker.attack_boost,
+        attacker.special_attack_boost,
+        frozenset(attacker.volatile_status),
+        tuple(defender.types),
+        defender.ability,
+        defender.item,
+        defender.defense,
+        defender.special_defense,
+        defender.defense_boost,
+        defender.special_defense_boost,
+        frozenset(defender.volatile_status),
+        attacking_move[constants.ID],
+        attacking_move[constants.BASE_POWER],
+        attacking_move[constants.TYPE],
+        attacking_move[constants.CATEGORY],
+        attacking_move.get(constants.PRIORITY),
+        conditions.get(constants.WEATHER),
+        conditions.get(constants.TERRAIN),
+        bool(conditions.get(constants.REFLECT)),
+        bool(conditions.get(constants.LIGHT_SCREEN)),
+        bool(conditions.get(constants.AURORA_VEIL)),
+        calc_type,
+        TERRAIN_DAMAGE_BOOST
+    )
+
+
 def _calculate_damage(attacker, defender, move, conditions=None, calc_type='average'):
     # This function assumes the `move` dictionary has already been updated to account for move/item/ability special-effects
     # You may want to use `calculate_damage`
 
-    acceptable_calc_types = ['average', 'min', 'max', 'min_max', 'min_max_average', 'all']
-    if calc_type not in acceptable_calc_types:
-        raise ValueError("{} is not one of {}".format(calc_type, acceptable_calc_types))
+    if calc_type not in constants.DAMAGE_CALC_TYPES:
+        raise ValueError("{} is not one of {}".format(calc_type, constants.DAMAGE_CALC_TYPES))
 
     attacking_move = get_move(move)
     if attacking_move is None:
@@ -100,6 +156,16 @@ def _calculate_damage(attacker, defender, move, conditions=None, calc_type='aver
     if conditions is None:
         conditions = {}
 
+    key = damage_cache_key(attacker, defender, attacking_move, conditions, calc_type)
+    damage_rolls = damage_cache.get(key)
+    if damage_rolls is None:
+        damage_rolls = _calculate_damage_rolls(attacker, defender, attacking_move, attack, defense, conditions, calc_type)
+        damage_cache.set(key, damage_rolls)
+
+    return list(damage_rolls)
+
+
+def _calculate_damage_rolls(attacker, defender, attacking_move, attack, defense, conditions, calc_type):
     attacking_stats = attacker.calculate_boosted_stats()
     defending_stats = defender.calculate_boosted_stats()
 
@@ -114,16 +180,20 @@ def _calculate_damage(attacker, defender, move, conditions=None, calc_type='aver
         elif defense == constants.SPECIAL_ATTACK:
             attacking_stats[attack] = attacker.special_attack
 
+    # the defender's cached type indices are used unless the move changes which types it has
     defending_types = defender.types
+    defending_type_indices = defender.get_type_indices()
     if attacking_move[constants.ID] == 'thousandarrows' and 'flying' in defending_types:
         defending_types = copy(defender.types)
         defending_types.remove('flying')
+        defending_type_indices = get_type_indices(defending_types)
     if attacking_move[constants.TYPE] == 'ground' and constants.ROOST in defender.volatile_status:
         defending_types = copy(defender.types)
         try:
             defending_types.remove('flying')
         except ValueError:
             pass
+        defending_type_indices = get_type_indices(defending_types)
 
     # rock types get 1.5x SPDEF in sand
     # ice types get 1.5x DEF in snow
@@ -147,27 +217,31 @@ def _calculate_damage(attacker, defender, move, conditions=None, calc_type='aver
     damage = int(int((2 * attacker.level) / 5) + 2) * attacking_move[constants.BASE_POWER]
     damage = int(damage * attacking_stats[attack] / defending_stats[defense])
     damage = int(damage / 50) + 2
-    damage *= calculate_modifier(attacker, defender, defending_types, attacking_move, conditions)
+    damage *= calculate_modifier(attacker, defender, defending_types, defending_type_indices, attacking_move, conditions)
 
     damage_rolls = get_damage_rolls(damage, calc_type)
 
-    return list(set(damage_rolls))
+    return tuple(set(damage_rolls))
 
 
-def is_super_effective(move_type, defending_pokemon_types):
-    multiplier = type_effectiveness_modifier(move_type, defending_pokemon_types)
+def is_super_effective(move_type, defending_pokemon):
+    multiplier = type_effectiveness_against_pokemon(move_type, defending_pokemon)
     return multiplier > 1
 
 
-def is_not_very_effective(move_type, defending_pokemon_types):
-    multiplier = type_effectiveness_modifier(move_type, defending_pokemon_types)
+def is_not_very_effective(move_type, defending_pokemon):
+    multiplier = type_effectiveness_against_pokemon(move_type, defending_pokemon)
     return multiplier < 1
 
 
-def calculate_modifier(attacker, defender, defending_types, attacking_move, conditions):
+def calculate_modifier(attacker, defender, defending_types, defending_type_indices, attacking_move, conditions):
 
     modifier = 1
-    modifier *= type_effectiveness_modifier(attacking_move[constants.TYPE], defending_types)
+    if defending_type_indices is None:
+        modifier *= type_effectiveness_modifier(attacking_move[constants.TYPE], defending_types)
+    else:
+        primary, secondary = defending_type_indices
+        modifier *= type_effectiveness_table[pokemon_type_indicies[attacking_move[constants.TYPE]]][primary][secondary]
     modifier *= weather_modifier(attacking_move, conditions.get(constants.WEATHER))
     modifier *= stab_modifier(attacker, attacking_move)
     modifier *= burn_modifier(attacker, attacking_move)
@@ -231,14 +305,79 @@ def get_damage_rolls(damage, calc_type):
         ]
 
 
-def type_effectiveness_modifier(attacking_move_type, defending_types):
-    modifier = 1
-    attacking_type_index = pokemon_type_indicies[attacking_move_type]
-    for pkmn_type in defending_types:
-        defending_type_index = pokemon_type_indicies[pkmn_type]
-        modifier *= damage_multipication_array[attacking_type_index][defending_type_index]
+ALL_DAMAGE_ROLLS = (0.85, 0.86, 0.87, 0.88, 0.89, 0.90, 0.91, 0.92, 0.93, 0.94, 0.95, 0.96, 0.97, 0.98, 0.99, 1)
 
-    return modifier
+
+def calculate_damage_rolls_batch(levels, attacking_stats, defending_stats, base_powers, move_types, defending_types, modifiers=None):
+    """
+    Calculates all 16 damage rolls for many attacker/defender/move pairings at once
+
+    Every argument is a sequence with one entry per pairing.
+    The stats are the boosted attacking and defending stats that the move uses, the same as `_calculate_damage`
+    uses after looking at the move's category. `move_types` and `defending_types` are indices into
+    `pokemon_type_indicies`; `defending_types` has two columns per pairing, use 'typeless' for a mono-type.
+    `modifiers` are any other modifiers (stab, weather, burn, screens, ...) already multiplied together.
+    Special-logic moves and moves with 0 base power are not handled here.
+
+    numpy is only needed by this function so it is imported here
+
+    :return: an array of shape (pairings, 16) with the damage rolls from lowest to highest
+    """
+    import numpy as np
+
+    levels = np.asarray(levels, dtype=np.float64)
+    attacking_stats = np.asarray(attacking_stats, dtype=np.float64)
+    defending_stats = np.asarray(defending_stats, dtype=np.float64)
+    base_powers = np.asarray(base_powers, dtype=np.float64)
+    move_types = np.asarray(move_types, dtype=np.intp)
+    defending_types = np.asarray(defending_types, dtype=np.intp).reshape(len(move_types), -1)
+
+    effectiveness = np.asarray(damage_multipication_array, dtype=np.float64)
+    type_modifiers = effectiveness[move_types[:, None], defending_types].prod(axis=1)
+
+    damage = (np.floor(2 * levels / 5) + 2) * base_powers
+    damage = np.floor(damage * attacking_stats / defending_stats)
+    damage = np.floor(damage / 50) + 2
+    if modifiers is not None:
+        type_modifiers = type_modifiers * np.asarray(modifiers, dtype=np.float64)
+    damage = damage * type_modifiers
+
+    return np.floor(damage[:, None] * np.asarray(ALL_DAMAGE_ROLLS, dtype=np.float64)).astype(np.int64)
+
+
+def get_type_indices(types):
+    # the (primary, secondary) indices into `type_effectiveness_table`
+    # a mono-type pokemon's secondary type is typeless
+    # None is returned for a pokemon with more than two types, which can happen with moves like forestscurse
+    if len(types) > 2:
+        return None
+    indices = [pokemon_type_indicies[t] for t in types]
+    indices.extend([TYPELESS_INDEX] * (2 - len(indices)))
+    return tuple(indices)
+
+
+def type_effectiveness_modifier(attacking_move_type, defending_types):
+    type_indices = get_type_indices(defending_types)
+    if type_indices is None:
+        modifier = 1
+        attacking_type_index = pokemon_type_indicies[attacking_move_type]
+        for pkmn_type in defending_types:
+            defending_type_index = pokemon_type_indicies[pkmn_type]
+            modifier *= damage_multipication_array[attacking_type_index][defending_type_index]
+        return modifier
+
+    primary, secondary = type_indices
+    return type_effectiveness_table[pokemon_type_indicies[attacking_move_type]][primary][secondary]
+
+
+def type_effectiveness_against_pokemon(attacking_move_type, defending_pokemon):
+    # the same as `type_effectiveness_modifier` using the type indices that the pokemon has cached
+    type_indices = defending_pokemon.get_type_indices()
+    if type_indices is None:
+        return type_effectiveness_modifier(attacking_move_type, defending_pokemon.types)
+
+    primary, secondary = type_indices
+    return type_effectiveness_table[pokemon_type_indicies[attacking_move_type]][primary][secondary]
 
 
 def weather_modifier(attacking_move, weather):
@@ -1,6 +1,8 @@
 import constants
 from data import effectiveness
 
+from .bounded_cache import BoundedCache
+
 
 class Scoring:
     POKEMON_ALIVE_STATIC = 75
@@ -69,12 +71,51 @@ class Scoring:
     }
 
 
+# the same pokemon are evaluated over and over again during a search
+# the scores are cached by every attribute of the pokemon that the evaluation reads
+# the static score of being alive is changed for random battles, so it is added to the cached score instead of being cached with it
+POKEMON_SCORE_CACHE_MAX_SIZE = 10000
+pokemon_score_cache = BoundedCache(POKEMON_SCORE_CACHE_MAX_SIZE)
+
+
+def pokemon_score_cache_key(pkmn):
+    return (
+        pkmn.hp,
+        pkmn.maxhp,
+        pkmn.attack_boost,
+        pkmn.defense_boost,
+        pkmn.special_attack_boost,
+        pkmn.special_defense_boost,
+        pkmn.speed_boost,
+        pkmn.accuracy_boost,
+        pkmn.evasion_boost,
+        pkmn.status,
+        pkmn.burn_multiplier,
+        frozenset(pkmn.volatile_status)
+    )
+
+
 def evaluate_pokemon(pkmn):
-    score = 0
     if pkmn.hp <= 0:
-        return score
+        return 0
+
+    key = pokemon_score_cache_key(pkmn)
+    score = pokemon_score_cache.get(key)
+    if score is None:
+        score = _evaluate_pokemon_condition(pkmn)
+        pokemon_score_cache.set(key, score)
+
+    return round(Scoring.POKEMON_ALIVE_STATIC + score)
+
+
+def _evaluate_pokemon(pkmn):
+    # You may want to use `evaluate_pokemon`
+    return round(Scoring.POKEMON_ALIVE_STATIC + _evaluate_pokemon_condition(pkmn))
 
-    score += Scoring.POKEMON_ALIVE_STATIC
+
+def _evaluate_pokemon_condition(pkmn):
+    # the score of an alive pokemon's hp, boosts and statuses
+    score = 0
     score += Scoring.POKEMON_HP * (float(pkmn.hp) / pkmn.maxhp)
 
     # boosts have diminishing returns
@@ -98,27 +139,38 @@ def evaluate_pokemon(pkmn):
         except KeyError:
             pass
 
-    return round(score)
+    return score
 
 
-def evaluate(state):
+def evaluate_reserve(side):
+    # the total score of a side's reserve pokemon and how many of them are still alive
+    score = 0
+    alive_count = 0
+    for pkmn in side.reserve.values():
+        score += evaluate_pokemon(pkmn)
+        if pkmn.hp > 0:
+            alive_count += 1
+    return score, alive_count
+
+
+def evaluate_with_reserves(state, user_reserve, opponent_reserve):
+    """The same score as `evaluate`, with the (score, alive count) of each side's reserve already known
+       Only the active pokemon, the side-conditions and the matchup are looked at"""
     score = 0
 
+    user_reserve_score, bot_alive_reserve_count = user_reserve
+    opponent_reserve_score, opponent_alive_reserves_count = opponent_reserve
+
     number_of_opponent_reserve_revealed = len(state.opponent.reserve) + 1
-    bot_alive_reserve_count = len([p.hp for p in state.user.reserve.values() if p.hp > 0])
-    opponent_alive_reserves_count = len([p for p in state.opponent.reserve.values() if p.hp > 0]) + (6-number_of_opponent_reserve_revealed)
+    opponent_alive_reserves_count += (6-number_of_opponent_reserve_revealed)
 
     # evaluate the bot's pokemon
     score += evaluate_pokemon(state.user.active)
-    for pkmn in state.user.reserve.values():
-        this_pkmn_score = evaluate_pokemon(pkmn)
-        score += this_pkmn_score
+    score += user_reserve_score
 
     # evaluate the opponent's visible pokemon
     score -= evaluate_pokemon(state.opponent.active)
-    for pkmn in state.opponent.reserve.values():
-        this_pkmn_score = evaluate_pokemon(pkmn)
-        score -= this_pkmn_score
+    score -= opponent_reserve_score
 
     # evaluate the side-conditions for the bot
     for condition, count in state.user.side_conditions.items():
@@ -142,3 +194,7 @@ def evaluate(state):
         pass
 
     return int(score)
+
+
+def evaluate(state):
+    return evaluate_with_reserves(state, evaluate_reserve(state.user), evaluate_reserve(state.opponent))
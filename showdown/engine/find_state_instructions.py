@@ -210,7 +210,7 @@ def cannot_use_move(attacking_pokemon, attacking_move):
     return constants.TAUNT in attacking_pokemon.volatile_status and attacking_move[constants.CATEGORY] not in constants.DAMAGING_CATEGORIES
 
 
-def get_state_instructions_from_move(mutator, attacking_move, defending_move, attacker, defender, first_move, instructions):
+def get_state_instructions_from_move(mutator, attacking_move, defending_move, attacker, defender, first_move, instructions, calc_type=None):
     instructions.frozen = False
 
     if constants.SWITCH_STRING in attacking_move:
@@ -221,7 +221,7 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
     if not first_move and constants.DRAG in defending_move.get(constants.FLAGS, {}):
         return [instructions]
 
-    mutator.apply(instructions.instructions)
+    mutator.move_to(instructions)
     attacking_side = instruction_generator.get_side_from_state(mutator.state, attacker)
     defending_side = instruction_generator.get_side_from_state(mutator.state, defender)
     attacking_pokemon = attacking_side.active
@@ -243,7 +243,6 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
         # if the attacker is dead, remove the 'flinched' volatile-status if it has it and exit early
         # this triggers if the pokemon moves second but the first attack knocked it out
         instructions = instruction_generator.get_instructions_from_flinched(mutator, attacker, instructions)
-        mutator.reverse(instructions.instructions)
         return [instructions]
 
     attacking_move = update_attacking_move(
@@ -268,8 +267,8 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
         defending_pokemon
     )
     if ability_before_move_instructions is not None and not instructions.frozen:
-        mutator.apply(ability_before_move_instructions)
         instructions.instructions += ability_before_move_instructions
+        mutator.move_to(instructions)
 
     damage_amounts = None
     move_status_effect = None
@@ -301,7 +300,7 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
             defending_pokemon,
             attacking_move,
             conditions=conditions,
-            calc_type=ShowdownConfig.damage_calc_type
+            calc_type=calc_type or ShowdownConfig.damage_calc_type
         )
 
         attacking_move_secondary = attacking_move[constants.SECONDARY]
@@ -353,8 +352,6 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
             boosts_target = attacker if attacking_move[constants.TARGET] in constants.MOVE_TARGET_SELF else defender
             boosts_chance = attacking_move[constants.ACCURACY]
 
-    mutator.reverse(instructions.instructions)
-
     all_instructions = instruction_generator.get_instructions_from_statuses_that_freeze_the_state(mutator, attacker, defender, attacking_move, defending_move, instructions)
 
     temp_instructions = []
@@ -435,6 +432,8 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
     if switch_out_move_triggered(attacking_move, damage_amounts):
         temp_instructions = []
         for i in all_instructions:
+            # the best switch is searched for from the state at the start of the turn
+            mutator.move_to_start()
             best_switch = get_best_switch_pokemon(mutator, i, attacker, attacking_side, defending_move, first_move)
             if best_switch is not None:
                 temp_instructions.append(instruction_generator.get_instructions_from_switch(mutator, attacker, best_switch, i))
@@ -459,6 +458,89 @@ def remove_duplicate_instructions(list_of_instructions):
     return new_instructions
 
 
+def merge_instructions_by_resulting_state(mutator, list_of_instructions):
+    """Merges the instructions that result in the same state by using the mutator's hash of each resulting state
+       Different instructions often have the same result, for example two damage rolls that both knock out the defender,
+       so the search only needs to look at each resulting state once"""
+    if len(list_of_instructions) < 2:
+        return list_of_instructions
+
+    instructions_by_resulting_state = dict()
+    for instructions in list_of_instructions:
+        mutator.apply_compiled(instructions.compile())
+        resulting_state_hash = mutator.state_hash
+        mutator.reverse_compiled(instructions.compile())
+
+        try:
+            instructions_by_resulting_state[resulting_state_hash].percentage += instructions.percentage
+        except KeyError:
+            instructions_by_resulting_state[resulting_state_hash] = instructions
+
+    return list(instructions_by_resulting_state.values())
+
+
+def get_move_key(move):
+    return move.get(constants.ID), move.get(constants.SWITCH_STRING)
+
+
+def get_defending_move_key(state, attacking_move, defending_move, attacker):
+    """The parts of the defending move that can change the outcome of the move that is used first in a turn:
+         - whether it is a damaging move or a switch, which moves like suckerpunch and pursuit check
+         - the move itself, if the attacker is frozen (some moves thaw the pokemon they hit)
+           or if the attacker uses a pivot move (the best switch is searched for against it)
+       Any other defending move with the same key results in the same instructions"""
+    attacking_pokemon = instruction_generator.get_side_from_state(state, attacker).active
+    if attacking_move.get(constants.ID) in constants.SWITCH_OUT_MOVES or attacking_pokemon.status == constants.FROZEN:
+        defending_move_id = defending_move.get(constants.ID)
+    else:
+        defending_move_id = None
+
+    return defending_move.get(constants.CATEGORY) in constants.DAMAGING_CATEGORIES, constants.SWITCH_STRING in defending_move, defending_move_id
+
+
+class TurnCache:
+    """
+    The instructions of the move that is used first in a turn, shared between the move pairs of one node of a search
+
+    The move that is used first only depends on the state the turn starts from, the attacking move,
+    and a few parts of the defending move, so it is shared by every option of the other side that has the same effect.
+
+    A TurnCache must only be used for turns that start from the same state.
+    """
+    __slots__ = ('first_move_instructions', 'hits', 'misses')
+
+    def __init__(self):
+        self.first_move_instructions = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return "TurnCache(hits={}, misses={})".format(self.hits, self.misses)
+
+
+def get_first_move_instructions(mutator, attacking_move, defending_move, attacker, defender, calc_type=None, turn_cache=None):
+    if turn_cache is None:
+        return get_state_instructions_from_move(mutator, attacking_move, defending_move, attacker, defender, True, TransposeInstruction(1.0, [], False), calc_type=calc_type)
+
+    key = (
+        attacker,
+        get_move_key(attacking_move),
+        get_defending_move_key(mutator.state, attacking_move, defending_move, attacker),
+        calc_type or ShowdownConfig.damage_calc_type
+    )
+    try:
+        cached_instructions = turn_cache.first_move_instructions[key]
+    except KeyError:
+        turn_cache.misses += 1
+        instructions = get_state_instructions_from_move(mutator, attacking_move, defending_move, attacker, defender, True, TransposeInstruction(1.0, [], False), calc_type=calc_type)
+        # the rest of the turn is added to the TransposeInstructions that are returned, so copies are kept
+        turn_cache.first_move_instructions[key] = [copy(instruction) for instruction in instructions]
+        return instructions
+
+    turn_cache.hits += 1
+    return [copy(instruction) for instruction in cached_instructions]
+
+
 def end_of_turn_triggered(user_move, opponent_move):
     if user_move.startswith(constants.SWITCH_STRING + ' ') and opponent_move == constants.DO_NOTHING_MOVE:
         return False
@@ -468,23 +550,27 @@ def end_of_turn_triggered(user_move, opponent_move):
     return True
 
 
-def get_all_state_instructions(mutator, user_move_string, opponent_move_string):
+def get_all_state_instructions(mutator, user_move_string, opponent_move_string, calc_type=None, turn_cache=None):
+    # `calc_type` overrides ShowdownConfig.damage_calc_type for the damage rolls of this turn
+    # `turn_cache` is a TurnCache shared by the move pairs that start from the mutator's current state
     user_move = lookup_move(user_move_string)
     opponent_move = lookup_move(opponent_move_string)
 
     bot_moves_first = user_moves_first(mutator.state, user_move, opponent_move)
 
-    instructions = TransposeInstruction(1.0, [], False)
+    # the generator keeps the mutator positioned at the branch it is working on
+    # and it is put back at the state the turn started from when every branch has been generated
+    outer_position = mutator.start_positioning()
 
     all_instructions = []
     if bot_moves_first:
-        instructions = get_state_instructions_from_move(mutator, user_move, opponent_move, constants.USER, constants.OPPONENT, True, instructions)
+        instructions = get_first_move_instructions(mutator, user_move, opponent_move, constants.USER, constants.OPPONENT, calc_type=calc_type, turn_cache=turn_cache)
         for instruction in instructions:
-            all_instructions += get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.USER, False, instruction)
+            all_instructions += get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.USER, False, instruction, calc_type=calc_type)
     else:
-        instructions = get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.USER, True, instructions)
+        instructions = get_first_move_instructions(mutator, opponent_move, user_move, constants.OPPONENT, constants.USER, calc_type=calc_type, turn_cache=turn_cache)
         for instruction in instructions:
-            all_instructions += get_state_instructions_from_move(mutator, user_move, opponent_move, constants.USER, constants.OPPONENT, False, instruction)
+            all_instructions += get_state_instructions_from_move(mutator, user_move, opponent_move, constants.USER, constants.OPPONENT, False, instruction, calc_type=calc_type)
 
     if end_of_turn_triggered(user_move_string, opponent_move_string):
         temp_instructions = []
@@ -492,6 +578,7 @@ def get_all_state_instructions(mutator, user_move_string, opponent_move_string):
             temp_instructions += instruction_generator.get_end_of_turn_instructions(mutator, instruction_set, user_move, opponent_move, bot_moves_first)
         all_instructions = temp_instructions
 
+    mutator.stop_positioning(outer_position)
     all_instructions = remove_duplicate_instructions(all_instructions)
 
     return all_instructions
@@ -3,7 +3,7 @@ from copy import copy
 import constants
 import logging
 
-from .damage_calculator import type_effectiveness_modifier
+from .damage_calculator import type_effectiveness_against_pokemon
 from .special_effects.abilities.on_switch_in import ability_on_switch_in
 from .special_effects.items.on_switch_in import item_on_switch_in
 from .special_effects.items.end_of_turn import item_end_of_turn
@@ -65,10 +65,9 @@ def get_instructions_from_move_special_effect(mutator, attacking_side, attacking
     except AttributeError:
         new_instructions = list()
     else:
-        mutator.apply(instructions.instructions)
+        mutator.move_to(instructions)
         new_instructions = special_logic_move_function(mutator, attacking_side, get_side_from_state(mutator.state, attacking_side), attacking_pokemon, defending_pokemon)
         new_instructions = new_instructions or list()
-        mutator.reverse(instructions.instructions)
 
     for i in new_instructions:
         instructions.add_instruction(i)
@@ -89,9 +88,8 @@ def get_instructions_from_volatile_statuses(mutator, volatile_status, attacker,
         return [instruction]
 
     side = get_side_from_state(mutator.state, affected_side)
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
     if volatile_status in side.active.volatile_status:
-        mutator.reverse(instruction.instructions)
         return [instruction]
 
     if can_be_volatile_statused(side, volatile_status, first_move) and volatile_status not in side.active.volatile_status:
@@ -100,7 +98,6 @@ def get_instructions_from_volatile_statuses(mutator, volatile_status, attacker,
             affected_side,
             volatile_status
         )
-        mutator.reverse(instruction.instructions)
         instruction.add_instruction(apply_status_instruction)
         if volatile_status == constants.SUBSTITUTE:
             instruction.add_instruction(
@@ -110,8 +107,6 @@ def get_instructions_from_volatile_statuses(mutator, volatile_status, attacker,
                     side.active.maxhp * 0.25
                 )
             )
-    else:
-        mutator.reverse(instruction.instructions)
 
     return [instruction]
 
@@ -122,7 +117,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
 
     attacking_side = get_side_from_state(mutator.state, attacker)
     defending_side = get_side_from_state(mutator.state, opposite_side[attacker])
-    mutator.apply(instructions.instructions)
+    mutator.move_to(instructions)
     instruction_additions = remove_volatile_status_and_boosts_instructions(attacking_side, attacker)
     mutator.apply(instruction_additions)
 
@@ -167,7 +162,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
 
         # account for stealth rock damage
         if attacking_side.side_conditions[constants.STEALTH_ROCK] == 1:
-            multiplier = type_effectiveness_modifier('rock', switch_pkmn.types)
+            multiplier = type_effectiveness_against_pokemon('rock', switch_pkmn)
             stealth_rock_instruction = (
                 constants.MUTATOR_DAMAGE,
                 attacker,
@@ -254,7 +249,6 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
             instruction_additions.append(i)
 
     mutator.reverse(instruction_additions)
-    mutator.reverse(instructions.instructions)
     for i in instruction_additions:
         instructions.add_instruction(i)
 
@@ -273,8 +267,8 @@ def get_instructions_from_flinched(mutator, attacker, instruction):
             attacker,
             constants.FLINCH
         )
-        mutator.apply_one(remove_flinch_instruction)
         instruction.add_instruction(remove_flinch_instruction)
+        mutator.move_to(instruction)
         instruction.frozen = True
         return instruction
     else:
@@ -286,7 +280,7 @@ def get_instructions_from_statuses_that_freeze_the_state(mutator, attacker, defe
     attacker_side = get_side_from_state(mutator.state, attacker)
     defender_side = get_side_from_state(mutator.state, defender)
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
 
     if constants.PARALYZED == attacker_side.active.status:
         fully_paralyzed_instruction = copy(instruction)
@@ -330,8 +324,6 @@ def get_instructions_from_statuses_that_freeze_the_state(mutator, attacker, defe
     if move[constants.TYPE] == 'electric' and 'ground' in defender_side.active.types:
         instruction.frozen = True
 
-    mutator.reverse(instruction.instructions)
-
     return instructions
 
 
@@ -350,7 +342,7 @@ def get_instructions_from_damage(mutator, defender, damage, accuracy, attacking_
     drain = attacking_move.get(constants.DRAIN)
     move_flags = attacking_move.get(constants.FLAGS, {})
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
 
     if accuracy is True or "glaiverush" in damage_side.active.volatile_status:
         accuracy = 100
@@ -369,10 +361,7 @@ def get_instructions_from_damage(mutator, defender, damage, accuracy, attacking_
                 attacker,
                 min(int(crash_percent * attacker_side.active.maxhp), attacker_side.active.hp)
             )
-            mutator.reverse(instruction.instructions)
             instruction.add_instruction(crash_instruction)
-        else:
-            mutator.reverse(instruction.instructions)
         instruction.frozen = True
         return [instruction]
 
@@ -496,7 +485,6 @@ def get_instructions_from_damage(mutator, defender, damage, accuracy, attacking_
 
         instructions.append(move_missed_instruction)
 
-    mutator.reverse(instruction.instructions)
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -555,7 +543,7 @@ def get_instructions_from_side_conditions(mutator, attacker_string, side_string,
 
     instruction_additions = []
     side = get_side_from_state(mutator.state, side_string)
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
 
     if condition == constants.WISH:
         if side.wish[0] == 0:
@@ -588,7 +576,6 @@ def get_instructions_from_side_conditions(mutator, attacker_string, side_string,
                 )
             )
 
-    mutator.reverse(instruction.instructions)
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -605,7 +592,7 @@ def get_instructions_from_hazard_clearing_moves(mutator, attacker_string, move,
     defender_string = opposite_side[attacker_string]
 
     instruction_additions = []
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
 
     attacker_side = get_side_from_state(mutator.state, attacker_string)
     defender_side = get_side_from_state(mutator.state, defender_string)
@@ -680,7 +667,6 @@ def get_instructions_from_hazard_clearing_moves(mutator, attacker_string, move,
     else:
         raise ValueError("{} is not a hazard clearing move".format(move[constants.ID]))
 
-    mutator.reverse(instruction.instructions)
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -700,17 +686,15 @@ def get_instructions_from_status_effects(mutator, defender, status, accuracy, in
         accuracy = 100
     percent_hit = accuracy / 100
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
     instruction_additions = []
     defending_side = get_side_from_state(mutator.state, defender)
     attacking_side = get_side_from_state(mutator.state, opposite_side[defender])
 
     if sleep_clause_activated(defending_side, status):
-        mutator.reverse(instruction.instructions)
         return [instruction]
 
     if immune_to_status(mutator.state, defending_side.active, attacking_side.active, status):
-        mutator.reverse(instruction.instructions)
         return [instruction]
 
     move_missed_instruction = copy(instruction)
@@ -738,7 +722,6 @@ def get_instructions_from_status_effects(mutator, defender, status, accuracy, in
             move_missed_instruction.add_instruction(blunder_policy_increase_speed_instruction)
         instructions.append(move_missed_instruction)
 
-    mutator.reverse(instruction.instructions)
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -761,7 +744,7 @@ def get_instructions_from_boosts(mutator, side_string, boosts, accuracy, instruc
         accuracy = 100
     percent_hit = accuracy / 100
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
     side = get_side_from_state(mutator.state, side_string)
 
     instruction_additions = []
@@ -802,7 +785,6 @@ def get_instructions_from_boosts(mutator, side_string, boosts, accuracy, instruc
         move_missed_instruction.update_percentage(1 - percent_hit)
         instructions.append(move_missed_instruction)
 
-    mutator.reverse(instruction.instructions)
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -843,7 +825,7 @@ def get_instructions_from_attacker_recovery(mutator, attacker_string, move, inst
     if instruction.frozen:
         return [instruction]
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
 
     target = move[constants.HEAL_TARGET]
     if target in opposing_side_strings:
@@ -858,7 +840,6 @@ def get_instructions_from_attacker_recovery(mutator, attacker_string, move, inst
         health_recovered = 0
 
     if health_recovered == 0:
-        mutator.reverse(instruction.instructions)
         return [instruction]
 
     final_health = pkmn.hp + health_recovered
@@ -873,8 +854,6 @@ def get_instructions_from_attacker_recovery(mutator, attacker_string, move, inst
         health_recovered
     )
 
-    mutator.reverse(instruction.instructions)
-
     if health_recovered:
         instruction.add_instruction(heal_instruction)
 
@@ -888,7 +867,7 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
     else:
         sides = [constants.OPPONENT, constants.USER]
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
 
     # weather damage - sand and hail
     for attacker in sides:
@@ -904,8 +883,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 max(0, int(min(pkmn.maxhp * 0.0625, pkmn.hp)))
             )
-            mutator.apply_one(sand_damage_instruction)
             instruction.add_instruction(sand_damage_instruction)
+            mutator.move_to(instruction)
 
         elif mutator.state.weather == constants.HAIL and 'ice' not in pkmn.types and pkmn.ability != 'icebody':
             ice_damage_instruction = (
@@ -913,8 +892,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 max(0, int(min(pkmn.maxhp * 0.0625, pkmn.hp)))
             )
-            mutator.apply_one(ice_damage_instruction)
             instruction.add_instruction(ice_damage_instruction)
+            mutator.move_to(instruction)
 
     # futuresight
     for attacker in sides:
@@ -932,15 +911,15 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                     opposite_side[attacker],
                     damage_dealt
                 )
-                mutator.apply_one(futuresight_damage_instruction)
                 instruction.add_instruction(futuresight_damage_instruction)
+                mutator.move_to(instruction)
         if side.future_sight[0] > 0:
             futuresight_decrement_instruction = (
                 constants.MUTATOR_FUTURESIGHT_DECREMENT,
                 attacker,
             )
-            mutator.apply_one(futuresight_decrement_instruction)
             instruction.add_instruction(futuresight_decrement_instruction)
+            mutator.move_to(instruction)
 
     # wish
     for attacker in sides:
@@ -951,15 +930,15 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 min(side.wish[1], side.active.maxhp - side.active.hp)
             )
-            mutator.apply_one(wish_heal_instruction)
             instruction.add_instruction(wish_heal_instruction)
+            mutator.move_to(instruction)
         if side.wish[0] > 0:
             wish_decrement_instruction = (
                 constants.MUTATOR_WISH_DECREMENT,
                 attacker
             )
-            mutator.apply_one(wish_decrement_instruction)
             instruction.add_instruction(wish_decrement_instruction)
+            mutator.move_to(instruction)
 
     # item and ability - they can add one instruction each
     for attacker in sides:
@@ -971,13 +950,13 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
 
         item_instruction = item_end_of_turn(side.active.item, mutator.state, attacker, pkmn, defender, defending_pkmn)
         if item_instruction is not None:
-            mutator.apply_one(item_instruction)
             instruction.add_instruction(item_instruction)
+            mutator.move_to(instruction)
 
         ability_instruction = ability_end_of_turn(side.active.ability, mutator.state, attacker, pkmn, defender, defending_pkmn)
         if ability_instruction is not None:
-            mutator.apply_one(ability_instruction)
             instruction.add_instruction(ability_instruction)
+            mutator.move_to(instruction)
 
     # poison, toxic, and burn damage
     for attacker in sides:
@@ -1003,11 +982,10 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 constants.TOXIC_COUNT,
                 1
             )
-            mutator.apply_one(toxic_damage_instruction)
-            mutator.apply_one(toxic_count_instruction)
 
             instruction.add_instruction(toxic_damage_instruction)
             instruction.add_instruction(toxic_count_instruction)
+            mutator.move_to(instruction)
 
         elif constants.BURN == pkmn.status:
             burn_damage_instruction = (
@@ -1015,8 +993,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 max(0, int(min(pkmn.maxhp * 0.0625, pkmn.hp)))
             )
-            mutator.apply_one(burn_damage_instruction)
             instruction.add_instruction(burn_damage_instruction)
+            mutator.move_to(instruction)
 
         elif constants.POISON == pkmn.status and pkmn.ability != 'poisonheal':
             poison_damage_instruction = (
@@ -1024,8 +1002,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 max(0, int(min(pkmn.maxhp * 0.125, pkmn.hp)))
             )
-            mutator.apply_one(poison_damage_instruction)
             instruction.add_instruction(poison_damage_instruction)
+            mutator.move_to(instruction)
 
     # leechseed sap damage
     for attacker in sides:
@@ -1055,10 +1033,9 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 min(damage_sapped, damage_from_full)
             )
 
-            mutator.apply_one(sap_instruction)
-            mutator.apply_one(heal_instruction)
             instruction.add_instruction(sap_instruction)
             instruction.add_instruction(heal_instruction)
+            mutator.move_to(instruction)
 
     # volatile-statuses
     for attacker in sides:
@@ -1089,10 +1066,9 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                     constants.PROTECT,
                     1
             )
-            mutator.apply_one(remove_protect_volatile_status_instruction)
-            mutator.apply_one(start_protect_side_condition_instruction)
             instruction.add_instruction(remove_protect_volatile_status_instruction)
             instruction.add_instruction(start_protect_side_condition_instruction)
+            mutator.move_to(instruction)
 
         elif side.side_conditions[constants.PROTECT]:
             end_protect_side_condition_instruction = (
@@ -1101,8 +1077,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 constants.PROTECT,
                 side.side_conditions[constants.PROTECT]
             )
-            mutator.apply_one(end_protect_side_condition_instruction)
             instruction.add_instruction(end_protect_side_condition_instruction)
+            mutator.move_to(instruction)
 
         if constants.ROOST in pkmn.volatile_status:
             remove_roost_instruction = (
@@ -1110,8 +1086,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 constants.ROOST,
             )
-            mutator.apply_one(remove_roost_instruction)
             instruction.add_instruction(remove_roost_instruction)
+            mutator.move_to(instruction)
 
         if constants.PARTIALLY_TRAPPED in pkmn.volatile_status:
             damage_taken = max(0, int(min(pkmn.maxhp * 0.125, pkmn.hp)))
@@ -1120,8 +1096,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 damage_taken
             )
-            mutator.apply_one(partially_trapped_damage_instruction)
             instruction.add_instruction(partially_trapped_damage_instruction)
+            mutator.move_to(instruction)
 
         if "saltcure" in pkmn.volatile_status:
             divisor = 4 if any(t in pkmn.types for t in ["water", "steel"]) else 8
@@ -1131,8 +1107,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 damage_taken
             )
-            mutator.apply_one(partially_trapped_damage_instruction)
             instruction.add_instruction(partially_trapped_damage_instruction)
+            mutator.move_to(instruction)
 
     # disable not used moves if choice-item is held
     for attacker in sides:
@@ -1164,10 +1140,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                     attacker,
                     m[constants.ID]
                 )
-                mutator.apply_one(disable_instruction)
                 instruction.add_instruction(disable_instruction)
-
-    mutator.reverse(instruction.instructions)
+                mutator.move_to(instruction)
 
     return [instruction]
 
@@ -1187,10 +1161,9 @@ def get_instructions_from_drag(mutator, attacking_side_string, move_target, inst
     else:
         raise ValueError("Invalid value for move_target: {}".format(move_target))
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
     alive_reserves = [s.id for s in affected_side.reserve.values() if s.hp > 0]
     num_reserve_alive = len(alive_reserves)
-    mutator.reverse(instruction.instructions)
     if num_reserve_alive == 0:
         return [instruction]
 
@@ -1210,13 +1183,12 @@ def get_instructions_from_boost_reset_moves(mutator, attacking_move, attacking_s
     defending_side_string = opposite_side[attacking_side_string]
     defending_side = get_side_from_state(mutator.state, defending_side_string)
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction)
     new_instructions = []
     if attacking_move[constants.TARGET] in constants.MOVE_TARGET_SELF:
         new_instructions += remove_volatile_status_and_boosts_instructions(attacking_side, attacking_side_string)
     if attacking_move[constants.TARGET] in constants.MOVE_TARGET_OPPONENT:
         new_instructions += remove_volatile_status_and_boosts_instructions(defending_side, defending_side_string)
-    mutator.reverse(instruction.instructions)
 
     for new_instruction in new_instructions:
         instruction.add_instruction(new_instruction)
@@ -0,0 +1,125 @@
+from .compiled_instructions import CompiledInstructions
+from .compiled_instructions import compile_instruction
+
+
+class InstructionNode:
+    """
+    One instruction of an InstructionSequence, linked to the node before it
+
+    Nodes are never changed once they are created, so any number of sequences can end in nodes that share a parent.
+    The compiled operations of the instruction are kept on the node, so an instruction in a shared prefix
+    is only compiled once no matter how many branches it ends up in.
+    """
+    __slots__ = ('instruction', 'parent', 'length', 'operations')
+
+    def __init__(self, instruction, parent):
+        self.instruction = instruction
+        self.parent = parent
+        self.length = parent.length + 1 if parent is not None else 1
+        self.operations = None
+
+    def get_operations(self):
+        if self.operations is None:
+            self.operations = compile_instruction(self.instruction)
+        return self.operations
+
+
+class InstructionSequence:
+    """
+    A persistent list of instructions
+
+    The sequence only holds the last node of a chain of InstructionNodes, so copying it is O(1)
+    and every copy shares the instructions it was copied with. Appending to a copy adds a new node
+    after the shared ones and does not affect the sequence it was copied from.
+
+    It behaves like the list of instructions that a TransposeInstruction used to hold:
+    it can be iterated, indexed, compared to a list, appended to and extended.
+    """
+    __slots__ = ('tail', 'compiled_instructions')
+
+    def __init__(self, instructions=()):
+        self.tail = None
+        self.compiled_instructions = None
+        self.extend(instructions)
+
+    def append(self, instruction):
+        self.tail = InstructionNode(instruction, self.tail)
+        self.compiled_instructions = None
+
+    def extend(self, instructions):
+        for instruction in instructions:
+            self.append(instruction)
+
+    def nodes(self):
+        # the nodes from the last instruction to the first
+        node = self.tail
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def compile(self):
+        # the sequence is compiled again after every append
+        # only the instructions that have never been compiled in any sequence are passed to `compile_instruction`
+        if self.compiled_instructions is None:
+            operations = [node.get_operations() for node in self.nodes()]
+            operations.reverse()
+            self.compiled_instructions = CompiledInstructions(
+                [apply_operation for apply_operation, _ in operations],
+                [reverse_operation for _, reverse_operation in operations]
+            )
+        return self.compiled_instructions
+
+    def copy(self):
+        new_sequence = InstructionSequence()
+        new_sequence.tail = self.tail
+        new_sequence.compiled_instructions = self.compiled_instructions
+        return new_sequence
+
+    def __copy__(self):
+        return self.copy()
+
+    def __len__(self):
+        return self.tail.length if self.tail is not None else 0
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __reversed__(self):
+        return (node.instruction for node in self.nodes())
+
+    def __getitem__(self, index):
+        return self.to_list()[index]
+
+    def __iadd__(self, instructions):
+        self.extend(instructions)
+        return self
+
+    def __add__(self, instructions):
+        new_sequence = self.copy()
+        new_sequence.extend(instructions)
+        return new_sequence
+
+    def __eq__(self, other):
+        if isinstance(other, InstructionSequence):
+            if len(self) != len(other):
+                return False
+            node, other_node = self.tail, other.tail
+            # once both sequences reach the same node the rest of their instructions are shared
+            while node is not other_node:
+                if node.instruction != other_node.instruction:
+                    return False
+                node, other_node = node.parent, other_node.parent
+            return True
+        if isinstance(other, (list, tuple)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def to_list(self):
+        instructions = [node.instruction for node in self.nodes()]
+        instructions.reverse()
+        return instructions
+
+    def __repr__(self):
+        return repr(self.to_list())
@@ -0,0 +1,186 @@
+import math
+import random
+import time
+
+import constants
+
+from .find_state_instructions import get_all_state_instructions
+from .find_state_instructions import merge_instructions_by_resulting_state
+from .find_state_instructions import TurnCache
+
+
+# the score of a leaf is squashed into a reward between 0 and 1 relative to the score of the root
+# a difference of SCORE_SCALE is roughly one pokemon's worth of health
+SCORE_SCALE = 100
+
+DEFAULT_EXPLORATION = 1.4
+
+
+def score_to_reward(score, root_score):
+    return 1 / (1 + math.exp(-(score - root_score) / SCORE_SCALE))
+
+
+def select_option(visits, rewards, node_visits, exploration):
+    # UCB1: every option is tried once, after that the option with the best upper confidence bound is used
+    log_node_visits = math.log(node_visits)
+    best_option = None
+    best_bound = float('-inf')
+    for i, option_visits in enumerate(visits):
+        if option_visits == 0:
+            return i
+        bound = rewards[i] / option_visits + exploration * math.sqrt(log_node_visits / option_visits)
+        if bound > best_bound:
+            best_bound = bound
+            best_option = i
+    return best_option
+
+
+def sample_state_instructions(state_instructions, rng):
+    r = rng.random()
+    cumulative_percentage = 0
+    for i, instructions in enumerate(state_instructions):
+        cumulative_percentage += instructions.percentage
+        if r < cumulative_percentage:
+            return i
+    return len(state_instructions) - 1
+
+
+class MonteCarloNode:
+    """
+    A node of a decoupled-UCT tree
+
+    Each side picks its option with its own UCB1 statistics, without knowing what the other side picked.
+    The state instructions for a pair of options are generated the first time the pair is picked,
+    and each of their outcomes leads to a different child node.
+    """
+    __slots__ = (
+        'user_options',
+        'opponent_options',
+        'visits',
+        'user_visits',
+        'user_rewards',
+        'opponent_visits',
+        'opponent_rewards',
+        'state_instructions',
+        'turn_cache',
+        'children'
+    )
+
+    def __init__(self, user_options, opponent_options):
+        self.user_options = user_options
+        self.opponent_options = opponent_options
+        self.visits = 0
+        self.user_visits = [0] * len(user_options)
+        self.user_rewards = [0.0] * len(user_options)
+        self.opponent_visits = [0] * len(opponent_options)
+        self.opponent_rewards = [0.0] * len(opponent_options)
+        self.state_instructions = dict()
+        self.turn_cache = TurnCache()
+        self.children = dict()
+
+    def select(self, exploration):
+        node_visits = max(self.visits, 1)
+        return (
+            select_option(self.user_visits, self.user_rewards, node_visits, exploration),
+            select_option(self.opponent_visits, self.opponent_rewards, node_visits, exploration)
+        )
+
+    def get_state_instructions(self, mutator, i, j):
+        try:
+            return self.state_instructions[(i, j)]
+        except KeyError:
+            state_instructions = merge_instructions_by_resulting_state(
+                mutator,
+                get_all_state_instructions(mutator, self.user_options[i], self.opponent_options[j], turn_cache=self.turn_cache)
+            )
+            self.state_instructions[(i, j)] = state_instructions
+            return state_instructions
+
+    def update(self, i, j, reward):
+        self.visits += 1
+        self.user_visits[i] += 1
+        self.user_rewards[i] += reward
+        self.opponent_visits[j] += 1
+        self.opponent_rewards[j] += 1 - reward
+
+    def get_user_visits(self):
+        return dict(zip(self.user_options, self.user_visits))
+
+    def __repr__(self):
+        return "MonteCarloNode(visits={}, user_visits={})".format(self.visits, self.get_user_visits())
+
+
+def is_leaf(state, opponent_options):
+    # the same positions that `get_payoff_matrix` evaluates without searching any further
+    return (
+        state.battle_is_finished() or
+        (opponent_options == [constants.DO_NOTHING_MOVE] and state.opponent.active.hp == 0)
+    )
+
+
+def run_iteration(mutator, root, root_score, exploration, rng):
+    """
+    Walks down the tree from the root by picking options and sampling their outcomes,
+    adds one new node, evaluates it, and backs its reward up the path that was taken.
+    The mutator's state is put back the way it was when the iteration is done.
+    """
+    node = root
+    path = []
+    applied = []
+    while not is_leaf(mutator.state, node.opponent_options):
+        i, j = node.select(exploration)
+        state_instructions = node.get_state_instructions(mutator, i, j)
+        k = sample_state_instructions(state_instructions, rng)
+
+        instructions = state_instructions[k]
+        mutator.apply_compiled(instructions.compile())
+        applied.append(instructions)
+        path.append((node, i, j))
+
+        child = node.children.get((i, j, k))
+        if child is None:
+            child = MonteCarloNode(*mutator.state.get_all_options())
+            node.children[(i, j, k)] = child
+            break
+        node = child
+
+    reward = score_to_reward(mutator.evaluate(), root_score)
+
+    for node, i, j in path:
+        node.update(i, j, reward)
+
+    for instructions in reversed(applied):
+        mutator.reverse_compiled(instructions.compile())
+
+
+def monte_carlo_tree_search(mutator, user_options, opponent_options, time_budget=None, iterations=None, exploration=DEFAULT_EXPLORATION, rng=None):
+    """
+    Runs decoupled UCT from the mutator's state until the time budget or the number of iterations is used up
+
+    :param mutator: a StateMutator object representing the state of the battle
+    :param user_options: options for the bot
+    :param opponent_options: options for the opponent
+    :param time_budget: the wall-clock time in seconds that may be spent searching
+    :param iterations: the number of iterations to run
+    :param exploration: the UCB1 exploration constant
+    :param rng: an optional random.Random used to sample the outcomes of the state instructions
+    :return: the root MonteCarloNode. The bot's option that was visited the most is the one to use
+    """
+    if time_budget is None and iterations is None:
+        raise ValueError("Either a time_budget or a number of iterations must be given")
+
+    rng = rng or random.Random()
+    deadline = time.time() + time_budget if time_budget is not None else None
+    root = MonteCarloNode(user_options, opponent_options)
+    if is_leaf(mutator.state, opponent_options):
+        return root
+
+    root_score = mutator.evaluate()
+    iteration = 0
+    while iterations is None or iteration < iterations:
+        if deadline is not None and iteration > 0 and time.time() > deadline:
+            break
+        run_iteration(mutator, root, root_score, exploration, rng)
+        iteration += 1
+
+    return root
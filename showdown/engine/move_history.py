@@ -0,0 +1,35 @@
+from collections import defaultdict
+
+
+class MoveHistory:
+    """
+    A history table that orders the options in every node of a single search
+
+    Options that were good in one node of the search are usually good in its siblings too:
+    the bot's move that became the best row, and the opponent's move that refuted a row.
+    Both are credited with depth * depth so that results from deeper in the tree count for more,
+    and each node searches its options with the highest credit first.
+    Searching the best row first and the refuting reply first is what lets `prune` cut the most cells.
+
+    The table is keyed by (option, depth) and should only be shared between the nodes of one search.
+    """
+    __slots__ = ('user_history', 'opponent_history')
+
+    def __init__(self):
+        self.user_history = defaultdict(int)
+        self.opponent_history = defaultdict(int)
+
+    def order_user_options(self, user_options, depth):
+        return sorted(user_options, key=lambda option: self.user_history.get((option, depth), 0), reverse=True)
+
+    def order_opponent_options(self, opponent_options, depth):
+        return sorted(opponent_options, key=lambda option: self.opponent_history.get((option, depth), 0), reverse=True)
+
+    def record_best_user_option(self, user_option, depth):
+        self.user_history[(user_option, depth)] += depth * depth
+
+    def record_refutation(self, opponent_option, depth):
+        self.opponent_history[(opponent_option, depth)] += depth * depth
+
+    def __repr__(self):
+        return "MoveHistory(user={}, opponent={})".format(dict(self.user_history), dict(self.opponent_history))
@@ -1,9 +1,39 @@
+import random
 from collections import defaultdict
-from copy import copy
 
 import constants
+from config import ShowdownConfig
 from data import all_move_json
 
+from .bounded_cache import BoundedCache
+from .damage_calculator import get_type_indices
+from .evaluate import evaluate
+from .evaluate import evaluate_pokemon
+from .evaluate import evaluate_reserve
+from .evaluate import evaluate_with_reserves
+from .compiled_instructions import SIDE_INDICES
+from .compiled_instructions import SIDE_STRINGS
+from .compiled_instructions import boost_attributes
+from .compiled_instructions import OP_CHANGE_HP
+from .compiled_instructions import OP_CHANGE_BOOST
+from .compiled_instructions import OP_SET_STATUS
+from .compiled_instructions import OP_ADD_VOLATILE_STATUS
+from .compiled_instructions import OP_REMOVE_VOLATILE_STATUS
+from .compiled_instructions import OP_CHANGE_SIDE_CONDITION
+from .compiled_instructions import OP_SWITCH
+from .compiled_instructions import OP_SET_WISH
+from .compiled_instructions import OP_CHANGE_WISH_TURNS
+from .compiled_instructions import OP_SET_FUTURE_SIGHT
+from .compiled_instructions import OP_CHANGE_FUTURE_SIGHT_TURNS
+from .compiled_instructions import OP_SET_MOVE_DISABLED
+from .compiled_instructions import OP_SET_WEATHER
+from .compiled_instructions import OP_SET_FIELD
+from .compiled_instructions import OP_TOGGLE_TRICK_ROOM
+from .compiled_instructions import OP_SET_TYPES
+from .compiled_instructions import OP_SET_ITEM
+from .compiled_instructions import OP_SET_STATS
+from .instruction_sequence import InstructionSequence
+
 
 boost_multiplier_lookup = {
     -6: 2/8,
@@ -22,6 +52,26 @@ boost_multiplier_lookup = {
 }
 
 
+# random 64-bit keys for each (feature, value) pair seen in a state
+# a state's hash is the XOR of the keys of all of its features
+# seeded so that hashes are reproducible between runs
+zobrist_random = random.Random(0)
+zobrist_keys = dict()
+
+
+def zobrist_key(feature, value):
+    # default values (0, None, False) do not contribute to the hash
+    # this means that a side-condition of 0 hashes the same as a side-condition that is not present
+    if value is None or value is False or value == 0:
+        return 0
+
+    try:
+        return zobrist_keys[(feature, value)]
+    except KeyError:
+        key = zobrist_keys[(feature, value)] = zobrist_random.getrandbits(64)
+        return key
+
+
 class State(object):
     __slots__ = ('user', 'opponent', 'weather', 'field', 'trick_room')
 
@@ -107,6 +157,18 @@ class State(object):
 
         return False
 
+    def calculate_hash(self):
+        # calculates the hash of the state from scratch
+        # the StateMutator keeps this value updated incrementally as instructions are applied and reversed
+        state_hash = 0
+        for side_string, side in ((constants.USER, self.user), (constants.OPPONENT, self.opponent)):
+            state_hash ^= side.calculate_hash(side_string)
+
+        state_hash ^= zobrist_key(constants.WEATHER, self.weather)
+        state_hash ^= zobrist_key(constants.FIELD, self.field)
+        state_hash ^= zobrist_key(constants.TRICK_ROOM, self.trick_room)
+        return state_hash
+
     @classmethod
     def from_dict(cls, state_dict):
         return State(
@@ -117,16 +179,17 @@ class State(object):
             state_dict[constants.TRICK_ROOM]
         )
 
+    def to_dict(self):
+        return {
+            constants.USER: self.user.to_dict(),
+            constants.OPPONENT: self.opponent.to_dict(),
+            constants.WEATHER: self.weather,
+            constants.FIELD: self.field,
+            constants.TRICK_ROOM: self.trick_room
+        }
+
     def __repr__(self):
-        return str(
-            {
-                constants.USER: self.user,
-                constants.OPPONENT: self.opponent,
-                constants.WEATHER: self.weather,
-                constants.FIELD: self.field,
-                constants.TRICK_ROOM: self.trick_room
-            }
-        )
+        return str(self.to_dict())
 
 
 class Side(object):
@@ -160,6 +223,19 @@ class Side(object):
         else:
             return False
 
+    def calculate_hash(self, side_string):
+        side_hash = zobrist_key((side_string, constants.ACTIVE), self.active.id)
+        side_hash ^= zobrist_key((side_string, constants.WISH), self.wish)
+        side_hash ^= zobrist_key((side_string, constants.FUTURE_SIGHT), self.future_sight)
+        for effect, amount in self.side_conditions.items():
+            side_hash ^= zobrist_key((side_string, constants.SIDE_CONDITIONS, effect), amount)
+
+        side_hash ^= self.active.calculate_hash(side_string)
+        for pkmn in self.reserve.values():
+            side_hash ^= pkmn.calculate_hash(side_string)
+
+        return side_hash
+
     @classmethod
     def from_dict(cls, side_dict):
         return Side(
@@ -170,14 +246,17 @@ class Side(object):
             side_dict[constants.FUTURE_SIGHT]
         )
 
-    def __repr__(self):
-        return str({
-            constants.ACTIVE: self.active,
-            constants.RESERVE: self.reserve,
+    def to_dict(self):
+        return {
+            constants.ACTIVE: self.active.to_dict(),
+            constants.RESERVE: {pkmn_name: pkmn.to_dict() for pkmn_name, pkmn in self.reserve.items()},
             constants.WISH: self.wish,
             constants.SIDE_CONDITIONS: dict(self.side_conditions),
             constants.FUTURE_SIGHT: self.future_sight
-        })
+        }
+
+    def __repr__(self):
+        return str(self.to_dict())
 
 
 class Pokemon(object):
@@ -207,7 +286,9 @@ class Pokemon(object):
         'volatile_status',
         'moves',
         'terastallized',
-        'burn_multiplier'
+        'burn_multiplier',
+        'type_indices',
+        'type_indices_source'
     )
 
     def __init__(
@@ -264,6 +345,11 @@ class Pokemon(object):
         self.volatile_status = volatile_status or set()
         self.moves = moves or list()
 
+        # the indices of this pokemon's types in the type-effectiveness table
+        # they are re-calculated whenever `types` is replaced with a different list
+        self.type_indices = None
+        self.type_indices_source = None
+
         # evaluation relies on a multiplier for the burn status
         # it is calculated here to save time during evaluation
         self.burn_multiplier = self.calculate_burn_multiplier()
@@ -413,51 +499,92 @@ class Pokemon(object):
             constants.SPEED: boost_multiplier_lookup[self.speed_boost] * self.speed,
         }
 
+    def get_type_indices(self):
+        if self.type_indices_source is not self.types:
+            self.type_indices = get_type_indices(self.types)
+            self.type_indices_source = self.types
+        return self.type_indices
+
     def is_grounded(self):
         if 'flying' in self.types or self.ability == 'levitate' or self.item == 'airballoon':
             return False
         return True
 
+    def calculate_hash(self, side_string):
+        # only the attributes that can be changed by the StateMutator are part of the hash
+        pkmn_hash = zobrist_key((side_string, self.id, constants.HITPOINTS), self.hp)
+        pkmn_hash ^= zobrist_key((side_string, self.id, constants.TYPES), tuple(self.types))
+        pkmn_hash ^= zobrist_key((side_string, self.id, constants.ITEM), self.item)
+        pkmn_hash ^= zobrist_key((side_string, self.id, constants.STATUS), self.status)
+        pkmn_hash ^= zobrist_key((side_string, self.id, constants.STATS), self.get_stats())
+        for boost in boost_attributes:
+            pkmn_hash ^= zobrist_key((side_string, self.id, boost), getattr(self, boost_attributes[boost]))
+        for volatile_status in self.volatile_status:
+            pkmn_hash ^= zobrist_key((side_string, self.id, constants.VOLATILE_STATUS, volatile_status), True)
+        for move in self.moves:
+            pkmn_hash ^= zobrist_key((side_string, self.id, constants.DISABLED, move[constants.ID]), move[constants.DISABLED])
+
+        return pkmn_hash
+
+    def get_stats(self):
+        return self.maxhp, self.attack, self.defense, self.special_attack, self.special_defense, self.speed
+
+    def to_dict(self):
+        return {
+            constants.ID: self.id,
+            constants.LEVEL: self.level,
+            constants.TYPES: self.types,
+            constants.HITPOINTS: self.hp,
+            constants.MAXHP: self.maxhp,
+            constants.ABILITY: self.ability,
+            constants.ITEM: self.item,
+            constants.ATTACK: self.attack,
+            constants.DEFENSE: self.defense,
+            constants.SPECIAL_ATTACK: self.special_attack,
+            constants.SPECIAL_DEFENSE: self.special_defense,
+            constants.SPEED: self.speed,
+            constants.NATURE: self.nature,
+            constants.EVS: self.evs,
+            constants.ATTACK_BOOST: self.attack_boost,
+            constants.DEFENSE_BOOST: self.defense_boost,
+            constants.SPECIAL_ATTACK_BOOST: self.special_attack_boost,
+            constants.SPECIAL_DEFENSE_BOOST: self.special_defense_boost,
+            constants.SPEED_BOOST: self.speed_boost,
+            constants.ACCURACY_BOOST: self.accuracy_boost,
+            constants.EVASION_BOOST: self.evasion_boost,
+            constants.STATUS: self.status,
+            constants.TERASTALLIZED: self.terastallized,
+            constants.VOLATILE_STATUS: list(self.volatile_status),
+            constants.MOVES: self.moves
+        }
+
     def __repr__(self):
-        return str(
-            {
-                constants.ID: self.id,
-                constants.LEVEL: self.level,
-                constants.TYPES: self.types,
-                constants.HITPOINTS: self.hp,
-                constants.MAXHP: self.maxhp,
-                constants.ABILITY: self.ability,
-                constants.ITEM: self.item,
-                constants.ATTACK: self.attack,
-                constants.DEFENSE: self.defense,
-                constants.SPECIAL_ATTACK: self.special_attack,
-                constants.SPECIAL_DEFENSE: self.special_defense,
-                constants.SPEED: self.speed,
-                constants.NATURE: self.nature,
-                constants.EVS: self.evs,
-                constants.ATTACK_BOOST: self.attack_boost,
-                constants.DEFENSE_BOOST: self.defense_boost,
-                constants.SPECIAL_ATTACK_BOOST: self.special_attack_boost,
-                constants.SPECIAL_DEFENSE_BOOST: self.special_defense_boost,
-                constants.SPEED_BOOST: self.speed_boost,
-                constants.ACCURACY_BOOST: self.accuracy_boost,
-                constants.EVASION_BOOST: self.evasion_boost,
-                constants.STATUS: self.status,
-                constants.TERASTALLIZED: self.terastallized,
-                constants.VOLATILE_STATUS: list(self.volatile_status),
-                constants.MOVES: self.moves
-            }
-        )
+        return str(self.to_dict())
 
 
 class TransposeInstruction:
-    __slots__ = ('percentage', 'instructions', 'frozen')
+    __slots__ = ('percentage', '_instructions', 'frozen')
 
     def __init__(self, percentage, instructions, frozen=False):
         self.percentage = percentage
         self.instructions = instructions
         self.frozen = frozen
 
+    @property
+    def instructions(self):
+        return self._instructions
+
+    @instructions.setter
+    def instructions(self, instructions):
+        # the instructions are kept in a persistent sequence so that copying a TransposeInstruction is O(1)
+        # and the branches made from it share the instructions they have in common
+        if not isinstance(instructions, InstructionSequence):
+            instructions = InstructionSequence(instructions)
+        self._instructions = instructions
+
+    def compile(self):
+        return self._instructions.compile()
+
     def update_percentage(self, modifier):
         self.percentage *= modifier
 
@@ -468,7 +595,7 @@ class TransposeInstruction:
         return self.instructions == other.instructions
 
     def __copy__(self):
-        return TransposeInstruction(self.percentage, copy(self.instructions), self.frozen)
+        return TransposeInstruction(self.percentage, self._instructions.copy(), self.frozen)
 
     def __repr__(self):
         return "{}: {}".format(self.percentage, str(self.instructions))
@@ -479,10 +606,31 @@ class TransposeInstruction:
             self.frozen == other.frozen
 
 
+EMPTY_INSTRUCTION = TransposeInstruction(1.0, [])
+
+BEST_SWITCH_CACHE_MAX_SIZE = 10000
+
+
 class StateMutator:
 
     def __init__(self, state):
         self.state = state
+
+        # the hash of the state is only calculated when it is first needed
+        # afterwards it is updated incrementally as instructions are applied and reversed
+        self._state_hash = None
+
+        # the (score, alive count) of each side's reserve is only calculated when the state is first evaluated
+        # afterwards it is updated when a pokemon switches in or out
+        self._reserve_evaluations = None
+
+        # the last node of the instructions that have been applied with `move_to`
+        # None means that the state is where it was when positioning started
+        self.position = None
+
+        # the switch chosen after a pivot move is looked up by the hash of the state it is chosen from
+        # see `switch_out_moves.get_best_switch_pokemon`
+        self.best_switch_cache = BoundedCache(BEST_SWITCH_CACHE_MAX_SIZE)
         self.apply_instructions = {
             constants.MUTATOR_SWITCH: self.switch,
             constants.MUTATOR_APPLY_VOLATILE_STATUS: self.apply_volatile_status,
@@ -550,32 +698,185 @@ class StateMutator:
             method = self.reverse_instructions[instruction[0]]
             method(*instruction[1:])
 
+    def apply_compiled(self, compiled_instructions):
+        self.execute(compiled_instructions.apply_operations)
+
+    def reverse_compiled(self, compiled_instructions):
+        self.execute(reversed(compiled_instructions.reverse_operations))
+
+    def move_to(self, instructions):
+        """Moves the state to the result of a TransposeInstruction by only reversing and applying
+           the instructions that are not shared with the instructions the state is currently positioned at
+
+           The instruction generator uses this to step from one branch to the next in O(new instructions)
+           instead of applying and reversing every branch's whole list of instructions.
+           The state must not be changed in any other way while it is positioned,
+           and it is moved back with `stop_positioning`"""
+        position = self.position
+        target = instructions.instructions.tail
+        if target is position:
+            return
+        if target is not None and target.parent is position:
+            self.execute((target.get_operations()[0],))
+            self.position = target
+            return
+
+        reverse_nodes = []
+        apply_nodes = []
+        while position is not target:
+            if target is None or (position is not None and position.length >= target.length):
+                reverse_nodes.append(position)
+                position = position.parent
+            else:
+                apply_nodes.append(target)
+                target = target.parent
+
+        if reverse_nodes:
+            self.execute([node.get_operations()[1] for node in reverse_nodes])
+        if apply_nodes:
+            self.execute([node.get_operations()[0] for node in reversed(apply_nodes)])
+        self.position = instructions.instructions.tail
+
+    def start_positioning(self):
+        # positioning can be nested: the state that the outer positioning was at becomes the start of the inner one
+        outer_position = self.position
+        self.position = None
+        return outer_position
+
+    def move_to_start(self):
+        self.move_to(EMPTY_INSTRUCTION)
+
+    def stop_positioning(self, outer_position):
+        self.move_to_start()
+        self.position = outer_position
+
+    def execute(self, operations):
+        # the most common operations are done inline
+        # the rest are delegated to the same helpers that the un-compiled instructions use
+        state = self.state
+        for opcode, side_index, argument, other_argument in operations:
+            side = state.opponent if side_index else state.user
+            if opcode == OP_CHANGE_HP:
+                active = side.active
+                new_hp = active.hp + argument
+                if self._state_hash is not None:
+                    feature = (SIDE_STRINGS[side_index], active.id, constants.HITPOINTS)
+                    self._state_hash ^= zobrist_key(feature, active.hp) ^ zobrist_key(feature, new_hp)
+                active.hp = new_hp
+            elif opcode == OP_SWITCH:
+                if self._state_hash is not None:
+                    feature = (SIDE_STRINGS[side_index], constants.ACTIVE)
+                    self._state_hash ^= zobrist_key(feature, side.active.id) ^ zobrist_key(feature, argument)
+                if self._reserve_evaluations is not None:
+                    self._update_reserve_evaluation(side_index, side.active, side.reserve[argument])
+                side.reserve[side.active.id] = side.active
+                side.active = side.reserve.pop(argument)
+            elif opcode == OP_SET_STATUS:
+                active = side.active
+                if self._state_hash is not None:
+                    feature = (SIDE_STRINGS[side_index], active.id, constants.STATUS)
+                    self._state_hash ^= zobrist_key(feature, active.status) ^ zobrist_key(feature, argument)
+                active.status = argument
+            elif opcode == OP_CHANGE_BOOST:
+                active = side.active
+                stat, boost_attribute = argument
+                old_boost = getattr(active, boost_attribute)
+                if self._state_hash is not None:
+                    feature = (SIDE_STRINGS[side_index], active.id, stat)
+                    self._state_hash ^= zobrist_key(feature, old_boost) ^ zobrist_key(feature, old_boost + other_argument)
+                setattr(active, boost_attribute, old_boost + other_argument)
+            elif opcode == OP_CHANGE_SIDE_CONDITION:
+                self._change_side_condition(SIDE_STRINGS[side_index], argument, other_argument)
+            elif opcode == OP_SET_WISH:
+                self._set_wish(SIDE_STRINGS[side_index], argument)
+            elif opcode == OP_CHANGE_WISH_TURNS:
+                self._set_wish(SIDE_STRINGS[side_index], (side.wish[0] + argument, side.wish[1]))
+            elif opcode == OP_ADD_VOLATILE_STATUS:
+                self.apply_volatile_status(SIDE_STRINGS[side_index], argument)
+            elif opcode == OP_REMOVE_VOLATILE_STATUS:
+                self.remove_volatile_status(SIDE_STRINGS[side_index], argument)
+            elif opcode == OP_SET_FUTURE_SIGHT:
+                self._set_future_sight(SIDE_STRINGS[side_index], argument)
+            elif opcode == OP_CHANGE_FUTURE_SIGHT_TURNS:
+                self._set_future_sight(SIDE_STRINGS[side_index], (side.future_sight[0] + argument, side.future_sight[1]))
+            elif opcode == OP_SET_MOVE_DISABLED:
+                self._set_move_disabled(SIDE_STRINGS[side_index], argument, other_argument)
+            elif opcode == OP_SET_WEATHER:
+                self._set_weather(argument)
+            elif opcode == OP_SET_FIELD:
+                self._set_field(argument)
+            elif opcode == OP_TOGGLE_TRICK_ROOM:
+                self.toggle_trickroom()
+            elif opcode == OP_SET_TYPES:
+                self._set_types(SIDE_STRINGS[side_index], argument)
+            elif opcode == OP_SET_ITEM:
+                self._set_item(SIDE_STRINGS[side_index], argument)
+            elif opcode == OP_SET_STATS:
+                self._set_stats(SIDE_STRINGS[side_index], argument)
+            else:
+                raise ValueError("Invalid opcode: {}".format(opcode))
+
     def get_side(self, side):
         return getattr(self.state, side)
 
-    def disable_move(self, side, move_name):
-        side = self.get_side(side)
+    @property
+    def state_hash(self):
+        if self._state_hash is None:
+            self._state_hash = self.state.calculate_hash()
+        return self._state_hash
+
+    def evaluate(self):
+        """Returns the same score as `evaluate.evaluate(self.state)` without looking at every reserve pokemon
+
+           Every instruction except a switch only changes the active pokemon, so the score of each side's reserve
+           only changes when a pokemon switches in or out and it is updated then.
+           The state must not be changed outside of the mutator after it has been evaluated.
+           When ShowdownConfig.check_incremental_evaluation is set, the score is checked against a full evaluation"""
+        if self._reserve_evaluations is None:
+            self._reserve_evaluations = [evaluate_reserve(self.state.user), evaluate_reserve(self.state.opponent)]
+
+        score = evaluate_with_reserves(self.state, self._reserve_evaluations[0], self._reserve_evaluations[1])
+        if ShowdownConfig.check_incremental_evaluation:
+            full_score = evaluate(self.state)
+            assert score == full_score, "Incremental evaluation {} does not match the full evaluation {}".format(score, full_score)
+        return score
+
+    def _update_reserve_evaluation(self, side_index, previous_active, new_active):
+        # the previous active pokemon goes into the reserve and the new active pokemon leaves it
+        reserve_score, alive_count = self._reserve_evaluations[side_index]
+        reserve_score += evaluate_pokemon(previous_active) - evaluate_pokemon(new_active)
+        alive_count += (previous_active.hp > 0) - (new_active.hp > 0)
+        self._reserve_evaluations[side_index] = (reserve_score, alive_count)
+
+    def rehash(self, feature, old_value, new_value):
+        if self._state_hash is not None:
+            self._state_hash ^= zobrist_key(feature, old_value) ^ zobrist_key(feature, new_value)
+
+    def _set_move_disabled(self, side_string, move_name, disabled):
+        side = self.get_side(side_string)
         try:
             move = next(filter(lambda x: x[constants.ID] == move_name, side.active.moves))
         except StopIteration:
             raise ValueError("{} not in pokemon's moves: {}".format(move_name, side.active.moves))
 
-        move[constants.DISABLED] = True
+        self.rehash((side_string, side.active.id, constants.DISABLED, move_name), move[constants.DISABLED], disabled)
+        move[constants.DISABLED] = disabled
 
-    def enable_move(self, side, move_name):
-        side = self.get_side(side)
-        try:
-            move = next(filter(lambda x: x[constants.ID] == move_name, side.active.moves))
-        except StopIteration:
-            raise ValueError("{} not in pokemon's moves: {}".format(move_name, side.active.moves))
+    def disable_move(self, side, move_name):
+        self._set_move_disabled(side, move_name, True)
 
-        move[constants.DISABLED] = False
+    def enable_move(self, side, move_name):
+        self._set_move_disabled(side, move_name, False)
 
     def switch(self, side, _, switch_pokemon_name):
         # the second parameter to this function is the current active pokemon
         # this value must be here for reversing purposes
+        side_string = side
         side = self.get_side(side)
 
+        self.rehash((side_string, constants.ACTIVE), side.active.id, switch_pokemon_name)
+        if self._reserve_evaluations is not None:
+            self._update_reserve_evaluation(SIDE_INDICES[side_string], side.active, side.reserve[switch_pokemon_name])
         side.reserve[side.active.id] = side.active
         side.active = side.reserve.pop(switch_pokemon_name)
 
@@ -583,45 +884,51 @@ class StateMutator:
         self.switch(side, current_active, previous_active)
 
     def apply_volatile_status(self, side, volatile_status):
+        side_string = side
         side = self.get_side(side)
+        if volatile_status not in side.active.volatile_status:
+            self.rehash((side_string, side.active.id, constants.VOLATILE_STATUS, volatile_status), False, True)
         side.active.volatile_status.add(volatile_status)
 
     def remove_volatile_status(self, side, volatile_status):
+        side_string = side
         side = self.get_side(side)
         side.active.volatile_status.remove(volatile_status)
+        self.rehash((side_string, side.active.id, constants.VOLATILE_STATUS, volatile_status), True, False)
 
     def damage(self, side, amount):
+        side_string = side
         side = self.get_side(side)
-        side.active.hp -= amount
+        new_hp = side.active.hp - amount
+        self.rehash((side_string, side.active.id, constants.HITPOINTS), side.active.hp, new_hp)
+        side.active.hp = new_hp
 
     def heal(self, side, amount):
+        side_string = side
         side = self.get_side(side)
-        side.active.hp += amount
+        new_hp = side.active.hp + amount
+        self.rehash((side_string, side.active.id, constants.HITPOINTS), side.active.hp, new_hp)
+        side.active.hp = new_hp
 
     def boost(self, side, stat, amount):
+        side_string = side
         side = self.get_side(side)
-        if stat == constants.ATTACK:
-            side.active.attack_boost += amount
-        elif stat == constants.DEFENSE:
-            side.active.defense_boost += amount
-        elif stat == constants.SPECIAL_ATTACK:
-            side.active.special_attack_boost += amount
-        elif stat == constants.SPECIAL_DEFENSE:
-            side.active.special_defense_boost += amount
-        elif stat == constants.SPEED:
-            side.active.speed_boost += amount
-        elif stat == constants.ACCURACY:
-            side.active.accuracy_boost += amount
-        elif stat == constants.EVASION:
-            side.active.evasion_boost += amount
-        else:
+        try:
+            boost_attribute = boost_attributes[stat]
+        except KeyError:
             raise ValueError("Invalid stat: {}".format(stat))
 
+        old_boost = getattr(side.active, boost_attribute)
+        self.rehash((side_string, side.active.id, stat), old_boost, old_boost + amount)
+        setattr(side.active, boost_attribute, old_boost + amount)
+
     def unboost(self, side, stat, amount):
         self.boost(side, stat, -1*amount)
 
     def apply_status(self, side, status):
+        side_string = side
         side = self.get_side(side)
+        self.rehash((side_string, side.active.id, constants.STATUS), side.active.status, status)
         side.active.status = status
 
     def remove_status(self, side, _):
@@ -629,121 +936,143 @@ class StateMutator:
         # this value must be here for reverse purposes
         self.apply_status(side, None)
 
+    def _change_side_condition(self, side_string, effect, amount):
+        side = self.get_side(side_string)
+        old_amount = side.side_conditions[effect]
+        self.rehash((side_string, constants.SIDE_CONDITIONS, effect), old_amount, old_amount + amount)
+        side.side_conditions[effect] = old_amount + amount
+
     def side_start(self, side, effect, amount):
-        side = self.get_side(side)
-        side.side_conditions[effect] += amount
+        self._change_side_condition(side, effect, amount)
 
     def reverse_side_start(self, side, effect, amount):
-        side = self.get_side(side)
-        side.side_conditions[effect] -= amount
+        self._change_side_condition(side, effect, -1*amount)
 
     def side_end(self, side, effect, amount):
-        side = self.get_side(side)
-        side.side_conditions[effect] -= amount
+        self._change_side_condition(side, effect, -1*amount)
 
     def reverse_side_end(self, side, effect, amount):
         self.side_start(side, effect, amount)
 
+    def _set_future_sight(self, side_string, future_sight):
+        side = self.get_side(side_string)
+        self.rehash((side_string, constants.FUTURE_SIGHT), side.future_sight, future_sight)
+        side.future_sight = future_sight
+
     def start_futuresight(self, side, pkmn_name, _):
         # the second parameter is the current futuresight_amount
         # it is here for reversing purposes
-        side = self.get_side(side)
-        side.future_sight = (3, pkmn_name)
+        self._set_future_sight(side, (3, pkmn_name))
 
     def reverse_start_futuresight(self, side, _, old_pkmn_name):
-        side = self.get_side(side)
-        side.future_sight = (0, old_pkmn_name)
+        self._set_future_sight(side, (0, old_pkmn_name))
 
     def decrement_futuresight(self, side):
-        side = self.get_side(side)
-        side.future_sight = (side.future_sight[0] - 1, side.future_sight[1])
+        future_sight = self.get_side(side).future_sight
+        self._set_future_sight(side, (future_sight[0] - 1, future_sight[1]))
 
     def reverse_decrement_futuresight(self, side):
-        side = self.get_side(side)
-        side.future_sight = (side.future_sight[0] + 1, side.future_sight[1])
+        future_sight = self.get_side(side).future_sight
+        self._set_future_sight(side, (future_sight[0] + 1, future_sight[1]))
+
+    def _set_wish(self, side_string, wish):
+        side = self.get_side(side_string)
+        self.rehash((side_string, constants.WISH), side.wish, wish)
+        side.wish = wish
 
     def start_wish(self, side, health, _):
         # the third parameter is the current wish amount
         # it is here for reversing purposes
-        side = self.get_side(side)
-        side.wish = (2, health)
+        self._set_wish(side, (2, health))
 
     def reserve_start_wish(self, side, _, previous_wish_amount):
-        side = self.get_side(side)
-        side.wish = (0, previous_wish_amount)
+        self._set_wish(side, (0, previous_wish_amount))
 
     def decrement_wish(self, side):
-        side = self.get_side(side)
-        side.wish = (side.wish[0] - 1, side.wish[1])
+        wish = self.get_side(side).wish
+        self._set_wish(side, (wish[0] - 1, wish[1]))
 
     def reverse_decrement_wish(self, side):
-        side = self.get_side(side)
-        side.wish = (side.wish[0] + 1, side.wish[1])
+        wish = self.get_side(side).wish
+        self._set_wish(side, (wish[0] + 1, wish[1]))
+
+    def _set_weather(self, weather):
+        self.rehash(constants.WEATHER, self.state.weather, weather)
+        self.state.weather = weather
 
     def start_weather(self, weather, _):
         # the second parameter is the current weather
         # the value is here for reversing purposes
-        self.state.weather = weather
+        self._set_weather(weather)
 
     def reverse_start_weather(self, _, old_weather):
-        self.state.weather = old_weather
+        self._set_weather(old_weather)
+
+    def _set_field(self, field):
+        self.rehash(constants.FIELD, self.state.field, field)
+        self.state.field = field
 
     def start_field(self, field, _):
         # the second parameter is the current field
         # the value is here for reversing purposes
-        self.state.field = field
+        self._set_field(field)
 
     def reverse_start_field(self, _, old_field):
-        self.state.field = old_field
+        self._set_field(old_field)
 
     def end_field(self, _):
         # the second parameter is the current field
         # the value is here for reversing purposes
-        self.state.field = None
+        self._set_field(None)
 
     def reverse_end_field(self, old_field):
-        self.state.field = old_field
+        self._set_field(old_field)
 
     def toggle_trickroom(self):
+        self.rehash(constants.TRICK_ROOM, self.state.trick_room, not self.state.trick_room)
         self.state.trick_room ^= True
 
+    def _set_types(self, side_string, types):
+        side = self.get_side(side_string)
+        self.rehash((side_string, side.active.id, constants.TYPES), tuple(side.active.types), tuple(types))
+        side.active.types = types
+
     def change_types(self, side, new_types, _):
         # the third parameter is the current types of the active pokemon
         # they must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.types = new_types
+        self._set_types(side, new_types)
 
     def reverse_change_types(self, side, _, old_types):
-        side = self.get_side(side)
-        side.active.types = old_types
+        self._set_types(side, old_types)
+
+    def _set_item(self, side_string, item):
+        side = self.get_side(side_string)
+        self.rehash((side_string, side.active.id, constants.ITEM), side.active.item, item)
+        side.active.item = item
 
     def change_item(self, side, new_item, _):
         # the third parameter is the current item
         # it must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.item = new_item
+        self._set_item(side, new_item)
 
     def reverse_change_item(self, side, _, old_item):
-        side = self.get_side(side)
-        side.active.item = old_item
+        self._set_item(side, old_item)
+
+    def _set_stats(self, side_string, stats):
+        side = self.get_side(side_string)
+        self.rehash((side_string, side.active.id, constants.STATS), side.active.get_stats(), tuple(stats))
+        side.active.maxhp = stats[0]
+        side.active.attack = stats[1]
+        side.active.defense = stats[2]
+        side.active.special_attack = stats[3]
+        side.active.special_defense = stats[4]
+        side.active.speed = stats[5]
 
     def change_stats(self, side, new_stats, _):
         # the third parameter is the old stats
         # is must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.maxhp = new_stats[0]
-        side.active.attack = new_stats[1]
-        side.active.defense = new_stats[2]
-        side.active.special_attack = new_stats[3]
-        side.active.special_defense = new_stats[4]
-        side.active.speed = new_stats[5]
+        self._set_stats(side, new_stats)
 
     def reverse_change_stats(self, side, _, old_stats):
         # the second parameter are the new stats
-        side = self.get_side(side)
-        side.active.maxhp = old_stats[0]
-        side.active.attack = old_stats[1]
-        side.active.defense = old_stats[2]
-        side.active.special_attack = old_stats[3]
-        side.active.special_defense = old_stats[4]
-        side.active.speed = old_stats[5]
+        self._set_stats(side, old_stats)
@@ -0,0 +1,157 @@
+import math
+from collections.abc import Mapping
+
+
+class PayoffMatrix(Mapping):
+    """
+    The score of every pair of options at one node of a search
+
+    Each row holds the scores of one of the bot's options against every one of the opponent's options.
+    A cell that was pruned, or that was never searched, is nan.
+
+    It can be used as the {(user_option, opponent_option): score} dictionary that a search used to return,
+    with the pairs of options in row-major order, but the maximin and the other operations that are done on
+    every payoff-matrix are done on the rows directly instead of re-grouping the pairs of a dictionary.
+    """
+    __slots__ = ('user_options', 'opponent_options', 'scores', 'user_indices', 'opponent_indices')
+
+    def __init__(self, user_options, opponent_options, scores):
+        self.user_options = list(user_options)
+        self.opponent_options = list(opponent_options)
+        self.scores = scores
+        self.user_indices = {option: i for i, option in enumerate(self.user_options)}
+        self.opponent_indices = {option: j for j, option in enumerate(self.opponent_options)}
+
+    @classmethod
+    def from_score_lookup(cls, score_lookup):
+        """Returns the payoff-matrix of a {(user_option, opponent_option): score} dictionary
+           The options are in the order they are first seen in, and cells that are not in the dictionary are nan"""
+        if isinstance(score_lookup, PayoffMatrix):
+            return score_lookup
+
+        user_indices = dict()
+        opponent_indices = dict()
+        for user_option, opponent_option in score_lookup:
+            user_indices.setdefault(user_option, len(user_indices))
+            opponent_indices.setdefault(opponent_option, len(opponent_indices))
+
+        scores = [[float('nan')] * len(opponent_indices) for _ in user_indices]
+        for (user_option, opponent_option), score in score_lookup.items():
+            scores[user_indices[user_option]][opponent_indices[opponent_option]] = score
+
+        return cls(user_indices, opponent_indices, scores)
+
+    def __getitem__(self, move_pair):
+        user_option, opponent_option = move_pair
+        return self.scores[self.user_indices[user_option]][self.opponent_indices[opponent_option]]
+
+    def __iter__(self):
+        for user_option in self.user_options:
+            for opponent_option in self.opponent_options:
+                yield user_option, opponent_option
+
+    def __len__(self):
+        return len(self.user_options) * len(self.opponent_options)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, dict(self.items()))
+
+    def safest(self):
+        """Returns the ((user_option, opponent_option), score) of the bot's option with the best worst-case score
+           and the opponent's option that causes that worst-case. Cells that are nan are ignored.
+           Ties are broken by the order of the options"""
+        best_row = None
+        best_column = None
+        best_score = float('-inf')
+        for i, row in enumerate(self.scores):
+            # nan is the only value that is not equal to itself
+            searched_scores = [score for score in row if score == score]
+            if not searched_scores:
+                # a row with no searched cells has no worst-case
+                worst_score = float('inf')
+                worst_column = None
+            else:
+                worst_score = min(searched_scores)
+                worst_column = row.index(worst_score)
+
+            if best_row is None or worst_score > best_score:
+                best_row = i
+                best_column = worst_column
+                best_score = worst_score
+
+        if best_row is None:
+            raise ValueError("The payoff-matrix has no options")
+        if best_column is None:
+            return tuple(), best_score
+        return (self.user_options[best_row], self.opponent_options[best_column]), best_score
+
+    def select_opponent_options(self, opponent_options):
+        columns = [self.opponent_indices[option] for option in opponent_options]
+        return PayoffMatrix(
+            self.user_options,
+            opponent_options,
+            [[row[j] for j in columns] for row in self.scores]
+        )
+
+    def remove_guaranteed_opponent_moves(self):
+        """Returns the payoff-matrix without the opponent's options that do not give the bot a choice
+           An option does not give the bot a choice when every searched cell in its column has the same score
+           The payoff-matrix is returned as it is when either side only has one option"""
+        if len(self.user_options) == 1 or len(self.opponent_options) == 1:
+            return self
+
+        first_row = self.scores[0]
+        opponent_decisions = [
+            option for j, option in enumerate(self.opponent_options)
+            if any(row[j] != first_row[j] and not math.isnan(row[j]) for row in self.scores[1:])
+        ]
+        return self.select_opponent_options(opponent_decisions)
+
+    def suffix_opponent_options(self, suffix):
+        # the opponent's options of different payoff-matrices are kept apart when they are concatenated
+        return PayoffMatrix(
+            self.user_options,
+            ["{}_{}".format(option, suffix) for option in self.opponent_options],
+            self.scores
+        )
+
+    def reorder(self, user_options, opponent_options):
+        """Returns the payoff-matrix with its options in the order of the given options
+           Options that are not given keep their order after the ones that are"""
+        user_order = {option: i for i, option in enumerate(user_options)}
+        opponent_order = {option: j for j, option in enumerate(opponent_options)}
+        rows = sorted(range(len(self.user_options)), key=lambda i: user_order.get(self.user_options[i], len(user_order)))
+        columns = sorted(range(len(self.opponent_options)), key=lambda j: opponent_order.get(self.opponent_options[j], len(opponent_order)))
+        return PayoffMatrix(
+            [self.user_options[i] for i in rows],
+            [self.opponent_options[j] for j in columns],
+            [[self.scores[i][j] for j in columns] for i in rows]
+        )
+
+    def to_array(self):
+        # numpy is only needed by the bots that solve the payoff-matrix, so it is imported here
+        import numpy as np
+        return np.array(self.scores, dtype=np.float64)
+
+
+def concatenate_payoff_matrices(payoff_matrices):
+    """Joins the payoff-matrices of different states side by side, so that the bot's options are scored
+       against the opponent's options of every state. Bot options that are not in a payoff-matrix are nan for its columns.
+       A cell of an opponent option that is in more than one payoff-matrix is the score of the last one"""
+    user_indices = dict()
+    opponent_indices = dict()
+    for payoff_matrix in payoff_matrices:
+        for option in payoff_matrix.user_options:
+            user_indices.setdefault(option, len(user_indices))
+        for option in payoff_matrix.opponent_options:
+            opponent_indices.setdefault(option, len(opponent_indices))
+
+    scores = [[float('nan')] * len(opponent_indices) for _ in user_indices]
+    for payoff_matrix in payoff_matrices:
+        columns = [opponent_indices[option] for option in payoff_matrix.opponent_options]
+        for user_option, row in zip(payoff_matrix.user_options, payoff_matrix.scores):
+            concatenated_row = scores[user_indices[user_option]]
+            for j, score in zip(columns, row):
+                concatenated_row[j] = score
+
+    return PayoffMatrix(user_indices, opponent_indices, scores)
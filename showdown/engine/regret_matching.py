@@ -0,0 +1,78 @@
+REGRET_MATCHING_MAX_ITERATIONS = 1000
+
+# the search stops once the value of the game is known to within this many points of evaluation
+REGRET_MATCHING_TOLERANCE = 1
+
+# how often the bounds of the average strategies are checked against the tolerance
+REGRET_MATCHING_CHECK_EVERY = 10
+
+
+def normalize(weights):
+    total = sum(weights)
+    if total <= 0:
+        return [1 / len(weights)] * len(weights)
+    return [w / total for w in weights]
+
+
+def get_bounds(scores, columns, user_strategy, opponent_strategy):
+    # the bot can guarantee the lower bound by playing its strategy,
+    # and the opponent can hold the bot to the upper bound by playing theirs
+    lower_bound = min(sum(s * x for s, x in zip(column, user_strategy)) for column in columns)
+    upper_bound = max(sum(s * y for s, y in zip(row, opponent_strategy)) for row in scores)
+    return lower_bound, upper_bound
+
+
+def solve_with_regret_matching(scores, max_iterations=REGRET_MATCHING_MAX_ITERATIONS, tolerance=REGRET_MATCHING_TOLERANCE):
+    """
+    Approximates an equilibrium of the zero-sum game in the rows of `scores`
+
+    The rows are the bot's options and the columns are the opponent's options. Every cell must be searched.
+    A game with a saddle point is solved exactly without iterating. Otherwise both players play regret-matching+
+    against each other, taking turns to update, and the strategies they played are averaged with linearly increasing weights.
+    This stops as soon as the average strategies bound the value of the game to within `tolerance`.
+
+    :return: a tuple of (bot strategy, opponent strategy, value of the game)
+             the value is halfway between the bounds of the average strategies
+    """
+    num_rows = len(scores)
+    num_columns = len(scores[0])
+    columns = list(zip(*scores))
+
+    row_minimums = [min(row) for row in scores]
+    column_maximums = [max(column) for column in columns]
+    maximin = max(row_minimums)
+    if maximin >= min(column_maximums):
+        user_strategy = [0.0] * num_rows
+        user_strategy[row_minimums.index(maximin)] = 1.0
+        opponent_strategy = [0.0] * num_columns
+        opponent_strategy[column_maximums.index(min(column_maximums))] = 1.0
+        return user_strategy, opponent_strategy, maximin
+
+    user_regrets = [0.0] * num_rows
+    opponent_regrets = [0.0] * num_columns
+    user_strategy = normalize(user_regrets)
+    opponent_strategy = normalize(opponent_regrets)
+    user_strategy_sum = [0.0] * num_rows
+    opponent_strategy_sum = [0.0] * num_columns
+    for iteration in range(1, max_iterations + 1):
+        row_values = [sum(s * y for s, y in zip(row, opponent_strategy)) for row in scores]
+        expected_value = sum(v * x for v, x in zip(row_values, user_strategy))
+        user_regrets = [max(r + v - expected_value, 0) for r, v in zip(user_regrets, row_values)]
+        user_strategy = normalize(user_regrets)
+        user_strategy_sum = [total + iteration * x for total, x in zip(user_strategy_sum, user_strategy)]
+
+        # the opponent responds to the bot's updated strategy and wants the score to be as low as possible
+        column_values = [sum(s * x for s, x in zip(column, user_strategy)) for column in columns]
+        expected_value = sum(v * y for v, y in zip(column_values, opponent_strategy))
+        opponent_regrets = [max(r + expected_value - v, 0) for r, v in zip(opponent_regrets, column_values)]
+        opponent_strategy = normalize(opponent_regrets)
+        opponent_strategy_sum = [total + iteration * y for total, y in zip(opponent_strategy_sum, opponent_strategy)]
+
+        if iteration % REGRET_MATCHING_CHECK_EVERY == 0 or iteration == max_iterations:
+            average_user_strategy = normalize(user_strategy_sum)
+            average_opponent_strategy = normalize(opponent_strategy_sum)
+            lower_bound, upper_bound = get_bounds(scores, columns, average_user_strategy, average_opponent_strategy)
+            if upper_bound - lower_bound <= tolerance:
+                break
+
+    return average_user_strategy, average_opponent_strategy, (lower_bound + upper_bound) / 2
@@ -0,0 +1,252 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import constants
+from config import ShowdownConfig
+from data.mods.apply_mods import apply_mods
+
+from .evaluate import Scoring
+from .move_history import MoveHistory
+from .objects import State
+from .objects import StateMutator
+from .payoff_matrix import PayoffMatrix
+from .search_statistics import SearchStatistics
+from .select_best_move import get_move_pair_score
+from .select_best_move import get_move_pair_value
+from .select_best_move import is_alpha_beta_search
+from .select_best_move import restore_option_order
+from .select_best_move import search_payoff_matrix
+from .transposition_table import TranspositionTable
+
+
+logger = logging.getLogger(__name__)
+
+
+# the ShowdownConfig settings that change how a state is searched
+WORKER_CONFIG_ATTRIBUTES = (
+    'damage_calc_type',
+    'pivot_switch_heuristic',
+    'check_incremental_evaluation',
+)
+
+
+def get_worker_config():
+    """Returns the settings that a worker needs to search a state the same way as this process
+       Workers are spawned as fresh interpreters, so anything that was changed after it was imported has to be sent to them"""
+    return {
+        'config': {name: getattr(ShowdownConfig, name) for name in WORKER_CONFIG_ATTRIBUTES},
+        'scoring': {
+            name: value for name, value in vars(Scoring).items()
+            if name.isupper() and not isinstance(value, staticmethod)
+        },
+    }
+
+
+def initialize_worker(pokemon_mode, worker_config):
+    # workers are spawned as fresh interpreters, so they need the same
+    # generation-specific data and configuration that the main process has
+    for name, value in worker_config['config'].items():
+        setattr(ShowdownConfig, name, value)
+    for name, value in worker_config['scoring'].items():
+        setattr(Scoring, name, value)
+    apply_mods(pokemon_mode)
+
+
+def search_state(state_dict, user_options, opponent_options, depth, prune, search_mode=constants.MAXIMIN_SEARCH, probability_cutoff=0, damage_calc_types=(), backup=constants.MAXIMIN_BACKUP, statistics=None):
+    mutator = StateMutator(State.from_dict(state_dict))
+    score_lookup = search_payoff_matrix(
+        mutator,
+        user_options,
+        opponent_options,
+        depth=depth,
+        search_mode=search_mode,
+        prune=prune,
+        transposition_table=TranspositionTable(),
+        statistics=statistics,
+        history=MoveHistory(),
+        probability_cutoff=probability_cutoff,
+        damage_calc_types=damage_calc_types,
+        backup=backup
+    )
+    return restore_option_order(score_lookup, user_options, opponent_options)
+
+
+def search_root_row(state_dict, user_move, opponent_options, depth, prune, row_worst_cases_name, row, search_mode=constants.MAXIMIN_SEARCH, probability_cutoff=0, damage_calc_types=(), backup=constants.MAXIMIN_BACKUP, statistics=None):
+    """
+    Searches one row of the root of a payoff-matrix
+
+    Every row's worst-case score is published in shared memory when it finishes.
+    The best of these is the same alpha bound that `get_payoff_matrix` prunes with,
+    so this row stops being searched as soon as it cannot be better than a row that has already finished.
+    With the alpha-beta search mode each cell is searched with an open window, the same as the root of `get_payoff_matrix_alpha_beta`.
+    Nothing is pruned unless `backup` is maximin, the same as `get_payoff_matrix`
+    """
+    prune = prune and backup == constants.MAXIMIN_BACKUP
+    row_worst_cases_memory = SharedMemory(name=row_worst_cases_name)
+    row_worst_cases = row_worst_cases_memory.buf.cast('d')
+    try:
+        mutator = StateMutator(State.from_dict(state_dict))
+        transposition_table = TranspositionTable()
+        history = MoveHistory()
+        state_scores = dict()
+        worst_score_for_this_row = float('inf')
+        skip = False
+        for opponent_move in opponent_options:
+            if skip:
+                state_scores[(user_move, opponent_move)] = float('nan')
+                if statistics is not None:
+                    statistics.pruned_cells += 1
+                continue
+
+            if is_alpha_beta_search(search_mode, prune, backup):
+                score = get_move_pair_value(mutator, user_move, opponent_move, depth, float('-inf'), float('inf'), statistics=statistics, history=history, probability_cutoff=probability_cutoff, damage_calc_types=damage_calc_types)
+            else:
+                score = get_move_pair_score(mutator, user_move, opponent_move, depth, prune, transposition_table, statistics=statistics, history=history, probability_cutoff=probability_cutoff, damage_calc_types=damage_calc_types, backup=backup)
+            state_scores[(user_move, opponent_move)] = score
+
+            if score < worst_score_for_this_row:
+                worst_score_for_this_row = score
+
+            if prune and score < max(row_worst_cases):
+                skip = True
+
+        row_worst_cases[row] = worst_score_for_this_row
+        return state_scores
+    finally:
+        row_worst_cases.release()
+        row_worst_cases_memory.close()
+
+
+def search_with_statistics(search_function, *args):
+    # the statistics are counted in the worker and sent back with the result to be merged into the caller's
+    statistics = SearchStatistics()
+    return search_function(*args, statistics=statistics), statistics
+
+
+class SearchService:
+    """
+    A persistent pool of worker processes that search several states at the same time
+
+    Searching is CPU-bound pure-python, so threads do not help because of the GIL.
+    Each state is sent to a worker as a `State.to_dict()` snapshot and the payoff-matrices
+    are returned in the same order as the states were given.
+    """
+
+    def __init__(self, processes, pokemon_mode, worker_config):
+        self.processes = processes
+        self.worker_config = worker_config
+        self.pool = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=initialize_worker,
+            initargs=(pokemon_mode, worker_config)
+        )
+
+    def search(self, states, depth=2, prune=True, search_mode=constants.MAXIMIN_SEARCH, probability_cutoff=0, damage_calc_types=(), backup=constants.MAXIMIN_BACKUP, statistics=None):
+        """
+        :param states: a list of (State, user_options, opponent_options) tuples to be searched
+        :param depth: the depth to search each state to
+        :param prune: specify whether or not to prune the tree
+        :param search_mode: one of constants.SEARCH_MODES
+        :param probability_cutoff: outcomes of a turn less likely than this are evaluated instead of searched deeper
+        :param damage_calc_types: the damage rolls to use for each turn, starting with the first one
+        :param backup: how the value of each node below the root is found from its payoff-matrix, one of constants.SEARCH_BACKUPS
+        :param statistics: an optional SearchStatistics object that the statistics of every worker are merged into
+        :return: a list of payoff-matrices, one for each state
+        """
+        futures = [
+            self.submit(statistics, search_state, state.to_dict(), user_options, opponent_options, depth, prune, search_mode, probability_cutoff, damage_calc_types, backup)
+            for state, user_options, opponent_options in states
+        ]
+        return [self.result(f, statistics) for f in futures]
+
+    def search_root(self, state, user_options, opponent_options, depth=2, prune=True, search_mode=constants.MAXIMIN_SEARCH, probability_cutoff=0, damage_calc_types=(), backup=constants.MAXIMIN_BACKUP, statistics=None):
+        """
+        Searches a single state by giving each of the bot's options at the root to a different worker
+
+        The result is the same payoff-matrix as `get_payoff_matrix` would give, except that which cells
+        are pruned may differ because the rows finish in a different order.
+        """
+        if (
+                len(user_options) < 2 or
+                state.battle_is_finished() or
+                (opponent_options == [constants.DO_NOTHING_MOVE] and state.opponent.active.hp == 0)
+        ):
+            return search_payoff_matrix(
+                StateMutator(state),
+                user_options,
+                opponent_options,
+                depth=depth,
+                search_mode=search_mode,
+                prune=prune,
+                transposition_table=TranspositionTable(),
+                probability_cutoff=probability_cutoff,
+                damage_calc_types=damage_calc_types,
+                backup=backup,
+                statistics=statistics
+            )
+
+        if statistics is not None:
+            statistics.record_node(depth)
+
+        row_worst_cases_memory = SharedMemory(create=True, size=8 * len(user_options))
+        try:
+            row_worst_cases = row_worst_cases_memory.buf.cast('d')
+            for i in range(len(row_worst_cases)):
+                row_worst_cases[i] = float('-inf')
+            row_worst_cases.release()
+
+            state_dict = state.to_dict()
+            futures = [
+                self.submit(statistics, search_root_row, state_dict, user_move, opponent_options, depth - 1, prune, row_worst_cases_memory.name, i, search_mode, probability_cutoff, damage_calc_types, backup)
+                for i, user_move in enumerate(user_options)
+            ]
+
+            state_scores = dict()
+            for f in futures:
+                state_scores.update(self.result(f, statistics))
+            return PayoffMatrix.from_score_lookup(state_scores)
+        finally:
+            row_worst_cases_memory.close()
+            row_worst_cases_memory.unlink()
+
+    def submit(self, statistics, search_function, *args):
+        if statistics is None:
+            return self.pool.submit(search_function, *args)
+        return self.pool.submit(search_with_statistics, search_function, *args)
+
+    @staticmethod
+    def result(future, statistics):
+        if statistics is None:
+            return future.result()
+        result, worker_statistics = future.result()
+        statistics.merge(worker_statistics)
+        return result
+
+    def shutdown(self):
+        self.pool.shutdown()
+
+
+_search_service = None
+
+
+def get_search_service():
+    """Returns the search service shared by all battles, starting it the first time it is needed
+       The workers are restarted if a setting that they were started with has changed since, e.g. the scoring of a random battle"""
+    global _search_service
+    worker_config = get_worker_config()
+    if _search_service is not None and _search_service.worker_config != worker_config:
+        logger.debug("The search configuration has changed - restarting the search service")
+        _search_service.shutdown()
+        _search_service = None
+
+    if _search_service is None:
+        logger.debug("Starting search service with {} processes".format(ShowdownConfig.search_processes))
+        _search_service = SearchService(
+            ShowdownConfig.search_processes,
+            ShowdownConfig.pokemon_mode,
+            worker_config
+        )
+    return _search_service
@@ -0,0 +1,117 @@
+import json
+import time
+from collections import defaultdict
+
+
+class SearchStatistics:
+    """
+    Counts what a search did and where its time went
+
+    An instance is passed to `get_payoff_matrix` to collect statistics for one decision.
+    Nothing is counted or timed when no instance is passed, so a normal search is not slowed down.
+
+    Nodes are counted by the depth remaining when `get_payoff_matrix` was called,
+    so the root of a depth-2 search is counted at depth 2.
+    """
+    __slots__ = (
+        'nodes_per_depth',
+        'transposition_hits',
+        'pruned_cells',
+        'state_instruction_calls',
+        'instruction_sets',
+        'max_instruction_sets',
+        'merged_instruction_sets',
+        'evaluate_calls',
+        'cut_off_branches',
+        'cut_off_probability',
+        'phase_times',
+        'start_time',
+        'end_time'
+    )
+
+    def __init__(self):
+        self.nodes_per_depth = defaultdict(int)
+        self.transposition_hits = 0
+        self.pruned_cells = 0
+        self.state_instruction_calls = 0
+        self.instruction_sets = 0
+        self.max_instruction_sets = 0
+        self.merged_instruction_sets = 0
+        self.evaluate_calls = 0
+        self.cut_off_branches = 0
+        self.cut_off_probability = 0
+        self.phase_times = defaultdict(float)
+        self.start_time = None
+        self.end_time = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+
+    def stop(self):
+        self.end_time = time.perf_counter()
+
+    def record_node(self, depth):
+        self.nodes_per_depth[depth] += 1
+
+    def record_state_instructions(self, number_of_instruction_sets, elapsed):
+        self.state_instruction_calls += 1
+        self.instruction_sets += number_of_instruction_sets
+        self.max_instruction_sets = max(self.max_instruction_sets, number_of_instruction_sets)
+        self.phase_times['state_instructions'] += elapsed
+
+    def record_evaluate(self, elapsed):
+        self.evaluate_calls += 1
+        self.phase_times['evaluate'] += elapsed
+
+    def record_cut_off_branch(self, percentage):
+        # the probability is of the outcome within its own turn
+        self.cut_off_branches += 1
+        self.cut_off_probability += percentage
+
+    def merge(self, other):
+        # adds the counts of a search done in another process to these
+        # the phase times are summed over every process, so they can add up to more than the total time
+        for depth, count in other.nodes_per_depth.items():
+            self.nodes_per_depth[depth] += count
+        self.transposition_hits += other.transposition_hits
+        self.pruned_cells += other.pruned_cells
+        self.state_instruction_calls += other.state_instruction_calls
+        self.instruction_sets += other.instruction_sets
+        self.max_instruction_sets = max(self.max_instruction_sets, other.max_instruction_sets)
+        self.merged_instruction_sets += other.merged_instruction_sets
+        self.evaluate_calls += other.evaluate_calls
+        self.cut_off_branches += other.cut_off_branches
+        self.cut_off_probability += other.cut_off_probability
+        for phase, elapsed in other.phase_times.items():
+            self.phase_times[phase] += elapsed
+
+    @property
+    def total_time(self):
+        if self.start_time is None:
+            return None
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        return end_time - self.start_time
+
+    def to_dict(self):
+        return {
+            'nodes': sum(self.nodes_per_depth.values()),
+            'nodes_per_depth': {str(depth): count for depth, count in sorted(self.nodes_per_depth.items(), reverse=True)},
+            'transposition_hits': self.transposition_hits,
+            'pruned_cells': self.pruned_cells,
+            'state_instruction_calls': self.state_instruction_calls,
+            'instruction_sets': self.instruction_sets,
+            'average_instruction_sets': self.instruction_sets / self.state_instruction_calls if self.state_instruction_calls else 0,
+            'max_instruction_sets': self.max_instruction_sets,
+            'merged_instruction_sets': self.merged_instruction_sets,
+            'evaluate_calls': self.evaluate_calls,
+            'cut_off_branches': self.cut_off_branches,
+            'cut_off_probability': self.cut_off_probability,
+            'phase_times': dict(self.phase_times),
+            'total_time': self.total_time,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def __repr__(self):
+        return "SearchStatistics({})".format(self.to_dict())
@@ -1,59 +1,54 @@
 import math
+import time
 from collections import defaultdict
+from copy import deepcopy
 
 import constants
+import logging
 
-from .evaluate import evaluate
 from .find_state_instructions import get_all_state_instructions
+from .find_state_instructions import TurnCache
+from .find_state_instructions import merge_instructions_by_resulting_state
+from .move_history import MoveHistory
+from .objects import StateMutator
+from .payoff_matrix import PayoffMatrix
+from .regret_matching import solve_with_regret_matching
+from .transposition_table import TranspositionTable
+
+logger = logging.getLogger(__name__)
 
 
 WON_BATTLE = 100
 
 
+class SearchTimeoutError(Exception):
+    pass
+
+
 def remove_guaranteed_opponent_moves(score_lookup):
     """This method removes enemy moves from the score-lookup that do not give the bot a choice.
        For example - if the bot has 1 pokemon left, the opponent is faster, and can kill your active pokemon with move X
        then move X for the opponent will be removed from the score_lookup
 
        The bot behaves much better when it cannot see these types of decisions"""
-    move_combinations = list(score_lookup.keys())
-    if len(set(k[0] for k in move_combinations)) == 1:
-        return score_lookup
-    elif len(set(k[1] for k in move_combinations)) == 1:
-        return score_lookup
-
-    # find the opponent's moves where the bot has a choice
-    opponent_move_scores = dict()
-    opponent_decisions = set()
-    for k, score in score_lookup.items():
-        opponent_move = k[1]
-        if opponent_move not in opponent_move_scores:
-            opponent_move_scores[opponent_move] = score
-        elif opponent_move in opponent_move_scores and score != opponent_move_scores[opponent_move] and not math.isnan(score):
-            opponent_decisions.add(opponent_move)
-
-    # re-create score_lookup with only the opponent's move acquired above
-    new_opponent_decisions = dict()
-    for k, v in score_lookup.items():
-        if k[1] in opponent_decisions:
-            new_opponent_decisions[k] = v
-
-    return new_opponent_decisions
+    return PayoffMatrix.from_score_lookup(score_lookup).remove_guaranteed_opponent_moves()
 
 
 def pick_safest(score_lookup, remove_guaranteed=False):
-    modified_score_lookup = score_lookup
+    payoff_matrix = PayoffMatrix.from_score_lookup(score_lookup)
     if remove_guaranteed:
-        modified_score_lookup = remove_guaranteed_opponent_moves(score_lookup)
-        if not modified_score_lookup:
-            modified_score_lookup = score_lookup
-    worst_case = defaultdict(lambda: (tuple(), float('inf')))
-    for move_pair, result in modified_score_lookup.items():
-        if worst_case[move_pair[0]][1] > result:
-            worst_case[move_pair[0]] = move_pair, result
+        modified_payoff_matrix = payoff_matrix.remove_guaranteed_opponent_moves()
+        if modified_payoff_matrix:
+            payoff_matrix = modified_payoff_matrix
+    return payoff_matrix.safest()
+
 
-    safest = max(worst_case, key=lambda x: worst_case[x][1])
-    return worst_case[safest]
+def back_up_payoff_matrix(payoff_matrix, backup):
+    """Returns the value of a node from its payoff-matrix
+       `maximin` is the score of the safest option, `regret_matching` is the approximate value of the mixed-strategy equilibrium"""
+    if backup == constants.REGRET_MATCHING_BACKUP:
+        return solve_with_regret_matching(payoff_matrix.scores)[2]
+    return payoff_matrix.safest()[1]
 
 
 def move_item_to_front_of_list(l, item):
@@ -64,19 +59,143 @@ def move_item_to_front_of_list(l, item):
     return [l[i] for i in all_indicies]
 
 
-def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=True):
+def evaluate_with_statistics(mutator, statistics):
+    if statistics is None:
+        return mutator.evaluate()
+
+    start = time.perf_counter()
+    score = mutator.evaluate()
+    statistics.record_evaluate(time.perf_counter() - start)
+    return score
+
+
+def get_state_instructions_with_statistics(mutator, user_move, opponent_move, statistics, damage_calc_types=(), merge=False, turn_cache=None):
+    # when `merge` is True, instructions that result in the same state are merged so that each resulting state is only searched once
+    # this is not worth doing right before the resulting states are evaluated since merging costs about as much as evaluating
+    calc_type = damage_calc_types[0] if damage_calc_types else None
+    if statistics is None:
+        state_instructions = get_all_state_instructions(mutator, user_move, opponent_move, calc_type=calc_type, turn_cache=turn_cache)
+        if merge:
+            state_instructions = merge_instructions_by_resulting_state(mutator, state_instructions)
+        return state_instructions
+
+    start = time.perf_counter()
+    state_instructions = get_all_state_instructions(mutator, user_move, opponent_move, calc_type=calc_type, turn_cache=turn_cache)
+    if merge:
+        number_of_instruction_sets = len(state_instructions)
+        state_instructions = merge_instructions_by_resulting_state(mutator, state_instructions)
+        statistics.merged_instruction_sets += number_of_instruction_sets - len(state_instructions)
+    statistics.record_state_instructions(len(state_instructions), time.perf_counter() - start)
+    return state_instructions
+
+
+def get_next_damage_calc_types(damage_calc_types):
+    # the last damage calc type of a schedule is used for every turn after it
+    return damage_calc_types[1:] or damage_calc_types
+
+
+def is_cut_off(instructions, most_likely_instructions, probability_cutoff):
+    # the most likely outcome is always searched, even if every outcome is below the cutoff
+    return instructions.percentage < probability_cutoff and instructions is not most_likely_instructions
+
+
+def evaluate_cut_off_instructions(mutator, instructions, statistics):
+    # outcomes below the probability cutoff are evaluated as they are instead of being searched any deeper
+    mutator.apply_compiled(instructions.compile())
+    score = evaluate_with_statistics(mutator, statistics)
+    mutator.reverse_compiled(instructions.compile())
+    if statistics is not None:
+        statistics.record_cut_off_branch(instructions.percentage)
+    return score
+
+
+def get_most_likely_instructions(state_instructions, probability_cutoff):
+    if not probability_cutoff:
+        return None
+    return max(state_instructions, key=lambda x: x.percentage)
+
+
+def get_move_pair_score(mutator, user_move, opponent_move, depth, prune=True, transposition_table=None, deadline=None, statistics=None, history=None, probability_cutoff=0, damage_calc_types=(), turn_cache=None, backup=constants.MAXIMIN_BACKUP):
+    """Returns the expected score of both sides using this pair of moves
+       `depth` is the remaining depth after this turn - the resulting states are evaluated when it is 0"""
+    score = 0
+    state_instructions = get_state_instructions_with_statistics(mutator, user_move, opponent_move, statistics, damage_calc_types, merge=depth > 0, turn_cache=turn_cache)
+    if depth == 0:
+        for instructions in state_instructions:
+            mutator.apply_compiled(instructions.compile())
+            t_score = evaluate_with_statistics(mutator, statistics)
+            score += (t_score * instructions.percentage)
+            mutator.reverse_compiled(instructions.compile())
+
+    else:
+        most_likely_instructions = get_most_likely_instructions(state_instructions, probability_cutoff)
+        next_damage_calc_types = get_next_damage_calc_types(damage_calc_types)
+        for instructions in state_instructions:
+            this_percentage = instructions.percentage
+            if probability_cutoff and is_cut_off(instructions, most_likely_instructions, probability_cutoff):
+                score += evaluate_cut_off_instructions(mutator, instructions, statistics) * this_percentage
+                continue
+
+            mutator.apply_compiled(instructions.compile())
+            next_turn_user_options, next_turn_opponent_options = mutator.state.get_all_options()
+            payoff_matrix = get_payoff_matrix(mutator, next_turn_user_options, next_turn_opponent_options, depth=depth, prune=prune, transposition_table=transposition_table, deadline=deadline, statistics=statistics, history=history, probability_cutoff=probability_cutoff, damage_calc_types=next_damage_calc_types, backup=backup)
+            score += back_up_payoff_matrix(payoff_matrix, backup) * this_percentage
+            mutator.reverse_compiled(instructions.compile())
+
+    return score
+
+
+def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=True, transposition_table=None, deadline=None, statistics=None, history=None, probability_cutoff=0, damage_calc_types=(), backup=constants.MAXIMIN_BACKUP):
     """
     :param mutator: a StateMutator object representing the state of the battle
     :param user_options: options for the bot
     :param opponent_options: options for the opponent
     :param depth: the remaining depth before the state is evaluated
     :param prune: specify whether or not to prune the tree
-    :return: a dictionary representing the potential move combinations and their associated scores
+    :param transposition_table: an optional TranspositionTable used to re-use the results of positions already searched
+    :param deadline: an optional time.time() value. SearchTimeoutError is raised if the search is still running after this time
+                     the mutator's state is left partially modified when this happens and should be discarded
+    :param statistics: an optional SearchStatistics object that counts the nodes, prunes, and time spent in this search
+    :param history: an optional MoveHistory object used to order the options of every node in this search
+                    the scores are the same with or without it, but the keys are in the order they were searched
+    :param probability_cutoff: outcomes of a turn that are less likely than this are evaluated without searching any deeper
+                               the most likely outcome of a turn is always searched
+    :param damage_calc_types: an optional schedule of damage calc types, one for each turn starting with this one
+                              the last one is used for every turn after it. ShowdownConfig.damage_calc_type is used when it is empty
+    :param backup: how the value of each node below this one is found from its payoff-matrix, one of constants.SEARCH_BACKUPS
+                   nothing is pruned unless this is `maximin`, because the value of an equilibrium depends on every cell
+    :return: a PayoffMatrix of the potential move combinations and their associated scores
     """
 
+    if deadline is not None and time.time() > deadline:
+        raise SearchTimeoutError()
+
+    if statistics is not None:
+        statistics.record_node(depth)
+
+    prune = prune and backup == constants.MAXIMIN_BACKUP
+
+    transposition_key = None
+    if transposition_table is not None:
+        transposition_key = (mutator.state_hash, depth, prune, probability_cutoff, tuple(damage_calc_types), backup, tuple(user_options), tuple(opponent_options))
+        state_scores = transposition_table.get(transposition_key)
+        if state_scores is not None:
+            if statistics is not None:
+                statistics.transposition_hits += 1
+            return state_scores
+
     winner = mutator.state.battle_is_finished()
     if winner:
-        return {(constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): evaluate(mutator.state) + WON_BATTLE*depth*winner}
+        return PayoffMatrix(
+            [constants.DO_NOTHING_MOVE],
+            [constants.DO_NOTHING_MOVE],
+            [[evaluate_with_statistics(mutator, statistics) + WON_BATTLE*depth*winner]]
+        )
+
+    node_depth = depth
+    if history is not None:
+        user_options = history.order_user_options(user_options, node_depth)
+        opponent_options = history.order_opponent_options(opponent_options, node_depth)
 
     depth -= 1
 
@@ -84,47 +203,65 @@ def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=Tr
     # this is a special case in a random battle where the opponent's pokemon has fainted, but the opponent still
     # has reserves left that are unseen
     if opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0:
-        return {(user_option, constants.DO_NOTHING_MOVE): evaluate(mutator.state) for user_option in user_options}
+        return PayoffMatrix(
+            user_options,
+            [constants.DO_NOTHING_MOVE],
+            [[evaluate_with_statistics(mutator, statistics)] for _ in user_options]
+        )
 
-    state_scores = dict()
+    # the parts of a turn that are shared between the cells of this node
+    turn_cache = TurnCache()
+
+    def score_cell(user_move, opponent_move):
+        return get_move_pair_score(mutator, user_move, opponent_move, depth, prune, transposition_table, deadline, statistics, history, probability_cutoff, damage_calc_types, turn_cache, backup)
+
+    state_scores = search_payoff_matrix_rows(user_options, opponent_options, score_cell, prune, statistics, history, node_depth)
+
+    if transposition_key is not None:
+        transposition_table.set(transposition_key, state_scores)
+
+    return state_scores
+
+
+def search_payoff_matrix_rows(user_options, opponent_options, score_cell, prune, statistics, history, node_depth):
+    """
+    Fills in a PayoffMatrix one row at a time with `score_cell(user_move, opponent_move)`
+
+    When `prune` is True the rest of a row is skipped as soon as one of its cells is worse than the best row so far.
+    The skipped cells are nan and every other cell holds the score that `score_cell` returned.
+    """
+    # the columns stay in this order even though the opponent's options are re-ordered while searching
+    state_scores = PayoffMatrix(user_options, opponent_options, [])
 
     best_score = float('-inf')
+    best_user_move = None
+    best_row_refutation = None
     for i, user_move in enumerate(user_options):
+        row = [float('nan')] * len(opponent_options)
+        state_scores.scores.append(row)
         worst_score_for_this_row = float('inf')
+        worst_opponent_move_for_this_row = None
         skip = False
 
         # opponent_options can change during the loop
         # using opponent_options[:] makes a copy when iterating to ensure no funny-business
         for j, opponent_move in enumerate(opponent_options[:]):
             if skip:
-                state_scores[(user_move, opponent_move)] = float('nan')
+                if statistics is not None:
+                    statistics.pruned_cells += 1
                 continue
 
-            score = 0
-            state_instructions = get_all_state_instructions(mutator, user_move, opponent_move)
-            if depth == 0:
-                for instructions in state_instructions:
-                    mutator.apply(instructions.instructions)
-                    t_score = evaluate(mutator.state)
-                    score += (t_score * instructions.percentage)
-                    mutator.reverse(instructions.instructions)
-
-            else:
-                for instructions in state_instructions:
-                    this_percentage = instructions.percentage
-                    mutator.apply(instructions.instructions)
-                    next_turn_user_options, next_turn_opponent_options = mutator.state.get_all_options()
-                    safest = pick_safest(get_payoff_matrix(mutator, next_turn_user_options, next_turn_opponent_options, depth=depth, prune=prune))
-                    score += safest[1] * this_percentage
-                    mutator.reverse(instructions.instructions)
-
-            state_scores[(user_move, opponent_move)] = score
+            score = score_cell(user_move, opponent_move)
+            row[state_scores.opponent_indices[opponent_move]] = score
 
             if score < worst_score_for_this_row:
                 worst_score_for_this_row = score
+                worst_opponent_move_for_this_row = opponent_move
 
             if prune and score < best_score:
                 skip = True
+                if history is not None:
+                    history.record_refutation(opponent_move, node_depth)
 
                 # MOST of the time in pokemon, an opponent's move that causes a prune will cause a prune elsewhere
                 # move this item to the front of the list to prune faster
@@ -132,5 +269,317 @@ def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=Tr
 
         if worst_score_for_this_row > best_score:
             best_score = worst_score_for_this_row
+            best_user_move = user_move
+            best_row_refutation = worst_opponent_move_for_this_row
+
+    if history is not None and best_user_move is not None:
+        history.record_best_user_option(best_user_move, node_depth)
+        history.record_refutation(best_row_refutation, node_depth)
 
     return state_scores
+
+
+def get_move_pair_value(mutator, user_move, opponent_move, depth, alpha, beta, deadline=None, statistics=None, history=None, probability_cutoff=0, damage_calc_types=(), turn_cache=None):
+    """
+    The same expected score as `get_move_pair_score`, searched with an (alpha, beta) window
+
+    Every outcome except the last is searched with an open window because the outcomes after it are not known yet.
+    The last outcome's window is narrowed by the score of the outcomes before it.
+    """
+    score = 0
+    state_instructions = get_state_instructions_with_statistics(mutator, user_move, opponent_move, statistics, damage_calc_types, merge=depth > 0, turn_cache=turn_cache)
+    if depth == 0:
+        for instructions in state_instructions:
+            mutator.apply_compiled(instructions.compile())
+            score += evaluate_with_statistics(mutator, statistics) * instructions.percentage
+            mutator.reverse_compiled(instructions.compile())
+        return score
+
+    most_likely_instructions = get_most_likely_instructions(state_instructions, probability_cutoff)
+    next_damage_calc_types = get_next_damage_calc_types(damage_calc_types)
+    last_index = len(state_instructions) - 1
+    for i, instructions in enumerate(state_instructions):
+        this_percentage = instructions.percentage
+        if probability_cutoff and is_cut_off(instructions, most_likely_instructions, probability_cutoff):
+            score += evaluate_cut_off_instructions(mutator, instructions, statistics) * this_percentage
+            continue
+
+        if i == last_index and this_percentage > 0:
+            child_alpha = (alpha - score) / this_percentage
+            child_beta = (beta - score) / this_percentage
+        else:
+            child_alpha = float('-inf')
+            child_beta = float('inf')
+
+        mutator.apply_compiled(instructions.compile())
+        next_turn_user_options, next_turn_opponent_options = mutator.state.get_all_options()
+        value = get_alpha_beta_value(mutator, next_turn_user_options, next_turn_opponent_options, depth, child_alpha, child_beta, deadline=deadline, statistics=statistics, history=history, probability_cutoff=probability_cutoff, damage_calc_types=next_damage_calc_types)
+        score += value * this_percentage
+        mutator.reverse_compiled(instructions.compile())
+
+    return score
+
+
+def get_alpha_beta_value(mutator, user_options, opponent_options, depth, alpha, beta, deadline=None, statistics=None, history=None, probability_cutoff=0, damage_calc_types=()):
+    """
+    Returns the same safest score as `pick_safest(get_payoff_matrix(...))` when that score is between alpha and beta
+
+    Otherwise the returned value is a bound: the real score is at most the returned value if it is <= alpha,
+    and at least the returned value if it is >= beta.
+    A row is abandoned as soon as one of its cells is known to be <= the best row so far,
+    and a node is abandoned as soon as one of its rows is known to be >= beta.
+    """
+    if deadline is not None and time.time() > deadline:
+        raise SearchTimeoutError()
+
+    if statistics is not None:
+        statistics.record_node(depth)
+
+    winner = mutator.state.battle_is_finished()
+    if winner:
+        return evaluate_with_statistics(mutator, statistics) + WON_BATTLE*depth*winner
+
+    if opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0:
+        return evaluate_with_statistics(mutator, statistics)
+
+    node_depth = depth
+    if history is not None:
+        user_options = history.order_user_options(user_options, node_depth)
+        opponent_options = history.order_opponent_options(opponent_options, node_depth)
+
+    depth -= 1
+
+    # the parts of a turn that are shared between the cells of this node
+    turn_cache = TurnCache()
+
+    best_score = float('-inf')
+    best_user_move = None
+    best_row_refutation = None
+    for user_move in user_options:
+        lower_bound = max(alpha, best_score)
+        worst_score_for_this_row = float('inf')
+        worst_opponent_move_for_this_row = None
+        for opponent_move in opponent_options:
+            if worst_score_for_this_row <= lower_bound:
+                if statistics is not None:
+                    statistics.pruned_cells += 1
+                continue
+
+            score = get_move_pair_value(
+                mutator,
+                user_move,
+                opponent_move,
+                depth,
+                lower_bound,
+                min(worst_score_for_this_row, beta),
+                deadline=deadline,
+                statistics=statistics,
+                history=history,
+                probability_cutoff=probability_cutoff,
+                damage_calc_types=damage_calc_types,
+                turn_cache=turn_cache
+            )
+            if score < worst_score_for_this_row:
+                worst_score_for_this_row = score
+                worst_opponent_move_for_this_row = opponent_move
+                if worst_score_for_this_row <= lower_bound and history is not None:
+                    history.record_refutation(opponent_move, node_depth)
+
+        if worst_score_for_this_row > best_score:
+            best_score = worst_score_for_this_row
+            best_user_move = user_move
+            best_row_refutation = worst_opponent_move_for_this_row
+
+        if best_score >= beta:
+            break
+
+    if history is not None and best_user_move is not None:
+        history.record_best_user_option(best_user_move, node_depth)
+        history.record_refutation(best_row_refutation, node_depth)
+
+    return best_score
+
+
+def get_payoff_matrix_alpha_beta(mutator, user_options, opponent_options, depth=2, deadline=None, statistics=None, history=None, probability_cutoff=0, damage_calc_types=()):
+    """
+    A simultaneous-move alpha-beta search that gives the same payoff-matrix as `get_payoff_matrix` with pruning
+
+    The root is searched the same way as `get_payoff_matrix` searches it, so the same cells are skipped
+    and every other cell holds its exact score. This matters because `remove_guaranteed_opponent_moves` compares
+    the cells of the root to each other, and a cell that only holds a bound would remove different options.
+    Below the root, the bounds found at each node are passed down into the turns below it, so whole subtrees are cut off
+    instead of only the cells of rows that are already worse than the best row.
+
+    :return: a PayoffMatrix of the potential move combinations and their associated scores
+    """
+    if mutator.state.battle_is_finished() or (opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0):
+        return get_payoff_matrix(mutator, user_options, opponent_options, depth=depth, deadline=deadline, statistics=statistics, probability_cutoff=probability_cutoff, damage_calc_types=damage_calc_types)
+
+    if deadline is not None and time.time() > deadline:
+        raise SearchTimeoutError()
+
+    if statistics is not None:
+        statistics.record_node(depth)
+
+    node_depth = depth
+    if history is not None:
+        user_options = history.order_user_options(user_options, node_depth)
+        opponent_options = history.order_opponent_options(opponent_options, node_depth)
+
+    # the parts of a turn that are shared between the cells of the root
+    turn_cache = TurnCache()
+
+    def score_cell(user_move, opponent_move):
+        # an open window gives the exact score of the cell
+        return get_move_pair_value(
+            mutator,
+            user_move,
+            opponent_move,
+            node_depth - 1,
+            float('-inf'),
+            float('inf'),
+            deadline=deadline,
+            statistics=statistics,
+            history=history,
+            probability_cutoff=probability_cutoff,
+            damage_calc_types=damage_calc_types,
+            turn_cache=turn_cache
+        )
+
+    return search_payoff_matrix_rows(user_options, opponent_options, score_cell, True, statistics, history, node_depth)
+
+
+def is_alpha_beta_search(search_mode, prune, backup=constants.MAXIMIN_BACKUP):
+    # the alpha-beta search always prunes and backs up the maximin, so it is only used when both are asked for
+    return search_mode == constants.ALPHA_BETA_SEARCH and prune and backup == constants.MAXIMIN_BACKUP
+
+
+def search_payoff_matrix(mutator, user_options, opponent_options, depth=2, search_mode=constants.MAXIMIN_SEARCH, prune=True, transposition_table=None, deadline=None, statistics=None, history=None, probability_cutoff=0, damage_calc_types=(), backup=constants.MAXIMIN_BACKUP):
+    """Returns the payoff-matrix of `get_payoff_matrix_alpha_beta` when `search_mode` is alpha_beta, otherwise of `get_payoff_matrix`
+       The alpha-beta search does not use the transposition table"""
+    if is_alpha_beta_search(search_mode, prune, backup):
+        return get_payoff_matrix_alpha_beta(
+            mutator,
+            user_options,
+            opponent_options,
+            depth=depth,
+            deadline=deadline,
+            statistics=statistics,
+            history=history,
+            probability_cutoff=probability_cutoff,
+            damage_calc_types=damage_calc_types
+        )
+
+    return get_payoff_matrix(
+        mutator,
+        user_options,
+        opponent_options,
+        depth=depth,
+        prune=prune,
+        transposition_table=transposition_table,
+        deadline=deadline,
+        statistics=statistics,
+        history=history,
+        probability_cutoff=probability_cutoff,
+        damage_calc_types=damage_calc_types,
+        backup=backup
+    )
+
+
+def order_options_from_previous_search(user_options, opponent_options, score_lookup):
+    """Orders the options so that the best row from a previous search is searched first,
+       and so that the opponent's reply that refuted the best row is tried first.
+       Searching in this order lets `prune` cut rows as early as possible"""
+    worst_case = defaultdict(lambda: float('inf'))
+    for (user_move, _), score in score_lookup.items():
+        if not math.isnan(score):
+            worst_case[user_move] = min(worst_case[user_move], score)
+
+    if not worst_case:
+        return user_options, opponent_options
+
+    best_user_move = max(worst_case, key=lambda x: worst_case[x])
+    user_options = sorted(user_options, key=lambda x: worst_case[x] if x in worst_case else float('-inf'), reverse=True)
+
+    def best_row_score(opponent_move):
+        score = score_lookup.get((best_user_move, opponent_move), float('nan'))
+        return float('inf') if math.isnan(score) else score
+
+    opponent_options = sorted(opponent_options, key=best_row_score)
+
+    return user_options, opponent_options
+
+
+def restore_option_order(score_lookup, user_options, opponent_options):
+    return PayoffMatrix.from_score_lookup(score_lookup).reorder(user_options, opponent_options)
+
+
+def iterative_deepening_search(states, time_budget, max_depth=6, prune=True, statistics=None, probability_cutoff=0, damage_calc_types=(), backup=constants.MAXIMIN_BACKUP, search_mode=constants.MAXIMIN_SEARCH):
+    """
+    Searches each state to depth 1, 2, 3... until `time_budget` seconds have passed or `max_depth` is reached
+
+    :param states: a list of (State, user_options, opponent_options) tuples to be searched
+    :param time_budget: the wall-clock time in seconds that may be spent searching
+    :param max_depth: the deepest search that will be started
+    :param prune: specify whether or not to prune the tree
+    :param statistics: an optional SearchStatistics object that counts every depth that was searched
+    :param probability_cutoff: outcomes of a turn that are less likely than this are evaluated without searching any deeper
+    :param damage_calc_types: an optional schedule of damage calc types, one for each turn starting with the first
+    :param backup: how the value of each node below the root is found from its payoff-matrix, one of constants.SEARCH_BACKUPS
+    :param search_mode: one of constants.SEARCH_MODES
+    :return: a tuple of (list of payoff-matrices, depth) for the deepest search that finished for every state
+             depth 1 is always completed regardless of the time budget
+    """
+    deadline = time.time() + time_budget
+    transposition_tables = [TranspositionTable() for _ in states]
+    histories = [MoveHistory() for _ in states]
+    search_order = [(user_options, opponent_options) for _, user_options, opponent_options in states]
+
+    score_lookups = None
+    completed_depth = 0
+    for depth in range(1, max_depth + 1):
+        this_deadline = deadline if score_lookups is not None else None
+        this_depth_score_lookups = []
+        try:
+            for i, (state, _, _) in enumerate(states):
+                # the search is done on a copy because a timeout leaves the state partially modified
+                mutator = StateMutator(deepcopy(state))
+                user_options, opponent_options = search_order[i]
+                this_depth_score_lookups.append(
+                    search_payoff_matrix(
+                        mutator,
+                        user_options,
+                        opponent_options,
+                        depth=depth,
+                        search_mode=search_mode,
+                        prune=prune,
+                        transposition_table=transposition_tables[i],
+                        deadline=this_deadline,
+                        statistics=statistics,
+                        history=histories[i],
+                        probability_cutoff=probability_cutoff,
+                        damage_calc_types=damage_calc_types,
+                        backup=backup
+                    )
+                )
+        except SearchTimeoutError:
+            logger.debug("Search at depth {} did not finish in time".format(depth))
+            break
+
+        score_lookups = this_depth_score_lookups
+        completed_depth = depth
+        search_order = [
+            order_options_from_previous_search(user_options, opponent_options, score_lookup)
+            for (user_options, opponent_options), score_lookup in zip(search_order, score_lookups)
+        ]
+
+        if time.time() > deadline:
+            break
+
+    # return the payoffs in the original order of the options
+    score_lookups = [
+        restore_option_order(score_lookup, user_options, opponent_options)
+        for (_, user_options, opponent_options), score_lookup in zip(states, score_lookups)
+    ]
+
+    return score_lookups, completed_depth
@@ -232,7 +232,7 @@ def parentalbond(attacking_move, defending_move, attacking_pokemon, defending_po
 
 
 def tintedlens(attacking_move, defending_move, attacking_pokemon, defending_pokemon, first_move, weather):
-    if is_not_very_effective(attacking_move[constants.TYPE], defending_pokemon.types):
+    if is_not_very_effective(attacking_move[constants.TYPE], defending_pokemon):
         attacking_move = attacking_move.copy()
         attacking_move[constants.BASE_POWER] *= 2
     return attacking_move
@@ -261,7 +261,7 @@ def steelworker(attacking_move, defending_move, attacking_pokemon, defending_pok
 
 
 def neuroforce(attacking_move, defending_move, attacking_pokemon, defending_pokemon, first_move, weather):
-    if is_super_effective(attacking_move[constants.TYPE], defending_pokemon.types):
+    if is_super_effective(attacking_move[constants.TYPE], defending_pokemon):
         attacking_move = attacking_move.copy()
         attacking_move[constants.BASE_POWER] *= 1.25
     return attacking_move
@@ -1,4 +1,8 @@
 import constants
+from config import ShowdownConfig
+from data import all_move_json
+
+from .damage_calculator import type_effectiveness_against_pokemon
 
 
 def switch_out_move_triggered(move, damage_amounts):
@@ -9,6 +13,34 @@ def switch_out_move_triggered(move, damage_amounts):
             return damage_amounts is not None and all(damage_amounts)
 
 
+def get_best_type_effectiveness(pokemon, defending_pokemon):
+    # the best type effectiveness of the pokemon's damaging moves against the defending pokemon
+    best_effectiveness = 0
+    for move in pokemon.moves:
+        move_json = all_move_json.get(move[constants.ID])
+        if move_json is None or move_json[constants.CATEGORY] not in constants.DAMAGING_CATEGORIES:
+            continue
+        best_effectiveness = max(best_effectiveness, type_effectiveness_against_pokemon(move_json[constants.TYPE], defending_pokemon))
+    return best_effectiveness
+
+
+def get_switch_matchup_score(pokemon, opposing_pokemon):
+    """A cheap estimate of how well the pokemon would do against the opposing pokemon if it switched in:
+       how hard it can hit the opposing pokemon for how hard it can be hit, weighted by its remaining health"""
+    offense = get_best_type_effectiveness(pokemon, opposing_pokemon)
+    defense = get_best_type_effectiveness(opposing_pokemon, pokemon)
+    return (pokemon.hp / pokemon.maxhp) * (1 + offense) / (1 + defense)
+
+
+def get_best_switch_pokemon_by_matchup(attacking_side, defending_side, switches):
+    opposing_pokemon = defending_side.active
+    best_switch = max(
+        switches,
+        key=lambda switch: get_switch_matchup_score(attacking_side.reserve[switch.split()[-1]], opposing_pokemon)
+    )
+    return best_switch.split()[-1].strip()
+
+
 def get_best_switch_pokemon(mutator, instructions, attacker, attacking_side, defending_move, first_move):
     from .select_best_move import get_payoff_matrix
 
@@ -16,14 +48,27 @@ def get_best_switch_pokemon(mutator, instructions, attacker, attacking_side, def
     if not switches or instructions.frozen:
         return None
 
+    if ShowdownConfig.pivot_switch_heuristic:
+        defending_side = mutator.state.opponent if attacker == constants.USER else mutator.state.user
+        return get_best_switch_pokemon_by_matchup(attacking_side, defending_side, switches)
+
     if first_move:
         other_move = defending_move[constants.ID]
     else:
         other_move = constants.DO_NOTHING_MOVE
 
+    # the state hash covers everything that a search can change about the mutator's state,
+    # so the same pivot from the same state always picks the same switch
+    key = (mutator.state_hash, attacker, other_move, ShowdownConfig.damage_calc_type)
+    best_switch = mutator.best_switch_cache.get(key)
+    if best_switch is not None:
+        return best_switch
+
     if attacker == constants.USER:
         best_switch = max(get_payoff_matrix(mutator, switches, [other_move], depth=1).items(), key=lambda x: x[1])[0][0]
     else:
         best_switch = min(get_payoff_matrix(mutator, [other_move], switches, depth=1).items(), key=lambda x: x[1])[0][1]
 
-    return best_switch.split()[-1].strip()
+    best_switch = best_switch.split()[-1].strip()
+    mutator.best_switch_cache.set(key, best_switch)
+    return best_switch
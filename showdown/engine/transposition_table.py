@@ -0,0 +1,17 @@
+from .bounded_cache import BoundedCache
+
+
+DEFAULT_MAX_SIZE = 10000
+
+
+class TranspositionTable(BoundedCache):
+    """
+    A bounded cache of the payoff-matrices of positions that have already been searched
+
+    Different move orders frequently transpose into the same state, so the key is built from
+    the StateMutator's incremental hash along with everything else the search result depends on.
+    The least-recently-used entry is evicted when the table is full.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        super().__init__(max_size)
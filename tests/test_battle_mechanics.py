@@ -14,6 +14,8 @@ from copy import deepcopy
 from showdown.engine.objects import TransposeInstruction
 from showdown.engine.find_state_instructions import get_all_state_instructions
 from showdown.engine.find_state_instructions import remove_duplicate_instructions
+from showdown.engine.find_state_instructions import merge_instructions_by_resulting_state
+from showdown.engine.find_state_instructions import TurnCache
 from showdown.engine.find_state_instructions import lookup_move
 from showdown.engine.find_state_instructions import user_moves_first
 from showdown.engine.objects import State
@@ -2045,7 +2047,7 @@ class TestBattleMechanics(unittest.TestCase):
                 [
                     ('damage', 'opponent', 72),
                     ('damage', 'user', 60),
-                    ('switch', 'opponent', 'aromatisse', 'slurpuff')
+                    ('switch', 'opponent', 'aromatisse', 'yveltal')
                 ],
                 False
             ),
@@ -2053,6 +2055,38 @@ class TestBattleMechanics(unittest.TestCase):
 
         self.assertEqual(expected_instructions, instructions)
 
+    def test_uturn_from_the_same_state_reuses_the_best_switch(self):
+        bot_move = "thunderbolt"
+        opponent_move = "uturn"
+        self.state.user.active.speed = 2
+        self.state.opponent.active.speed = 1
+        get_all_state_instructions(self.mutator, bot_move, opponent_move)
+
+        self.assertEqual(1, self.mutator.best_switch_cache.misses)
+        self.assertEqual(1, self.mutator.best_switch_cache.hits)
+
+    def test_uturn_with_pivot_switch_heuristic_switches_to_the_best_matchup(self):
+        bot_move = "splash"
+        opponent_move = "uturn"
+        self.state.user.active.moves = [{constants.ID: 'thunderbolt', constants.DISABLED: False}]
+        self.state.opponent.reserve['bronzong'].moves = [{constants.ID: 'earthquake', constants.DISABLED: False}]
+        with mock.patch.object(ShowdownConfig, 'pivot_switch_heuristic', True):
+            instructions = get_all_state_instructions(self.mutator, bot_move, opponent_move)
+
+        expected_instructions = [
+            TransposeInstruction(
+                1,
+                [
+                    ('damage', 'user', 60),
+                    ('switch', 'opponent', 'aromatisse', 'bronzong')
+                ],
+                False
+            )
+        ]
+
+        self.assertEqual(expected_instructions, instructions)
+        self.assertEqual(0, len(self.mutator.best_switch_cache))
+
     def test_uturn_when_there_are_no_available_switches_works(self):
         bot_move = "splash"
         opponent_move = "uturn"
@@ -13544,6 +13578,33 @@ class TestBattleMechanics(unittest.TestCase):
 
         self.assertEqual(expected_instructions, instructions)
 
+    def test_turn_cache_gives_the_same_instructions_as_generating_every_turn(self):
+        turn_cache = TurnCache()
+        bot_move = "tackle"
+        for opponent_move in ["tackle", "watergun", "splash", "switch yveltal"]:
+            cached_instructions = get_all_state_instructions(self.mutator, bot_move, opponent_move, turn_cache=turn_cache)
+            instructions = get_all_state_instructions(self.mutator, bot_move, opponent_move)
+
+            self.assertEqual(instructions, cached_instructions)
+
+    def test_turn_cache_reuses_the_first_move_for_defending_moves_with_the_same_effect(self):
+        self.state.user.active.speed = 2
+        self.state.opponent.active.speed = 1
+        turn_cache = TurnCache()
+        get_all_state_instructions(self.mutator, "tackle", "tackle", turn_cache=turn_cache)
+        instructions = get_all_state_instructions(self.mutator, "tackle", "watergun", turn_cache=turn_cache)
+
+        self.assertEqual(1, turn_cache.hits)
+        self.assertEqual(get_all_state_instructions(self.mutator, "tackle", "watergun"), instructions)
+
+    def test_turn_cache_does_not_reuse_suckerpunch_against_a_status_move(self):
+        turn_cache = TurnCache()
+        get_all_state_instructions(self.mutator, "tackle", "suckerpunch", turn_cache=turn_cache)
+        instructions = get_all_state_instructions(self.mutator, "splash", "suckerpunch", turn_cache=turn_cache)
+
+        self.assertEqual(0, turn_cache.hits)
+        self.assertEqual(get_all_state_instructions(self.mutator, "splash", "suckerpunch"), instructions)
+
 
 class TestRemoveDuplicateInstructions(unittest.TestCase):
     def test_turns_two_identical_instructions_into_one(self):
@@ -13793,6 +13854,82 @@ class TestRemoveDuplicateInstructions(unittest.TestCase):
         self.assertEqual(expected_instructions, new_instructions)
 
 
+class TestMergeInstructionsByResultingState(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+                        Side(
+                            Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                            {
+                                "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                            },
+                            (0, 0),
+                            defaultdict(lambda: 0),
+                            (0,0)
+                        ),
+                        Side(
+                            Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                            {
+                                "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                            },
+                            (0, 0),
+                            defaultdict(lambda: 0),
+                            (0,0)
+                        ),
+                        None,
+                        None,
+                        False
+                    )
+
+        self.mutator = StateMutator(self.state)
+
+    def test_combines_different_instructions_that_result_in_the_same_state(self):
+        instructions = [
+            TransposeInstruction(0.25, [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)], False),
+            TransposeInstruction(0.75, [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 4), (constants.MUTATOR_DAMAGE, constants.OPPONENT, 6)], False),
+        ]
+
+        merged = merge_instructions_by_resulting_state(self.mutator, instructions)
+
+        self.assertEqual(1, len(merged))
+        self.assertEqual(1, merged[0].percentage)
+        self.assertEqual([(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)], merged[0].instructions)
+
+    def test_does_not_combine_instructions_that_result_in_different_states(self):
+        instructions = [
+            TransposeInstruction(0.5, [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)], False),
+            TransposeInstruction(0.5, [(constants.MUTATOR_DAMAGE, constants.USER, 10)], False),
+        ]
+
+        merged = merge_instructions_by_resulting_state(self.mutator, instructions)
+
+        self.assertEqual(instructions, merged)
+
+    def test_combines_two_instructions_but_keeps_the_other(self):
+        instructions = [
+            TransposeInstruction(0.2, [(constants.MUTATOR_BOOST, constants.USER, constants.ATTACK, 1), (constants.MUTATOR_DAMAGE, constants.USER, 5)], False),
+            TransposeInstruction(0.3, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], False),
+            TransposeInstruction(0.5, [(constants.MUTATOR_DAMAGE, constants.USER, 5), (constants.MUTATOR_BOOST, constants.USER, constants.ATTACK, 1)], False),
+        ]
+
+        merged = merge_instructions_by_resulting_state(self.mutator, instructions)
+
+        self.assertEqual(2, len(merged))
+        self.assertEqual(0.7, merged[0].percentage)
+        self.assertEqual(0.3, merged[1].percentage)
+
+    def test_state_is_unchanged_after_merging(self):
+        state_hash = self.state.calculate_hash()
+        instructions = [
+            TransposeInstruction(0.5, [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)], False),
+            TransposeInstruction(0.5, [(constants.MUTATOR_APPLY_STATUS, constants.OPPONENT, constants.BURN)], False),
+        ]
+
+        merge_instructions_by_resulting_state(self.mutator, instructions)
+
+        self.assertEqual(state_hash, self.state.calculate_hash())
+        self.assertEqual(state_hash, self.mutator.state_hash)
+
+
 class TestUserMovesFirst(unittest.TestCase):
     def setUp(self):
         self.state = State(
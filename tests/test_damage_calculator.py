@@ -2,8 +2,15 @@ import unittest
 from collections import defaultdict
 
 import constants
+from data import all_move_json
 from showdown.engine.damage_calculator import _calculate_damage
 from showdown.engine.damage_calculator import calculate_damage
+from showdown.engine.damage_calculator import damage_cache
+from showdown.engine.damage_calculator import calculate_damage_rolls_batch
+from showdown.engine.damage_calculator import pokemon_type_indicies
+from showdown.engine.damage_calculator import damage_multipication_array
+from showdown.engine.damage_calculator import type_effectiveness_modifier
+from showdown.engine.damage_calculator import type_effectiveness_against_pokemon
 from showdown.engine.objects import State
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
@@ -53,6 +60,23 @@ class TestCalculateDamageAmount(unittest.TestCase):
         dmg = _calculate_damage(self.venusaur, self.charizard, move, calc_type='max')
         self.assertEqual([0], dmg)
 
+    def test_thousandarrows_ignores_the_flying_type(self):
+        move = 'thousandarrows'
+
+        dmg = _calculate_damage(self.venusaur, self.charizard, move, calc_type='max')
+        self.assertEqual([160], dmg)
+
+    def test_roosting_pokemon_loses_its_ground_immunity_only_while_roosting(self):
+        move = 'earthquake'
+        self.charizard.volatile_status.add(constants.ROOST)
+
+        roosting_dmg = _calculate_damage(self.venusaur, self.charizard, move, calc_type='max')
+        self.charizard.volatile_status.remove(constants.ROOST)
+        dmg = _calculate_damage(self.venusaur, self.charizard, move, calc_type='max')
+
+        self.assertEqual([178], roosting_dmg)
+        self.assertEqual([0], dmg)
+
     def test_burn_modifier_properly_halves_physical_damage(self):
         move = 'rockslide'
 
@@ -338,6 +362,115 @@ class TestCalculateDamageAmount(unittest.TestCase):
         self.assertEqual([18], dmg)
 
 
+class TestDamageCache(unittest.TestCase):
+    def setUp(self):
+        damage_cache.clear()
+        self.charizard = Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict())
+        self.venusaur = Pokemon.from_state_pokemon_dict(StatePokemon("venusaur", 100).to_dict())
+
+    def test_same_calculation_twice_is_a_cache_hit(self):
+        first = _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        second = _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+
+        self.assertEqual([300], first)
+        self.assertEqual(first, second)
+        self.assertEqual(1, damage_cache.hits)
+        self.assertEqual(1, damage_cache.misses)
+
+    def test_changing_a_boost_is_not_a_cache_hit(self):
+        _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        self.charizard.special_attack_boost = 2
+
+        dmg = _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+
+        self.assertEqual([597], dmg)
+        self.assertEqual(0, damage_cache.hits)
+
+    def test_changing_the_conditions_is_not_a_cache_hit(self):
+        _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+
+        dmg = _calculate_damage(self.charizard, self.venusaur, 'fireblast', {constants.LIGHT_SCREEN: 1}, calc_type='max')
+
+        self.assertEqual([150], dmg)
+        self.assertEqual(0, damage_cache.hits)
+
+    def test_modifying_the_returned_damage_does_not_modify_the_cache(self):
+        dmg = _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        dmg.append(1)
+
+        self.assertEqual([300], _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max'))
+
+
+class TestCalculateDamageRollsBatch(unittest.TestCase):
+    def setUp(self):
+        self.charizard = Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict())
+        self.venusaur = Pokemon.from_state_pokemon_dict(StatePokemon("venusaur", 100).to_dict())
+
+    def test_batch_matches_calculating_each_pairing_separately(self):
+        pairings = [
+            (self.charizard, self.venusaur, 'fireblast', constants.SPECIAL_ATTACK, constants.SPECIAL_DEFENSE, 1.5),
+            (self.charizard, self.venusaur, 'flareblitz', constants.ATTACK, constants.DEFENSE, 1.5),
+            (self.venusaur, self.charizard, 'gigadrain', constants.SPECIAL_ATTACK, constants.SPECIAL_DEFENSE, 1.5),
+            (self.venusaur, self.charizard, 'earthquake', constants.ATTACK, constants.DEFENSE, 1),
+            (self.venusaur, self.charizard, 'bodyslam', constants.ATTACK, constants.DEFENSE, 1),
+        ]
+
+        rolls = calculate_damage_rolls_batch(
+            [attacker.level for attacker, *_ in pairings],
+            [attacker.calculate_boosted_stats()[attack] for attacker, _, _, attack, _, _ in pairings],
+            [defender.calculate_boosted_stats()[defense] for _, defender, _, _, defense, _ in pairings],
+            [all_move_json[move][constants.BASE_POWER] for _, _, move, _, _, _ in pairings],
+            [pokemon_type_indicies[all_move_json[move][constants.TYPE]] for _, _, move, _, _, _ in pairings],
+            [[pokemon_type_indicies[t] for t in (defender.types + ['typeless'])[:2]] for _, defender, *_ in pairings],
+            [modifier for *_, modifier in pairings]
+        )
+
+        self.assertEqual((5, 16), rolls.shape)
+        for (attacker, defender, move, _, _, _), batch_rolls in zip(pairings, rolls):
+            expected = sorted(_calculate_damage(attacker, defender, move, calc_type='all'))
+            self.assertEqual(expected, sorted(set(batch_rolls.tolist())))
+
+    def test_rolls_are_ordered_from_lowest_to_highest(self):
+        rolls = calculate_damage_rolls_batch([100], [300], [200], [100], [pokemon_type_indicies['normal']], [[pokemon_type_indicies['normal'], pokemon_type_indicies['typeless']]])
+
+        self.assertEqual(sorted(rolls[0].tolist()), rolls[0].tolist())
+
+    def test_immune_defender_takes_no_damage(self):
+        rolls = calculate_damage_rolls_batch([100], [300], [200], [100], [pokemon_type_indicies['normal']], [[pokemon_type_indicies['ghost'], pokemon_type_indicies['typeless']]])
+
+        self.assertEqual([0] * 16, rolls[0].tolist())
+
+
+class TestTypeEffectiveness(unittest.TestCase):
+    def setUp(self):
+        self.venusaur = Pokemon.from_state_pokemon_dict(StatePokemon("venusaur", 100).to_dict())
+
+    def test_table_matches_multiplying_each_defending_type(self):
+        for attacking_type, attacking_index in pokemon_type_indicies.items():
+            for primary, primary_index in pokemon_type_indicies.items():
+                for secondary, secondary_index in pokemon_type_indicies.items():
+                    expected = damage_multipication_array[attacking_index][primary_index] * damage_multipication_array[attacking_index][secondary_index]
+                    self.assertEqual(expected, type_effectiveness_modifier(attacking_type, [primary, secondary]))
+
+    def test_mono_type_pokemon(self):
+        self.assertEqual(2, type_effectiveness_modifier('water', ['fire']))
+
+    def test_pokemon_without_types(self):
+        self.assertEqual(1, type_effectiveness_modifier('ground', []))
+
+    def test_pokemon_with_three_types(self):
+        self.assertEqual(8, type_effectiveness_modifier('fire', ['grass', 'bug', 'steel']))
+
+    def test_against_pokemon_uses_its_types(self):
+        self.assertEqual(2, type_effectiveness_against_pokemon('fire', self.venusaur))
+
+    def test_against_pokemon_is_updated_when_its_types_change(self):
+        type_effectiveness_against_pokemon('fire', self.venusaur)
+        self.venusaur.types = ['water']
+
+        self.assertEqual(0.5, type_effectiveness_against_pokemon('fire', self.venusaur))
+
+
 class TestCalculateDamage(unittest.TestCase):
     def setUp(self):
         self.blastoise = Pokemon.from_state_pokemon_dict(StatePokemon("blastoise", 100).to_dict())
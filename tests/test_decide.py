@@ -1,7 +1,9 @@
 import unittest
 from unittest import mock
 
+from config import ShowdownConfig
 from showdown.engine.select_best_move import pick_safest
+from showdown.battle_bots.nash_equilibrium.main import find_nash_equilibrium
 from showdown.battle_bots.nash_equilibrium.main import get_weighted_choices_from_multiple_score_lookups
 
 
@@ -165,3 +167,31 @@ class TestGetWeightedChoices(unittest.TestCase):
         expected_choices = [('a', 0.75), ('b', 0.25)]
 
         self.assertEqual(expected_choices, choices)
+
+
+class TestFindNashEquilibrium(unittest.TestCase):
+    def setUp(self):
+        self.score_lookup = {
+            ('a', 'c'): 1,
+            ('a', 'd'): -1,
+            ('b', 'c'): -1,
+            ('b', 'd'): 1,
+        }
+
+    def test_finds_the_equilibrium_without_gambit(self):
+        with mock.patch('showdown.battle_bots.nash_equilibrium.main.find_all_equilibria') as find_all_equilibria_mock:
+            bot_choices, opponent_choices, bot_percentages, opponent_percentages, score = find_nash_equilibrium(self.score_lookup)
+
+        find_all_equilibria_mock.assert_not_called()
+        self.assertEqual(['a', 'b'], bot_choices)
+        self.assertEqual(['c', 'd'], opponent_choices)
+        self.assertAlmostEqual(0.5, bot_percentages[0])
+        self.assertAlmostEqual(0.5, opponent_percentages[0])
+        self.assertAlmostEqual(0, score)
+
+    def test_gambit_cross_check_failing_does_not_stop_the_decision(self):
+        with mock.patch.object(ShowdownConfig, 'nash_gambit_cross_check', True), \
+                mock.patch('showdown.battle_bots.nash_equilibrium.main.find_all_equilibria', side_effect=OSError("gambit-enummixed not found")):
+            _, _, _, _, score = find_nash_equilibrium(self.score_lookup)
+
+        self.assertAlmostEqual(0, score)
@@ -0,0 +1,61 @@
+import unittest
+
+import constants
+from showdown.engine.evaluate import Scoring
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.evaluate import evaluate_pokemon
+from showdown.engine.evaluate import _evaluate_pokemon
+from showdown.engine.evaluate import pokemon_score_cache
+from showdown.engine.objects import Pokemon
+
+
+class TestEvaluatePokemonCache(unittest.TestCase):
+    def setUp(self):
+        pokemon_score_cache.clear()
+        self.pokemon = Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict())
+
+    def test_same_pokemon_twice_is_a_cache_hit(self):
+        first = evaluate_pokemon(self.pokemon)
+        second = evaluate_pokemon(self.pokemon)
+
+        self.assertEqual(_evaluate_pokemon(self.pokemon), first)
+        self.assertEqual(first, second)
+        self.assertEqual(1, pokemon_score_cache.hits)
+        self.assertEqual(1, pokemon_score_cache.misses)
+
+    def test_changing_a_boost_is_not_a_cache_hit(self):
+        evaluate_pokemon(self.pokemon)
+        self.pokemon.speed_boost = 2
+
+        score = evaluate_pokemon(self.pokemon)
+
+        self.assertEqual(_evaluate_pokemon(self.pokemon), score)
+        self.assertEqual(0, pokemon_score_cache.hits)
+
+    def test_changing_the_volatile_statuses_is_not_a_cache_hit(self):
+        evaluate_pokemon(self.pokemon)
+        self.pokemon.volatile_status.add(constants.SUBSTITUTE)
+
+        score = evaluate_pokemon(self.pokemon)
+
+        self.assertEqual(_evaluate_pokemon(self.pokemon), score)
+        self.assertEqual(0, pokemon_score_cache.hits)
+
+    def test_fainted_pokemon_is_not_cached(self):
+        self.pokemon.hp = 0
+
+        self.assertEqual(0, evaluate_pokemon(self.pokemon))
+        self.assertEqual(0, len(pokemon_score_cache))
+
+    def test_changing_the_static_alive_score_is_used_by_cached_scores(self):
+        evaluate_pokemon(self.pokemon)
+        original_alive_static = Scoring.POKEMON_ALIVE_STATIC
+        Scoring.POKEMON_ALIVE_STATIC = 30
+        try:
+            score = evaluate_pokemon(self.pokemon)
+            expected = _evaluate_pokemon(self.pokemon)
+        finally:
+            Scoring.POKEMON_ALIVE_STATIC = original_alive_static
+
+        self.assertEqual(expected, score)
+        self.assertEqual(1, pokemon_score_cache.hits)
@@ -0,0 +1,72 @@
+import unittest
+from copy import copy
+
+import constants
+from showdown.engine.instruction_sequence import InstructionSequence
+from showdown.engine.objects import TransposeInstruction
+
+
+class TestInstructionSequence(unittest.TestCase):
+    def setUp(self):
+        self.first_instruction = (constants.MUTATOR_DAMAGE, constants.USER, 25)
+        self.second_instruction = (constants.MUTATOR_HEAL, constants.OPPONENT, 10)
+        self.sequence = InstructionSequence([self.first_instruction, self.second_instruction])
+
+    def test_sequence_behaves_like_a_list(self):
+        self.assertEqual(2, len(self.sequence))
+        self.assertEqual([self.first_instruction, self.second_instruction], list(self.sequence))
+        self.assertEqual([self.second_instruction, self.first_instruction], list(reversed(self.sequence)))
+        self.assertEqual(self.second_instruction, self.sequence[-1])
+        self.assertEqual([self.first_instruction, self.second_instruction], self.sequence)
+
+    def test_appending_to_a_copy_does_not_change_the_original(self):
+        copied_sequence = self.sequence.copy()
+        copied_sequence.append((constants.MUTATOR_DAMAGE, constants.USER, 5))
+
+        self.assertEqual([self.first_instruction, self.second_instruction], self.sequence)
+        self.assertEqual(3, len(copied_sequence))
+
+    def test_copy_shares_the_nodes_of_the_original(self):
+        copied_sequence = self.sequence.copy()
+        copied_sequence.append((constants.MUTATOR_DAMAGE, constants.USER, 5))
+
+        self.assertIs(self.sequence.tail, copied_sequence.tail.parent)
+
+    def test_sequences_with_different_last_instructions_are_not_equal(self):
+        copied_sequence = self.sequence.copy()
+        self.sequence.append((constants.MUTATOR_DAMAGE, constants.USER, 5))
+        copied_sequence.append((constants.MUTATOR_DAMAGE, constants.USER, 6))
+
+        self.assertNotEqual(self.sequence, copied_sequence)
+
+    def test_separately_built_sequences_with_the_same_instructions_are_equal(self):
+        self.assertEqual(InstructionSequence([self.first_instruction, self.second_instruction]), self.sequence)
+
+    def test_inplace_add_extends_the_sequence(self):
+        self.sequence += [(constants.MUTATOR_DAMAGE, constants.USER, 5)]
+
+        self.assertEqual(3, len(self.sequence))
+        self.assertIsInstance(self.sequence, InstructionSequence)
+
+    def test_shared_instruction_is_only_compiled_once(self):
+        self.sequence.compile()
+        copied_sequence = self.sequence.copy()
+        copied_sequence.append((constants.MUTATOR_DAMAGE, constants.USER, 5))
+
+        compiled_instructions = copied_sequence.compile()
+
+        self.assertIs(self.sequence.tail.operations[0], compiled_instructions.apply_operations[1])
+        self.assertEqual(3, len(compiled_instructions.reverse_operations))
+
+    def test_transpose_instruction_wraps_a_list_of_instructions(self):
+        instruction = TransposeInstruction(1, [self.first_instruction])
+
+        self.assertIsInstance(instruction.instructions, InstructionSequence)
+
+    def test_copy_of_transpose_instruction_shares_instructions(self):
+        instruction = TransposeInstruction(1, [self.first_instruction])
+        copied_instruction = copy(instruction)
+        copied_instruction.add_instruction(self.second_instruction)
+
+        self.assertEqual([self.first_instruction], instruction.instructions)
+        self.assertIs(instruction.instructions.tail, copied_instruction.instructions.tail.parent)
@@ -0,0 +1,134 @@
+import random
+import unittest
+from collections import defaultdict
+
+import constants
+from config import ShowdownConfig
+from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import Pokemon
+from showdown.engine.objects import StateMutator
+from showdown.engine.objects import TransposeInstruction
+from showdown.engine.monte_carlo import monte_carlo_tree_search
+from showdown.engine.monte_carlo import sample_state_instructions
+from showdown.engine.monte_carlo import select_option
+from showdown.battle import Pokemon as StatePokemon
+
+
+class TestMonteCarloTreeSearch(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                    "starmie": Pokemon.from_state_pokemon_dict(StatePokemon("starmie", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                    "toxapex": Pokemon.from_state_pokemon_dict(StatePokemon("toxapex", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False
+        )
+
+        self.state.user.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'surf', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'nastyplot', constants.DISABLED: False, constants.CURRENT_PP: 16},
+        ]
+        self.state.opponent.active.moves = [
+            {constants.ID: 'moonblast', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'toxic', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'protect', constants.DISABLED: False, constants.CURRENT_PP: 16},
+        ]
+        self.mutator = StateMutator(self.state)
+
+    def test_runs_the_given_number_of_iterations(self):
+        user_options, opponent_options = self.state.get_all_options()
+
+        root = monte_carlo_tree_search(self.mutator, user_options, opponent_options, iterations=50, rng=random.Random(1))
+
+        self.assertEqual(50, root.visits)
+        self.assertEqual(50, sum(root.get_user_visits().values()))
+        self.assertEqual(50, sum(root.opponent_visits))
+
+    def test_every_option_is_tried(self):
+        user_options, opponent_options = self.state.get_all_options()
+
+        root = monte_carlo_tree_search(self.mutator, user_options, opponent_options, iterations=50, rng=random.Random(1))
+
+        self.assertTrue(all(visits > 0 for visits in root.user_visits))
+        self.assertTrue(all(visits > 0 for visits in root.opponent_visits))
+
+    def test_state_is_unchanged_after_searching(self):
+        user_options, opponent_options = self.state.get_all_options()
+        hash_before = self.state.calculate_hash()
+
+        monte_carlo_tree_search(self.mutator, user_options, opponent_options, iterations=50, rng=random.Random(1))
+
+        self.assertEqual(hash_before, self.state.calculate_hash())
+
+    def test_same_random_seed_gives_the_same_search(self):
+        user_options, opponent_options = self.state.get_all_options()
+        first = monte_carlo_tree_search(self.mutator, user_options, opponent_options, iterations=50, rng=random.Random(1))
+
+        second = monte_carlo_tree_search(self.mutator, user_options, opponent_options, iterations=50, rng=random.Random(1))
+
+        self.assertEqual(first.get_user_visits(), second.get_user_visits())
+
+    def test_stops_when_the_time_budget_is_used_up(self):
+        user_options, opponent_options = self.state.get_all_options()
+
+        root = monte_carlo_tree_search(self.mutator, user_options, opponent_options, time_budget=0)
+
+        self.assertEqual(1, root.visits)
+
+    def test_finished_battle_is_not_searched(self):
+        self.state.opponent.active.hp = 0
+        for pkmn in self.state.opponent.reserve.values():
+            pkmn.hp = 0
+        user_options, opponent_options = self.state.get_all_options()
+
+        root = monte_carlo_tree_search(self.mutator, user_options, opponent_options, iterations=50)
+
+        self.assertEqual(0, root.visits)
+
+    def test_a_budget_is_required(self):
+        user_options, opponent_options = self.state.get_all_options()
+
+        with self.assertRaises(ValueError):
+            monte_carlo_tree_search(self.mutator, user_options, opponent_options)
+
+
+class TestSelectOption(unittest.TestCase):
+    def test_unvisited_option_is_selected_first(self):
+        self.assertEqual(1, select_option([3, 0, 2], [3.0, 0.0, 0.0], 5, 1.4))
+
+    def test_option_with_best_average_is_selected_without_exploration(self):
+        self.assertEqual(2, select_option([2, 2, 2], [0.5, 1.0, 1.5], 6, 0))
+
+    def test_exploration_favours_the_option_with_fewer_visits(self):
+        self.assertEqual(1, select_option([100, 1], [60.0, 0.5], 101, 1.4))
+
+
+class TestSampleStateInstructions(unittest.TestCase):
+    def test_outcomes_are_sampled_by_their_percentage(self):
+        state_instructions = [TransposeInstruction(0.25, []), TransposeInstruction(0.75, [])]
+        rng = random.Random(1)
+
+        samples = [sample_state_instructions(state_instructions, rng) for _ in range(4000)]
+
+        self.assertAlmostEqual(0.75, samples.count(1) / len(samples), delta=0.03)
@@ -0,0 +1,63 @@
+import math
+import pickle
+import unittest
+
+from showdown.engine.payoff_matrix import PayoffMatrix
+from showdown.engine.payoff_matrix import concatenate_payoff_matrices
+
+
+class TestPayoffMatrix(unittest.TestCase):
+    def setUp(self):
+        self.score_lookup = {
+            ('tackle', 'tackle'): 10,
+            ('tackle', 'splash'): 20,
+            ('earthquake', 'tackle'): 5,
+            ('earthquake', 'splash'): 30,
+        }
+        self.payoff_matrix = PayoffMatrix.from_score_lookup(self.score_lookup)
+
+    def test_payoff_matrix_can_be_used_as_the_score_lookup_it_was_made_from(self):
+        self.assertEqual(self.score_lookup, self.payoff_matrix)
+        self.assertEqual(list(self.score_lookup.keys()), list(self.payoff_matrix.keys()))
+        self.assertEqual(5, self.payoff_matrix[('earthquake', 'tackle')])
+
+    def test_missing_cells_are_nan(self):
+        payoff_matrix = PayoffMatrix.from_score_lookup({('tackle', 'tackle'): 10, ('earthquake', 'splash'): 30})
+
+        self.assertTrue(math.isnan(payoff_matrix[('tackle', 'splash')]))
+
+    def test_safest_ignores_nan_cells(self):
+        payoff_matrix = PayoffMatrix(['tackle', 'earthquake'], ['tackle', 'splash'], [[10, 20], [float('nan'), 15]])
+
+        self.assertEqual((('earthquake', 'splash'), 15), payoff_matrix.safest())
+
+    def test_safest_picks_the_first_of_tied_options(self):
+        payoff_matrix = PayoffMatrix(['tackle', 'earthquake'], ['tackle', 'splash'], [[10, 10], [10, 10]])
+
+        self.assertEqual((('tackle', 'tackle'), 10), payoff_matrix.safest())
+
+    def test_remove_guaranteed_opponent_moves_keeps_the_columns_with_different_scores(self):
+        payoff_matrix = PayoffMatrix(['tackle', 'earthquake'], ['tackle', 'splash'], [[10, 20], [10, 30]])
+
+        self.assertEqual({('tackle', 'splash'): 20, ('earthquake', 'splash'): 30}, payoff_matrix.remove_guaranteed_opponent_moves())
+
+    def test_concatenating_keeps_the_opponent_options_of_each_payoff_matrix(self):
+        other_payoff_matrix = PayoffMatrix(['tackle', 'earthquake'], ['surf'], [[1], [2]])
+
+        concatenated = concatenate_payoff_matrices([
+            self.payoff_matrix.suffix_opponent_options('0'),
+            other_payoff_matrix.suffix_opponent_options('1')
+        ])
+
+        self.assertEqual(['tackle', 'earthquake'], concatenated.user_options)
+        self.assertEqual(['tackle_0', 'splash_0', 'surf_1'], concatenated.opponent_options)
+        self.assertEqual([[10, 20, 1], [5, 30, 2]], concatenated.scores)
+
+    def test_reorder_puts_unknown_options_last(self):
+        reordered = self.payoff_matrix.reorder(['earthquake'], ['splash', 'tackle'])
+
+        self.assertEqual(['earthquake', 'tackle'], reordered.user_options)
+        self.assertEqual([[30, 5], [20, 10]], reordered.scores)
+
+    def test_payoff_matrix_can_be_pickled(self):
+        self.assertEqual(self.payoff_matrix, pickle.loads(pickle.dumps(self.payoff_matrix)))
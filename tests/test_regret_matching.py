@@ -0,0 +1,51 @@
+import unittest
+
+from showdown.engine.regret_matching import solve_with_regret_matching
+
+
+class TestSolveWithRegretMatching(unittest.TestCase):
+    def test_saddle_point_is_solved_exactly_with_pure_strategies(self):
+        bot_strategy, opponent_strategy, value = solve_with_regret_matching([[10, 20], [0, 5]])
+
+        self.assertEqual([1, 0], bot_strategy)
+        self.assertEqual([1, 0], opponent_strategy)
+        self.assertEqual(10, value)
+
+    def test_single_cell_game_is_the_value_of_the_cell(self):
+        bot_strategy, opponent_strategy, value = solve_with_regret_matching([[-42.5]])
+
+        self.assertEqual([1], bot_strategy)
+        self.assertEqual([1], opponent_strategy)
+        self.assertEqual(-42.5, value)
+
+    def test_matching_pennies_is_close_to_an_even_mix(self):
+        bot_strategy, opponent_strategy, value = solve_with_regret_matching([[100, -100], [-100, 100]])
+
+        self.assertAlmostEqual(0.5, bot_strategy[0], places=2)
+        self.assertAlmostEqual(0.5, opponent_strategy[0], places=2)
+        self.assertLessEqual(abs(value), 0.5)
+
+    def test_value_is_within_the_tolerance_of_the_value_of_the_game(self):
+        # the bot plays the first row 3/7 of the time and the value of the game is 1/7
+        bot_strategy, _, value = solve_with_regret_matching([[3, -1], [-2, 1]], tolerance=0.001)
+
+        self.assertAlmostEqual(3 / 7, bot_strategy[0], places=2)
+        self.assertLessEqual(abs(1 / 7 - value), 0.0005)
+
+    def test_rock_paper_scissors_is_close_to_a_uniform_mix(self):
+        bot_strategy, opponent_strategy, value = solve_with_regret_matching([[0, -50, 50], [50, 0, -50], [-50, 50, 0]])
+
+        for probability in bot_strategy + opponent_strategy:
+            self.assertAlmostEqual(1 / 3, probability, places=1)
+        self.assertLessEqual(abs(value), 0.5)
+
+    def test_average_strategies_guarantee_the_value_to_within_the_tolerance(self):
+        scores = [[3, -2, 7], [-1, 4, 0], [2, 2, -5], [0, 1, 1]]
+
+        bot_strategy, opponent_strategy, value = solve_with_regret_matching(scores, tolerance=0.1)
+
+        guaranteed_by_bot = min(sum(x * row[j] for x, row in zip(bot_strategy, scores)) for j in range(3))
+        held_to_by_opponent = max(sum(y * s for y, s in zip(opponent_strategy, row)) for row in scores)
+        self.assertLessEqual(held_to_by_opponent - guaranteed_by_bot, 0.1)
+        self.assertLessEqual(guaranteed_by_bot, value)
+        self.assertLessEqual(value, held_to_by_opponent)
@@ -0,0 +1,258 @@
+import unittest
+from unittest import mock
+from collections import defaultdict
+from copy import deepcopy
+
+import constants
+from config import ShowdownConfig
+from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import Pokemon
+from showdown.engine.objects import StateMutator
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import pick_safest
+from showdown.engine.evaluate import Scoring
+from showdown.engine.evaluate import evaluate
+from showdown.engine.search_service import SearchService
+from showdown.engine.search_service import get_worker_config
+from showdown.engine.search_service import initialize_worker
+from showdown.engine.search_service import search_state
+from showdown.engine.search_statistics import SearchStatistics
+from showdown.engine.transposition_table import TranspositionTable
+from showdown.battle import Pokemon as StatePokemon
+
+
+class TestSearchService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        ShowdownConfig.damage_calc_type = "average"
+        cls.search_service = SearchService(2, "gen9ou", get_worker_config())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.search_service.shutdown()
+
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                    "starmie": Pokemon.from_state_pokemon_dict(StatePokemon("starmie", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                    "toxapex": Pokemon.from_state_pokemon_dict(StatePokemon("toxapex", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False
+        )
+
+        self.state.user.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'surf', constants.DISABLED: False, constants.CURRENT_PP: 16},
+        ]
+        self.state.opponent.active.moves = [
+            {constants.ID: 'moonblast', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'toxic', constants.DISABLED: False, constants.CURRENT_PP: 16},
+        ]
+
+    def test_state_survives_round_trip_through_dict(self):
+        state = State.from_dict(self.state.to_dict())
+        self.assertEqual(self.state.calculate_hash(), state.calculate_hash())
+        self.assertEqual(str(self.state), str(state))
+
+    def test_search_state_matches_searching_the_state_directly(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=1, prune=False)
+
+        actual = search_state(self.state.to_dict(), user_options, opponent_options, 1, False)
+
+        self.assertEqual(expected, actual)
+
+    def test_search_service_returns_payoff_matrices_in_the_order_of_the_states(self):
+        other_state = deepcopy(self.state)
+        other_state.opponent.active.hp = 1
+        states = [
+            (self.state, *self.state.get_all_options()),
+            (other_state, *other_state.get_all_options()),
+        ]
+        expected = [
+            get_payoff_matrix(StateMutator(deepcopy(state)), user_options, opponent_options, depth=1, prune=False)
+            for state, user_options, opponent_options in states
+        ]
+
+        actual = self.search_service.search(states, depth=1, prune=False)
+
+        self.assertEqual(expected, actual)
+
+    def test_search_root_matches_get_payoff_matrix_without_pruning(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, prune=False)
+
+        actual = self.search_service.search_root(self.state, user_options, opponent_options, depth=2, prune=False)
+
+        self.assertEqual(list(expected.keys()), list(actual.keys()))
+        for k in expected:
+            self.assertAlmostEqual(expected[k], actual[k], msg=k)
+
+    def test_search_root_with_pruning_picks_the_same_move_as_get_payoff_matrix(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2)
+
+        actual = self.search_service.search_root(self.state, user_options, opponent_options, depth=2)
+
+        self.assertEqual(pick_safest(expected), pick_safest(actual))
+
+    def test_search_state_with_the_alpha_beta_search_mode_picks_the_same_move(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = search_state(self.state.to_dict(), user_options, opponent_options, 2, True)
+
+        actual = search_state(self.state.to_dict(), user_options, opponent_options, 2, True, constants.ALPHA_BETA_SEARCH)
+
+        self.assertEqual(list(expected.keys()), list(actual.keys()))
+        self.assertEqual(pick_safest(expected), pick_safest(actual))
+
+    def test_search_root_with_the_alpha_beta_search_mode_picks_the_same_move(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2)
+
+        actual = self.search_service.search_root(self.state, user_options, opponent_options, depth=2, search_mode=constants.ALPHA_BETA_SEARCH)
+
+        self.assertEqual(pick_safest(expected), pick_safest(actual))
+
+    def test_search_state_uses_the_probability_cutoff(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, prune=False, probability_cutoff=1.1)
+
+        actual = search_state(self.state.to_dict(), user_options, opponent_options, 2, False, probability_cutoff=1.1)
+
+        self.assertEqual(list(expected.keys()), list(actual.keys()))
+        for k in expected:
+            self.assertAlmostEqual(expected[k], actual[k], msg=k)
+
+    def test_search_root_uses_the_probability_cutoff(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, prune=False, probability_cutoff=1.1)
+
+        actual = self.search_service.search_root(self.state, user_options, opponent_options, depth=2, prune=False, probability_cutoff=1.1)
+
+        self.assertEqual(list(expected.keys()), list(actual.keys()))
+        for k in expected:
+            self.assertAlmostEqual(expected[k], actual[k], msg=k)
+
+    def test_search_state_uses_the_damage_calc_types(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, prune=False, damage_calc_types=('min_max', 'average'))
+
+        actual = search_state(self.state.to_dict(), user_options, opponent_options, 2, False, damage_calc_types=('min_max', 'average'))
+
+        self.assertEqual(list(expected.keys()), list(actual.keys()))
+        for k in expected:
+            self.assertAlmostEqual(expected[k], actual[k], msg=k)
+
+    def test_search_root_uses_the_damage_calc_types(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, prune=False, damage_calc_types=('min_max', 'average'))
+
+        actual = self.search_service.search_root(self.state, user_options, opponent_options, depth=2, prune=False, damage_calc_types=('min_max', 'average'))
+
+        self.assertEqual(list(expected.keys()), list(actual.keys()))
+        for k in expected:
+            self.assertAlmostEqual(expected[k], actual[k], msg=k)
+
+    def test_search_state_uses_the_backup(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, backup=constants.REGRET_MATCHING_BACKUP)
+
+        actual = search_state(self.state.to_dict(), user_options, opponent_options, 2, True, backup=constants.REGRET_MATCHING_BACKUP)
+
+        self.assertEqual(list(expected.keys()), list(actual.keys()))
+        for k in expected:
+            self.assertAlmostEqual(expected[k], actual[k], msg=k)
+
+    def test_search_root_uses_the_backup_without_pruning(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, backup=constants.REGRET_MATCHING_BACKUP)
+
+        actual = self.search_service.search_root(self.state, user_options, opponent_options, depth=2, backup=constants.REGRET_MATCHING_BACKUP)
+
+        self.assertEqual(list(expected.keys()), list(actual.keys()))
+        for k in expected:
+            self.assertAlmostEqual(expected[k], actual[k], msg=k)
+
+    def test_search_service_merges_the_statistics_of_its_workers(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = SearchStatistics()
+        for _ in range(2):
+            get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, prune=False, transposition_table=TranspositionTable(), statistics=expected)
+        states = [(self.state, user_options, opponent_options), (self.state, user_options, opponent_options)]
+        actual = SearchStatistics()
+
+        self.search_service.search(states, depth=2, prune=False, statistics=actual)
+
+        self.assertEqual(expected.nodes_per_depth, actual.nodes_per_depth)
+        self.assertEqual(expected.evaluate_calls, actual.evaluate_calls)
+        self.assertEqual(expected.state_instruction_calls, actual.state_instruction_calls)
+
+    def test_search_root_merges_the_statistics_of_its_workers(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = SearchStatistics()
+        get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=1, prune=False, statistics=expected)
+        actual = SearchStatistics()
+
+        self.search_service.search_root(self.state, user_options, opponent_options, depth=1, prune=False, statistics=actual)
+
+        self.assertEqual(expected.nodes_per_depth, actual.nodes_per_depth)
+        self.assertEqual(expected.evaluate_calls, actual.evaluate_calls)
+        self.assertEqual(expected.state_instruction_calls, actual.state_instruction_calls)
+
+    def test_workers_evaluate_states_with_the_scoring_of_this_process(self):
+        # random battles lower the static score of being alive after the workers' modules are imported
+        original_alive_static = Scoring.POKEMON_ALIVE_STATIC
+        Scoring.POKEMON_ALIVE_STATIC = 30
+        try:
+            search_service = SearchService(1, "gen9ou", get_worker_config())
+            try:
+                # the user has one more pokemon than the opponent so that the static score of being alive does not cancel out
+                del self.state.opponent.reserve["toxapex"]
+                states = [(self.state, [constants.DO_NOTHING_MOVE], [constants.DO_NOTHING_MOVE])]
+                expected = evaluate(self.state)
+
+                actual = search_service.search(states, depth=1, prune=False)
+            finally:
+                search_service.shutdown()
+        finally:
+            Scoring.POKEMON_ALIVE_STATIC = original_alive_static
+
+        self.assertEqual(expected, actual[0][(constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE)])
+
+    def test_worker_config_sets_the_pivot_switch_heuristic_of_a_worker(self):
+        worker_config = get_worker_config()
+        worker_config['config']['pivot_switch_heuristic'] = True
+        with mock.patch.object(ShowdownConfig, 'pivot_switch_heuristic', False), \
+                mock.patch('showdown.engine.search_service.apply_mods'):
+            initialize_worker("gen9ou", worker_config)
+
+            self.assertTrue(ShowdownConfig.pivot_switch_heuristic)
+
+    def test_worker_config_sets_the_incremental_evaluation_check_of_a_worker(self):
+        worker_config = get_worker_config()
+        worker_config['config']['check_incremental_evaluation'] = True
+        with mock.patch.object(ShowdownConfig, 'check_incremental_evaluation', False), \
+                mock.patch('showdown.engine.search_service.apply_mods'):
+            initialize_worker("gen9ou", worker_config)
+
+            self.assertTrue(ShowdownConfig.check_incremental_evaluation)
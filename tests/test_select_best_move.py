@@ -1,10 +1,27 @@
+import json
+import math
 import unittest
 from collections import defaultdict
+from copy import deepcopy
 
 import constants
+from config import ShowdownConfig
 from showdown.engine.objects import State
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
+from showdown.engine.objects import StateMutator
+from showdown.engine.find_state_instructions import get_all_state_instructions
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import get_payoff_matrix_alpha_beta
+from showdown.engine.select_best_move import get_alpha_beta_value
+from showdown.engine.select_best_move import pick_safest
+from showdown.engine.select_best_move import iterative_deepening_search
+from showdown.engine.select_best_move import order_options_from_previous_search
+from showdown.engine.select_best_move import SearchTimeoutError
+from showdown.engine.search_statistics import SearchStatistics
+from showdown.engine.regret_matching import REGRET_MATCHING_TOLERANCE
+from showdown.engine.move_history import MoveHistory
+from showdown.engine.transposition_table import TranspositionTable
 from showdown.battle import Pokemon as StatePokemon
 
 
@@ -529,3 +546,387 @@ class TestGetAllOptions(unittest.TestCase):
         options = self.state.get_all_options()
 
         self.assertEqual(expected_options, options)
+
+
+class TestGetPayoffMatrix(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                    "starmie": Pokemon.from_state_pokemon_dict(StatePokemon("starmie", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                    "toxapex": Pokemon.from_state_pokemon_dict(StatePokemon("toxapex", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False
+        )
+
+        self.state.user.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'surf', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'nastyplot', constants.DISABLED: False, constants.CURRENT_PP: 16},
+        ]
+        self.state.opponent.active.moves = [
+            {constants.ID: 'moonblast', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'toxic', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'protect', constants.DISABLED: False, constants.CURRENT_PP: 16},
+        ]
+        self.mutator = StateMutator(self.state)
+
+    def assert_same_payoffs(self, expected, actual):
+        self.assertEqual(list(expected.keys()), list(actual.keys()))
+        for k in expected:
+            if math.isnan(expected[k]):
+                self.assertTrue(math.isnan(actual[k]), k)
+            else:
+                self.assertEqual(expected[k], actual[k], k)
+
+    def test_transposition_table_does_not_change_the_payoff_matrix(self):
+        user_options, opponent_options = self.state.get_all_options()
+        hash_before = self.state.calculate_hash()
+        expected = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2)
+
+        transposition_table = TranspositionTable()
+        actual = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, transposition_table=transposition_table)
+
+        self.assert_same_payoffs(expected, actual)
+        self.assertGreater(len(transposition_table), 0)
+        self.assertEqual(hash_before, self.state.calculate_hash())
+        self.assertEqual(hash_before, self.mutator.state_hash)
+
+    def test_transposition_table_is_used_when_searching_the_same_state_twice(self):
+        user_options, opponent_options = self.state.get_all_options()
+        transposition_table = TranspositionTable()
+        first = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, transposition_table=transposition_table)
+        hits = transposition_table.hits
+        second = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, transposition_table=transposition_table)
+
+        self.assertIs(first, second)
+        self.assertEqual(hits + 1, transposition_table.hits)
+
+    def test_search_past_its_deadline_raises_timeout_error(self):
+        user_options, opponent_options = self.state.get_all_options()
+        with self.assertRaises(SearchTimeoutError):
+            get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, deadline=0)
+
+    def test_order_options_puts_best_row_and_its_worst_reply_first(self):
+        score_lookup = {
+            ('a', 'x'): 1, ('a', 'y'): 5,
+            ('b', 'x'): 9, ('b', 'y'): 3,
+            ('c', 'x'): 0, ('c', 'y'): float('nan'),
+        }
+        user_options, opponent_options = order_options_from_previous_search(['a', 'b', 'c'], ['x', 'y'], score_lookup)
+
+        self.assertEqual(['b', 'a', 'c'], user_options)
+        self.assertEqual(['y', 'x'], opponent_options)
+
+    def test_no_time_budget_still_completes_depth_one(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=1)
+
+        score_lookups, depth = iterative_deepening_search([(self.state, user_options, opponent_options)], 0)
+
+        self.assertEqual(1, depth)
+        self.assert_same_payoffs(expected, score_lookups[0])
+
+    def test_search_stops_at_max_depth_and_returns_options_in_original_order(self):
+        user_options, opponent_options = self.state.get_all_options()
+        hash_before = self.state.calculate_hash()
+
+        score_lookups, depth = iterative_deepening_search([(self.state, user_options, opponent_options)], 60, max_depth=2)
+
+        self.assertEqual(2, depth)
+        self.assertEqual(
+            [(u, o) for u in user_options for o in opponent_options],
+            list(score_lookups[0].keys())
+        )
+        self.assertEqual(hash_before, self.state.calculate_hash())
+
+    def test_alpha_beta_search_mode_picks_the_same_move_with_iterative_deepening(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_lookups, _ = iterative_deepening_search([(self.state, user_options, opponent_options)], 60, max_depth=2)
+
+        actual_lookups, depth = iterative_deepening_search([(self.state, user_options, opponent_options)], 60, max_depth=2, search_mode=constants.ALPHA_BETA_SEARCH)
+
+        self.assertEqual(2, depth)
+        self.assertEqual(list(expected_lookups[0].keys()), list(actual_lookups[0].keys()))
+        self.assertEqual(pick_safest(expected_lookups[0]), pick_safest(actual_lookups[0]))
+
+    def test_statistics_do_not_change_the_payoff_matrix(self):
+        user_options, opponent_options = self.state.get_all_options()
+        state_copy = deepcopy(self.state)
+        expected = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2)
+
+        actual = get_payoff_matrix(StateMutator(state_copy), user_options, opponent_options, depth=2, statistics=SearchStatistics())
+
+        self.assert_same_payoffs(expected, actual)
+
+    def test_statistics_count_the_cells_searched_and_pruned(self):
+        user_options, opponent_options = self.state.get_all_options()
+        statistics = SearchStatistics()
+
+        score_lookup = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=1, statistics=statistics)
+
+        searched_cells = len([s for s in score_lookup.values() if not math.isnan(s)])
+        self.assertEqual(searched_cells, statistics.state_instruction_calls)
+        self.assertEqual(len(score_lookup) - searched_cells, statistics.pruned_cells)
+        self.assertEqual(statistics.instruction_sets, statistics.evaluate_calls)
+        self.assertGreaterEqual(statistics.max_instruction_sets, 1)
+
+    def test_statistics_count_nodes_by_remaining_depth(self):
+        user_options, opponent_options = self.state.get_all_options()
+        statistics = SearchStatistics()
+
+        get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, statistics=statistics)
+
+        self.assertEqual(1, statistics.nodes_per_depth[2])
+        self.assertGreater(statistics.nodes_per_depth[1], 1)
+
+    def test_merged_statistics_add_up_the_counts_of_both_searches(self):
+        user_options, opponent_options = self.state.get_all_options()
+        statistics = SearchStatistics()
+        other_statistics = SearchStatistics()
+        get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, statistics=statistics)
+        get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, statistics=other_statistics)
+        expected_nodes = statistics.to_dict()['nodes'] * 2
+        expected_evaluate_calls = statistics.evaluate_calls * 2
+        expected_max_instruction_sets = statistics.max_instruction_sets
+
+        statistics.merge(other_statistics)
+
+        self.assertEqual(expected_nodes, statistics.to_dict()['nodes'])
+        self.assertEqual(2, statistics.nodes_per_depth[2])
+        self.assertEqual(expected_evaluate_calls, statistics.evaluate_calls)
+        self.assertEqual(expected_max_instruction_sets, statistics.max_instruction_sets)
+
+    def test_statistics_are_emitted_as_json(self):
+        user_options, opponent_options = self.state.get_all_options()
+        statistics = SearchStatistics()
+        statistics.start()
+        get_payoff_matrix(self.mutator, user_options, opponent_options, depth=1, statistics=statistics)
+        statistics.stop()
+
+        emitted = json.loads(statistics.to_json())
+
+        self.assertEqual({'1': 1}, emitted['nodes_per_depth'])
+        self.assertEqual(statistics.evaluate_calls, emitted['evaluate_calls'])
+        self.assertIn('state_instructions', emitted['phase_times'])
+        self.assertIn('evaluate', emitted['phase_times'])
+        self.assertGreater(emitted['total_time'], 0)
+
+    def test_history_does_not_change_the_safest_score(self):
+        user_options, opponent_options = self.state.get_all_options()
+        state_copy = deepcopy(self.state)
+        expected = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2)
+
+        actual = get_payoff_matrix(StateMutator(state_copy), user_options, opponent_options, depth=2, history=MoveHistory())
+
+        self.assertEqual(pick_safest(expected)[1], pick_safest(actual)[1])
+
+    def test_history_orders_the_best_option_first_at_the_same_depth(self):
+        history = MoveHistory()
+        history.record_best_user_option('surf', 2)
+        history.record_refutation('protect', 2)
+
+        self.assertEqual(['surf', 'thunderbolt', 'nastyplot'], history.order_user_options(['thunderbolt', 'surf', 'nastyplot'], 2))
+        self.assertEqual(['protect', 'moonblast', 'toxic'], history.order_opponent_options(['moonblast', 'toxic', 'protect'], 2))
+        self.assertEqual(['thunderbolt', 'surf', 'nastyplot'], history.order_user_options(['thunderbolt', 'surf', 'nastyplot'], 1))
+
+    def test_history_is_filled_in_by_the_search(self):
+        user_options, opponent_options = self.state.get_all_options()
+        history = MoveHistory()
+
+        score_lookup = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, history=history)
+
+        best_user_move = pick_safest(score_lookup)[0][0]
+        self.assertEqual(best_user_move, history.order_user_options(user_options, 2)[0])
+
+    def test_alpha_beta_search_picks_the_same_move(self):
+        user_options, opponent_options = self.state.get_all_options()
+        state_copy = deepcopy(self.state)
+        expected = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2))
+
+        actual = pick_safest(get_payoff_matrix_alpha_beta(StateMutator(state_copy), user_options, opponent_options, depth=2))
+
+        self.assertEqual(expected[0][0], actual[0][0])
+        self.assertAlmostEqual(expected[1], actual[1])
+
+    def test_alpha_beta_search_picks_the_same_move_at_depth_three_with_fewer_state_instructions(self):
+        user_options, opponent_options = self.state.get_all_options()
+        state_copy = deepcopy(self.state)
+        maximin_statistics = SearchStatistics()
+        alpha_beta_statistics = SearchStatistics()
+        expected = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=3, statistics=maximin_statistics))
+
+        actual = pick_safest(get_payoff_matrix_alpha_beta(StateMutator(state_copy), user_options, opponent_options, depth=3, statistics=alpha_beta_statistics))
+
+        self.assertEqual(expected[0][0], actual[0][0])
+        self.assertAlmostEqual(expected[1], actual[1])
+        self.assertLess(alpha_beta_statistics.state_instruction_calls, maximin_statistics.state_instruction_calls)
+
+    def test_alpha_beta_search_gives_the_same_root_cells_as_maximin_with_pruning(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=3, history=MoveHistory())
+
+        actual = get_payoff_matrix_alpha_beta(self.mutator, user_options, opponent_options, depth=3, history=MoveHistory())
+
+        self.assert_same_payoffs(expected, actual)
+
+    def test_alpha_beta_search_picks_the_same_move_when_guaranteed_opponent_moves_are_removed(self):
+        # removing guaranteed opponent moves compares the cells of the root to each other,
+        # so a cell holding a bound instead of its exact score changes which moves are removed
+        state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("sunkern", 80).to_dict()),
+                {
+                    "piplup": Pokemon.from_state_pokemon_dict(StatePokemon("piplup", 80).to_dict()),
+                    "pikachuworld": Pokemon.from_state_pokemon_dict(StatePokemon("pikachuworld", 80).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("arceusbug", 80).to_dict()),
+                {},
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False
+        )
+        state.user.active.hp = 3
+        state.user.active.moves = [
+            {constants.ID: 'floatyfall', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'scaryface', constants.DISABLED: False, constants.CURRENT_PP: 16},
+        ]
+        state.user.reserve["piplup"].hp = 95
+        state.user.reserve["piplup"].moves = [{constants.ID: 'auroraveil', constants.DISABLED: False, constants.CURRENT_PP: 16}]
+        state.user.reserve["pikachuworld"].hp = 172
+        state.user.reserve["pikachuworld"].moves = [{constants.ID: 'geomancy', constants.DISABLED: False, constants.CURRENT_PP: 16}]
+        state.opponent.active.hp = 138
+        state.opponent.active.moves = [
+            {constants.ID: 'acidspray', constants.DISABLED: False, constants.CURRENT_PP: 16},
+            {constants.ID: 'icehammer', constants.DISABLED: False, constants.CURRENT_PP: 16},
+        ]
+        user_options, opponent_options = state.get_all_options()
+        expected = pick_safest(get_payoff_matrix(StateMutator(deepcopy(state)), user_options, opponent_options, depth=2, history=MoveHistory()), remove_guaranteed=True)
+
+        actual = pick_safest(get_payoff_matrix_alpha_beta(StateMutator(state), user_options, opponent_options, depth=2, history=MoveHistory()), remove_guaranteed=True)
+
+        self.assertEqual(expected, actual)
+
+    def test_alpha_beta_value_outside_of_the_window_is_a_bound(self):
+        user_options, opponent_options = self.state.get_all_options()
+        state_copy = deepcopy(self.state)
+        safest_score = get_alpha_beta_value(self.mutator, user_options, opponent_options, 2, float('-inf'), float('inf'))
+
+        value = get_alpha_beta_value(StateMutator(state_copy), user_options, opponent_options, 2, safest_score + 10, safest_score + 20)
+
+        self.assertLessEqual(value, safest_score + 10)
+        self.assertGreaterEqual(value, safest_score)
+
+    def test_regret_matching_backup_searches_every_cell(self):
+        user_options, opponent_options = self.state.get_all_options()
+        statistics = SearchStatistics()
+
+        score_lookup = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=True, statistics=statistics, backup=constants.REGRET_MATCHING_BACKUP)
+
+        self.assertEqual(0, statistics.pruned_cells)
+        self.assertFalse(any(math.isnan(score) for score in score_lookup.values()))
+
+    def test_regret_matching_backup_is_the_same_as_maximin_at_depth_one(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=1, prune=False)
+
+        actual = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=1, backup=constants.REGRET_MATCHING_BACKUP)
+
+        self.assert_same_payoffs(expected, actual)
+
+    def test_regret_matching_backup_is_never_worse_than_maximin_for_the_bot(self):
+        # a mixed strategy can always do at least as well as the safest pure strategy
+        user_options, opponent_options = self.state.get_all_options()
+        maximin = get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, prune=False)
+
+        regret_matching = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, backup=constants.REGRET_MATCHING_BACKUP)
+
+        for move_pair, score in maximin.items():
+            self.assertGreaterEqual(regret_matching[move_pair], score - REGRET_MATCHING_TOLERANCE / 2, move_pair)
+
+    def test_probability_cutoff_evaluates_unlikely_outcomes_without_searching_them(self):
+        user_options, opponent_options = self.state.get_all_options()
+        state_copy = deepcopy(self.state)
+        full_statistics = SearchStatistics()
+        cut_off_statistics = SearchStatistics()
+        get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False, statistics=full_statistics)
+
+        get_payoff_matrix(StateMutator(state_copy), user_options, opponent_options, depth=2, prune=False, statistics=cut_off_statistics, probability_cutoff=0.5)
+
+        self.assertEqual(0, full_statistics.cut_off_branches)
+        self.assertGreater(cut_off_statistics.cut_off_branches, 0)
+        self.assertGreater(cut_off_statistics.cut_off_probability, 0)
+        self.assertLess(cut_off_statistics.nodes_per_depth[1], full_statistics.nodes_per_depth[1])
+
+    def test_probability_cutoff_always_searches_the_most_likely_outcome(self):
+        user_options, opponent_options = self.state.get_all_options()
+        statistics = SearchStatistics()
+
+        get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False, statistics=statistics, probability_cutoff=1.1)
+
+        self.assertEqual(len(user_options) * len(opponent_options), statistics.nodes_per_depth[1])
+
+    def test_probability_cutoff_with_alpha_beta_search(self):
+        user_options, opponent_options = self.state.get_all_options()
+        statistics = SearchStatistics()
+
+        score_lookup = get_payoff_matrix_alpha_beta(self.mutator, user_options, opponent_options, depth=2, statistics=statistics, probability_cutoff=1.1)
+
+        self.assertEqual(set(user_options), set(k[0] for k in score_lookup))
+        self.assertGreater(statistics.cut_off_branches, 0)
+        self.assertLessEqual(statistics.nodes_per_depth[1], len(user_options) * len(opponent_options))
+
+    def test_damage_calc_type_can_be_given_to_get_all_state_instructions(self):
+        average_instructions = get_all_state_instructions(StateMutator(deepcopy(self.state)), 'surf', 'moonblast')
+
+        min_max_instructions = get_all_state_instructions(StateMutator(deepcopy(self.state)), 'surf', 'moonblast', calc_type='min_max')
+
+        self.assertGreater(len(min_max_instructions), len(average_instructions))
+
+    def test_damage_calc_schedule_is_only_used_for_the_turns_it_is_given_for(self):
+        user_options, opponent_options = self.state.get_all_options()
+        root_only_statistics = SearchStatistics()
+        every_turn_statistics = SearchStatistics()
+        get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, prune=False, statistics=root_only_statistics, damage_calc_types=('min_max', 'average'))
+
+        get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=2, prune=False, statistics=every_turn_statistics, damage_calc_types=('min_max',))
+
+        self.assertEqual(root_only_statistics.nodes_per_depth[1], every_turn_statistics.nodes_per_depth[1])
+        self.assertLess(root_only_statistics.instruction_sets, every_turn_statistics.instruction_sets)
+
+    def test_damage_calc_schedule_uses_more_outcomes_at_the_root(self):
+        user_options, opponent_options = self.state.get_all_options()
+        average_statistics = SearchStatistics()
+        min_max_statistics = SearchStatistics()
+        get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=1, prune=False, statistics=average_statistics)
+
+        get_payoff_matrix(StateMutator(deepcopy(self.state)), user_options, opponent_options, depth=1, prune=False, statistics=min_max_statistics, damage_calc_types=('min_max', 'average'))
+
+        self.assertLess(average_statistics.instruction_sets, min_max_statistics.instruction_sets)
@@ -1,6 +1,8 @@
 import unittest
 
 from collections import defaultdict
+from copy import copy
+from copy import deepcopy
 import constants
 
 from showdown.battle import Pokemon as StatePokemon
@@ -8,6 +10,9 @@ from showdown.engine.objects import State
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
 from showdown.engine.objects import StateMutator
+from showdown.engine.objects import TransposeInstruction
+from showdown.engine.compiled_instructions import compile_instructions
+from showdown.engine.evaluate import evaluate
 
 
 class TestStatemutator(unittest.TestCase):
@@ -862,3 +867,202 @@ class TestStatemutator(unittest.TestCase):
         self.assertEqual(3, self.state.user.active.special_attack)
         self.assertEqual(4, self.state.user.active.special_defense)
         self.assertEqual(5, self.state.user.active.speed)
+
+    def test_state_hash_is_updated_when_instructions_are_applied(self):
+        instructions = [
+            (constants.MUTATOR_DAMAGE, constants.USER, 25),
+            (constants.MUTATOR_BOOST, constants.OPPONENT, constants.ATTACK, 2),
+            (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.USER, constants.LEECH_SEED),
+            (constants.MUTATOR_APPLY_STATUS, constants.OPPONENT, constants.BURN),
+            (constants.MUTATOR_SIDE_START, constants.USER, constants.STEALTH_ROCK, 1),
+            (constants.MUTATOR_WEATHER_START, constants.SUN, None),
+            (constants.MUTATOR_SWITCH, constants.USER, "pikachu", "rattata"),
+            (constants.MUTATOR_CHANGE_ITEM, constants.OPPONENT, "leftovers", self.state.opponent.active.item),
+        ]
+        original_hash = self.mutator.state_hash
+        self.mutator.apply(instructions)
+
+        self.assertNotEqual(original_hash, self.mutator.state_hash)
+        self.assertEqual(self.state.calculate_hash(), self.mutator.state_hash)
+
+    def test_state_hash_is_restored_when_instructions_are_reversed(self):
+        instructions = [
+            (constants.MUTATOR_DAMAGE, constants.USER, 25),
+            (constants.MUTATOR_UNBOOST, constants.OPPONENT, constants.SPEED, 1),
+            (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.SPIKES, 2),
+            (constants.MUTATOR_WISH_START, constants.USER, 50, 0),
+            (constants.MUTATOR_FIELD_START, constants.ELECTRIC_TERRAIN, None),
+            (constants.MUTATOR_TOGGLE_TRICKROOM,),
+            (constants.MUTATOR_CHANGE_TYPE, constants.USER, ["water"], self.state.user.active.types),
+        ]
+        original_hash = self.mutator.state_hash
+        self.mutator.apply(instructions)
+        self.mutator.reverse(instructions)
+
+        self.assertEqual(original_hash, self.mutator.state_hash)
+
+    def test_state_hash_is_the_same_for_different_instructions_resulting_in_the_same_state(self):
+        self.mutator.apply([
+            (constants.MUTATOR_DAMAGE, constants.USER, 10),
+            (constants.MUTATOR_DAMAGE, constants.USER, 15),
+        ])
+        first_hash = self.mutator.state_hash
+        self.mutator.reverse([
+            (constants.MUTATOR_DAMAGE, constants.USER, 10),
+            (constants.MUTATOR_DAMAGE, constants.USER, 15),
+        ])
+
+        self.mutator.apply([
+            (constants.MUTATOR_DAMAGE, constants.USER, 25),
+        ])
+
+        self.assertEqual(first_hash, self.mutator.state_hash)
+
+    def get_instructions_for_compiling(self):
+        return [
+            (constants.MUTATOR_DAMAGE, constants.USER, 25),
+            (constants.MUTATOR_HEAL, constants.OPPONENT, 10),
+            (constants.MUTATOR_BOOST, constants.OPPONENT, constants.ATTACK, 2),
+            (constants.MUTATOR_UNBOOST, constants.USER, constants.SPEED, 1),
+            (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.USER, constants.LEECH_SEED),
+            (constants.MUTATOR_APPLY_STATUS, constants.OPPONENT, constants.BURN),
+            (constants.MUTATOR_SIDE_START, constants.USER, constants.STEALTH_ROCK, 1),
+            (constants.MUTATOR_WISH_START, constants.USER, 50, 0),
+            (constants.MUTATOR_WISH_DECREMENT, constants.USER),
+            (constants.MUTATOR_FUTURESIGHT_START, constants.OPPONENT, "pikachu", 0),
+            (constants.MUTATOR_FUTURESIGHT_DECREMENT, constants.OPPONENT),
+            (constants.MUTATOR_WEATHER_START, constants.SUN, None),
+            (constants.MUTATOR_FIELD_START, constants.ELECTRIC_TERRAIN, None),
+            (constants.MUTATOR_TOGGLE_TRICKROOM,),
+            (constants.MUTATOR_CHANGE_TYPE, constants.USER, ["water"], self.state.user.active.types),
+            (constants.MUTATOR_CHANGE_ITEM, constants.OPPONENT, "leftovers", self.state.opponent.active.item),
+            (constants.MUTATOR_SWITCH, constants.USER, "pikachu", "rattata"),
+            (constants.MUTATOR_CHANGE_STATS, constants.USER, (1, 2, 3, 4, 5, 6), self.state.user.reserve["rattata"].get_stats()),
+            (constants.MUTATOR_REMOVE_STATUS, constants.OPPONENT, constants.BURN),
+        ]
+
+    def test_apply_compiled_gives_the_same_state_as_apply(self):
+        instructions = self.get_instructions_for_compiling()
+        compiled_state = deepcopy(self.state)
+        compiled_mutator = StateMutator(compiled_state)
+        compiled_mutator.state_hash
+
+        self.mutator.apply(instructions)
+        compiled_mutator.apply_compiled(compile_instructions(instructions))
+
+        self.assertEqual(self.state.calculate_hash(), compiled_state.calculate_hash())
+        self.assertEqual(compiled_state.calculate_hash(), compiled_mutator.state_hash)
+
+    def test_reverse_compiled_restores_the_state(self):
+        instructions = self.get_instructions_for_compiling()
+        original_hash = self.mutator.state_hash
+        compiled_instructions = compile_instructions(instructions)
+
+        self.mutator.apply_compiled(compiled_instructions)
+        self.assertNotEqual(original_hash, self.mutator.state_hash)
+
+        self.mutator.reverse_compiled(compiled_instructions)
+        self.assertEqual(original_hash, self.mutator.state_hash)
+        self.assertEqual(original_hash, self.state.calculate_hash())
+
+    def test_compiling_an_invalid_stat_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            compile_instructions([(constants.MUTATOR_BOOST, constants.USER, 'not_a_stat', 1)])
+
+    def test_transpose_instruction_compile_includes_instructions_added_after_compiling(self):
+        instruction = TransposeInstruction(1, [(constants.MUTATOR_DAMAGE, constants.USER, 25)])
+        instruction.compile()
+        instruction.add_instruction((constants.MUTATOR_DAMAGE, constants.USER, 10))
+
+        self.mutator.apply_compiled(instruction.compile())
+
+        self.assertEqual(self.state.user.active.maxhp - 35, self.state.user.active.hp)
+
+    def test_copy_of_transpose_instruction_does_not_share_compiled_instructions(self):
+        instruction = TransposeInstruction(1, [(constants.MUTATOR_DAMAGE, constants.USER, 25)])
+        instruction.compile()
+        copied_instruction = copy(instruction)
+        copied_instruction.add_instruction((constants.MUTATOR_DAMAGE, constants.USER, 10))
+
+        self.mutator.apply_compiled(instruction.compile())
+
+        self.assertEqual(self.state.user.active.maxhp - 25, self.state.user.active.hp)
+
+    def test_move_to_applies_the_instructions(self):
+        instruction = TransposeInstruction(1, [(constants.MUTATOR_DAMAGE, constants.USER, 25)])
+
+        self.mutator.move_to(instruction)
+
+        self.assertEqual(self.state.user.active.maxhp - 25, self.state.user.active.hp)
+
+    def test_move_to_a_sibling_branch_only_reverses_and_applies_the_difference(self):
+        instruction = TransposeInstruction(1, [(constants.MUTATOR_DAMAGE, constants.USER, 25)])
+        other_instruction = copy(instruction)
+        instruction.add_instruction((constants.MUTATOR_DAMAGE, constants.OPPONENT, 10))
+        other_instruction.add_instruction((constants.MUTATOR_HEAL, constants.USER, 5))
+
+        self.mutator.move_to(instruction)
+        self.mutator.move_to(other_instruction)
+
+        self.assertEqual(self.state.user.active.maxhp - 20, self.state.user.active.hp)
+        self.assertEqual(self.state.opponent.active.maxhp, self.state.opponent.active.hp)
+
+    def test_stop_positioning_restores_the_state(self):
+        original_hash = self.mutator.state_hash
+        instruction = TransposeInstruction(1, [(constants.MUTATOR_DAMAGE, constants.USER, 25), (constants.MUTATOR_SWITCH, constants.OPPONENT, "pikachu", "rattata")])
+
+        outer_position = self.mutator.start_positioning()
+        self.mutator.move_to(instruction)
+        self.mutator.stop_positioning(outer_position)
+
+        self.assertEqual(original_hash, self.mutator.state_hash)
+        self.assertIsNone(self.mutator.position)
+
+    def test_nested_positioning_starts_from_the_outer_position(self):
+        outer_instruction = TransposeInstruction(1, [(constants.MUTATOR_DAMAGE, constants.USER, 25)])
+        inner_instruction = TransposeInstruction(1, [(constants.MUTATOR_DAMAGE, constants.USER, 10)])
+
+        self.mutator.move_to(outer_instruction)
+        outer_position = self.mutator.start_positioning()
+        self.mutator.move_to(inner_instruction)
+        self.assertEqual(self.state.user.active.maxhp - 35, self.state.user.active.hp)
+
+        self.mutator.stop_positioning(outer_position)
+        self.assertEqual(self.state.user.active.maxhp - 25, self.state.user.active.hp)
+        self.assertIs(outer_instruction.instructions.tail, self.mutator.position)
+
+    def test_evaluate_matches_the_full_evaluation_after_a_damaged_pokemon_switches_out(self):
+        self.state.user.side_conditions[constants.STEALTH_ROCK] = 1
+        self.mutator.evaluate()
+        instruction = TransposeInstruction(1, [
+            (constants.MUTATOR_DAMAGE, constants.USER, self.state.user.active.maxhp),
+            (constants.MUTATOR_SWITCH, constants.USER, "pikachu", "rattata"),
+            (constants.MUTATOR_BOOST, constants.USER, constants.ATTACK, 2),
+        ])
+
+        self.mutator.apply_compiled(instruction.compile())
+
+        self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+
+    def test_evaluate_matches_the_full_evaluation_after_reversing_a_switch(self):
+        original_score = self.mutator.evaluate()
+        instruction = TransposeInstruction(1, [
+            (constants.MUTATOR_DAMAGE, constants.OPPONENT, 50),
+            (constants.MUTATOR_SWITCH, constants.OPPONENT, "pikachu", "charmander"),
+        ])
+
+        self.mutator.apply_compiled(instruction.compile())
+        self.mutator.reverse_compiled(instruction.compile())
+
+        self.assertEqual(original_score, self.mutator.evaluate())
+        self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+
+    def test_uncompiled_switch_updates_the_evaluation(self):
+        self.mutator.evaluate()
+
+        self.mutator.apply([
+            (constants.MUTATOR_DAMAGE, constants.USER, self.state.user.active.maxhp),
+            (constants.MUTATOR_SWITCH, constants.USER, "pikachu", "rattata")
+        ])
+
+        self.assertEqual(evaluate(self.state), self.mutator.evaluate())
@@ -0,0 +1,30 @@
+import unittest
+
+from showdown.engine.transposition_table import TranspositionTable
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_returns_none_for_missing_key(self):
+        table = TranspositionTable()
+
+        self.assertIsNone(table.get("key"))
+        self.assertEqual(1, table.misses)
+
+    def test_returns_value_that_was_set(self):
+        table = TranspositionTable()
+        table.set("key", {("a", "b"): 1})
+
+        self.assertEqual({("a", "b"): 1}, table.get("key"))
+        self.assertEqual(1, table.hits)
+
+    def test_least_recently_used_entry_is_evicted_when_full(self):
+        table = TranspositionTable(max_size=2)
+        table.set("a", 1)
+        table.set("b", 2)
+        table.get("a")
+        table.set("c", 3)
+
+        self.assertEqual(2, len(table))
+        self.assertEqual(1, table.get("a"))
+        self.assertIsNone(table.get("b"))
+        self.assertEqual(3, table.get("c"))
@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+from showdown.battle_bots.nash_equilibrium.zero_sum import solve_zero_sum_game
+
+
+class TestSolveZeroSumGame(unittest.TestCase):
+    def test_matching_pennies_is_an_even_mix(self):
+        bot_strategy, opponent_strategy, value = solve_zero_sum_game([[1, -1], [-1, 1]])
+
+        np.testing.assert_allclose([0.5, 0.5], bot_strategy)
+        np.testing.assert_allclose([0.5, 0.5], opponent_strategy)
+        self.assertAlmostEqual(0, value)
+
+    def test_dominated_row_is_never_played(self):
+        bot_strategy, _, value = solve_zero_sum_game([[10, 20], [0, 5]])
+
+        np.testing.assert_allclose([1, 0], bot_strategy)
+        self.assertAlmostEqual(10, value)
+
+    def test_rock_paper_scissors_is_a_uniform_mix(self):
+        bot_strategy, opponent_strategy, value = solve_zero_sum_game([[0, -1, 1], [1, 0, -1], [-1, 1, 0]])
+
+        np.testing.assert_allclose([1/3, 1/3, 1/3], bot_strategy)
+        np.testing.assert_allclose([1/3, 1/3, 1/3], opponent_strategy)
+        self.assertAlmostEqual(0, value)
+
+    def test_strategies_guarantee_the_value_of_the_game(self):
+        matrix = np.array([[3, -2, 7], [-1, 4, 0], [2, 2, -5], [0, 1, 1]], dtype=float)
+
+        bot_strategy, opponent_strategy, value = solve_zero_sum_game(matrix)
+
+        self.assertAlmostEqual(value, (bot_strategy @ matrix).min())
+        self.assertAlmostEqual(value, (matrix @ opponent_strategy).max())
+
+    def test_single_cell_game_is_the_value_of_the_cell(self):
+        bot_strategy, opponent_strategy, value = solve_zero_sum_game([[-42.5]])
+
+        self.assertEqual([1], list(bot_strategy))
+        self.assertEqual([1], list(opponent_strategy))
+        self.assertAlmostEqual(-42.5, value)
+
+    def test_nan_payoff_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            solve_zero_sum_game([[1, float('nan')], [0, 1]])